@@ -0,0 +1,177 @@
+"""Codec JSON intercambiabili per caricare e salvare gli schedule.
+
+Il codec è scelto con ``Settings.json_codec``:
+- "msgspec": decodifica con uno schema tipizzato (``_PatientRecord``) che
+  valida i campi; i record diventano Patient o colonne di una PatientTable
+- "orjson" : decodifica/codifica veloce dei dict
+- "json"   : modulo standard, sempre disponibile
+- "auto"   : il primo disponibile nell'ordine sopra
+Un codec richiesto ma non installato lascia il posto al successivo, come
+per i backend dei solver.
+
+I file sono letti per intero in memoria (a differenza di
+``PatientListForSpecialties.load``, che legge in streaming).
+
+``dumps`` con orjson o msgspec produce lo stesso testo del modulo json per
+stringhe (i caratteri non ASCII sono resi come ``\\uXXXX``), interi e
+chiavi non stringa (convertite in stringa), ma non è identico per tutti i
+float: gli esponenti sono scritti senza ``+`` e zeri iniziali (``1e16``
+invece di ``1e+16``) e NaN/Infinity diventano ``null``. I valori letti sono
+gli stessi, salvo i non finiti.
+"""
+
+import gzip
+import importlib
+import importlib.util
+import json
+import os
+import re
+import sys
+
+if os.path.basename(__file__) != "main.py":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../', 'Code')))
+
+from CommonClass.Patient import Patient
+from CommonClass.PatientListForSpecialties import PatientListForSpecialties
+from CommonClass.PatientTable import PatientTable
+from settings import Settings
+
+JSON_CODECS = ("msgspec", "orjson", "json")
+
+# Decoder msgspec dello schedule, creato al primo uso
+_msgspec_decoder = None
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def available_codecs() -> list:
+    """Codec installati, nell'ordine di preferenza."""
+    return [name for name in JSON_CODECS if name == "json" or importlib.util.find_spec(name)]
+
+
+def get_codec(name: str | None = None) -> str:
+    """Codec effettivo per ``name`` (default ``Settings.json_codec``)."""
+    name = Settings.json_codec if name is None else name
+    if name != "auto" and name not in JSON_CODECS:
+        raise ValueError(f"Codec JSON sconosciuto '{name}'. Scegli tra auto, {', '.join(JSON_CODECS)}.")
+    candidates = JSON_CODECS if name == "auto" else JSON_CODECS[JSON_CODECS.index(name):]
+    available = available_codecs()
+    return next(codec for codec in candidates if codec in available)
+
+
+#region: Codifica e decodifica
+def loads(data: bytes, codec: str | None = None):
+    """Decodifica un documento JSON generico."""
+    codec = get_codec(codec)
+    if codec == "orjson":
+        return importlib.import_module("orjson").loads(data)
+    if codec == "msgspec":
+        return importlib.import_module("msgspec.json").decode(data)
+    return json.loads(data)
+
+
+def _escape_non_ascii(match) -> str:
+    """``\\uXXXX`` come ``json.dumps`` (coppie surrogate oltre il BMP)."""
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return "\\u%04x\\u%04x" % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return "\\u%04x" % code
+
+
+def dumps(value, codec: str | None = None) -> str:
+    """Codifica compatta (separatori senza spazi) di ``value``.
+
+    Con orjson e msgspec le chiavi non stringa sono convertite e i
+    caratteri non ASCII sono resi come ``\\uXXXX``, come nel modulo json;
+    i float possono differire nella forma dell'esponente (vedi il modulo).
+    """
+    codec = get_codec(codec)
+    if codec == "orjson":
+        orjson = importlib.import_module("orjson")
+        text = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    elif codec == "msgspec":
+        text = importlib.import_module("msgspec.json").encode(value).decode("utf-8")
+    else:
+        return json.dumps(value, separators=(",", ":"))
+    return text if text.isascii() else _NON_ASCII.sub(_escape_non_ascii, text)
+
+
+def _schedule_decoder():
+    """Decoder msgspec tipizzato {specialità: [paziente, ...]}."""
+    global _msgspec_decoder
+    if _msgspec_decoder is None:
+        msgspec = importlib.import_module("msgspec")
+
+        class _PatientRecord(msgspec.Struct):
+            id: int
+            eot: float
+            day: int
+            mtb: int
+            rot: float | None = None
+            opDay: int = -1
+            workstation: int = -1
+            overdue: bool = False
+
+        _msgspec_decoder = msgspec.json.Decoder(dict[str, list[_PatientRecord]])
+    return _msgspec_decoder
+
+
+def decode_schedule(data: bytes, codec: str | None = None, columnar: bool = False) -> dict:
+    """Decodifica uno schedule ``{specialità: [paziente, ...]}``.
+
+    Returns:
+        {specialità: PatientTable} con ``columnar``, altrimenti
+        {specialità: [Patient, ...]}
+    """
+    codec = get_codec(codec)
+    if codec == "msgspec":
+        return {
+            specialty: _records_to_table(records) if columnar else [
+                Patient(r.id, r.eot, r.day, r.mtb, r.rot, r.opDay, r.workstation, r.overdue)
+                for r in records
+            ]
+            for specialty, records in _schedule_decoder().decode(data).items()
+        }
+    return {
+        specialty: PatientTable.from_dict(rows) if columnar else [Patient.from_dict(row) for row in rows]
+        for specialty, rows in loads(data, codec).items()
+    }
+
+
+def _records_to_table(records) -> PatientTable:
+    """PatientTable dai record msgspec già validati."""
+    columns = {
+        name: [getattr(record, name) for record in records]
+        for name in ("id", "eot", "day", "mtb", "opDay", "workstation", "overdue")
+    }
+    columns["rot"] = [float("nan") if record.rot is None else record.rot for record in records]
+    return PatientTable.from_columns(**columns)
+#endregion
+
+
+#region: File
+def read_bytes(path) -> bytes:
+    """Contenuto del file, decompresso se termina con ``.gz``."""
+    path = str(path)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return f.read()
+
+
+def load_schedule(path, columnar: bool = False, codec: str | None = None) -> PatientListForSpecialties:
+    """Carica uno schedule JSON con il codec scelto.
+
+    Args:
+        path: File ``weekly_schedule.json`` (anche ``.gz``)
+        columnar: Se True le specialità restano PatientTable, altrimenti
+            liste di Patient
+        codec: Codec da usare (default ``Settings.json_codec``)
+    """
+    schedule = PatientListForSpecialties()
+    for specialty, patients in decode_schedule(read_bytes(path), codec, columnar).items():
+        if specialty not in schedule.list:
+            raise ValueError(f"Chiave non valida: {specialty}")
+        schedule[specialty] = patients
+    return schedule
+#endregion
@@ -0,0 +1,278 @@
+"""Scrittura e lettura in streaming dei file JSON dei risultati.
+
+``write_json`` serializza direttamente le strutture vive (dict, liste,
+PatientListForSpecialties, ScheduleSnapshot, PatientTable, generatori, ...)
+scrivendo il testo a pezzi: non viene costruito né l'albero di dict
+parallelo di ``to_dict()`` né l'intera stringa JSON. Con ``indent=4`` il
+file è identico a quello di ``json.dump(..., indent=4)``; con
+``indent=None`` è compatto.
+
+``iter_json_lists`` legge un file ``{chiave: [elemento, ...]}`` un
+elemento alla volta, qualunque sia l'indentazione.
+
+I file con suffisso ``.gz`` sono letti e scritti compressi con gzip.
+"""
+
+import gzip
+import json
+import os
+import re
+import sys
+
+if os.path.basename(__file__) != "main.py":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../', 'Code')))
+
+# Contenitori con meno elementi di così sono codificati in un colpo solo
+_STREAM_MIN_ITEMS = 64
+# Elementi semplici consecutivi di una lista codificati con una sola chiamata
+_BATCH_ITEMS = 512
+# Caratteri letti a ogni rifornimento del buffer del lettore
+_READ_CHUNK = 1 << 16
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+# Classi i cui oggetti si scrivono con to_dict() (es. Patient), per tipo
+_RECORD_TYPES = {}
+
+
+def json_path(path: str, compress: bool = False) -> str:
+    """Percorso effettivo del file: con ``compress`` aggiunge il suffisso ``.gz``."""
+    if compress and not path.endswith(".gz"):
+        return path + ".gz"
+    return path
+
+
+def find_json(path: str) -> str:
+    """Percorso esistente tra ``path`` e ``path.gz`` (``path`` se nessuno dei due)."""
+    if not os.path.exists(path) and os.path.exists(path + ".gz"):
+        return path + ".gz"
+    return path
+
+
+def open_json(path: str, mode: str = "r"):
+    """Apre un file JSON in modalità testo, compresso se termina con ``.gz``."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+#region: Scrittura
+def _is_record(value) -> bool:
+    """True per gli oggetti non iterabili con ``to_dict`` (es. Patient)."""
+    cls = type(value)
+    if cls not in _RECORD_TYPES:
+        _RECORD_TYPES[cls] = hasattr(cls, "to_dict") and not hasattr(cls, "__iter__")
+    return _RECORD_TYPES[cls]
+
+
+def _plain(value):
+    """Converte scalari NumPy e oggetti con ``to_dict`` in valori JSON."""
+    if isinstance(value, _PRIMITIVES):
+        return value
+    if _is_record(value):
+        return value.to_dict()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def _is_small(value) -> bool:
+    """True se il contenitore può essere codificato in un colpo solo."""
+    if isinstance(value, dict):
+        return len(value) < _STREAM_MIN_ITEMS and all(
+            isinstance(v, _PRIMITIVES) for v in value.values()
+        )
+    if isinstance(value, (list, tuple)):
+        return len(value) < _STREAM_MIN_ITEMS and all(
+            isinstance(v, _PRIMITIVES) for v in value
+        )
+    return False
+
+
+def iter_json(value, indent: int | None = 4, level: int = 0, encode_batch=None):
+    """Genera il testo JSON di ``value`` a pezzi (stesso formato di ``json.dumps``).
+
+    ``encode_batch`` (solo senza indentazione) codifica in forma compatta
+    le liste di record raggruppati, ad es. con un codec più veloce.
+    """
+    encoder = json.JSONEncoder(
+        indent=indent, separators=(",", ": ") if indent is not None else (",", ":")
+    )
+    if indent is not None or encode_batch is None:
+        encode_batch = encoder.encode
+    return _iter_value(value, encoder, indent, level, encode_batch)
+
+
+def _iter_value(value, encoder, indent, level, encode_batch):
+    value = _plain(value)
+    if isinstance(value, _PRIMITIVES) or _is_small(value):
+        text = encoder.encode(value)
+        if indent is not None and level:
+            # Rientro delle righe interne al livello corrente
+            text = text.replace("\n", "\n" + " " * (indent * level))
+        yield text
+    elif hasattr(value, "items"):
+        yield from _iter_object(value, encoder, indent, level, encode_batch)
+    else:
+        yield from _iter_array(value, encoder, indent, level, encode_batch)
+
+
+def _paddings(indent, level):
+    """Rientri (a capo compreso) di chiusura e degli elementi del contenitore."""
+    if indent is None:
+        return "", ""
+    return "\n" + " " * (indent * level), "\n" + " " * (indent * (level + 1))
+
+
+def _iter_object(value, encoder, indent, level, encode_batch):
+    newline, inner = _paddings(indent, level)
+    first = True
+    for key, item in value.items():
+        yield ("{" if first else encoder.item_separator) + inner + encoder.encode(str(key)) + encoder.key_separator
+        yield from _iter_value(item, encoder, indent, level + 1, encode_batch)
+        first = False
+    yield "{}" if first else newline + "}"
+
+
+def _iter_array(value, encoder, indent, level, encode_batch):
+    newline, inner = _paddings(indent, level)
+    first = True
+    batch = []
+
+    def flush():
+        # Codifica il gruppo come lista e ne tiene solo gli elementi
+        text = encode_batch(batch)
+        if indent is not None:
+            text = text.replace("\n", newline)
+        return ("[" if first else encoder.item_separator) + text[1:len(text) - len(newline) - 1]
+
+    for item in value:
+        if _is_record(item):
+            # I record (to_dict piatto) vanno direttamente nel gruppo
+            batch.append(item.to_dict())
+            if len(batch) == _BATCH_ITEMS:
+                yield flush()
+                batch, first = [], False
+            continue
+        item = _plain(item)
+        if isinstance(item, _PRIMITIVES) or _is_small(item):
+            batch.append(item)
+            if len(batch) == _BATCH_ITEMS:
+                yield flush()
+                batch, first = [], False
+            continue
+        if batch:
+            yield flush()
+            batch, first = [], False
+        yield ("[" if first else encoder.item_separator) + inner
+        yield from _iter_value(item, encoder, indent, level + 1, encode_batch)
+        first = False
+    if batch:
+        yield flush()
+        first = False
+    yield "[]" if first else newline + "]"
+
+
+def write_json(value, path: str, indent: int | None = 4, codec: str | None = None) -> str:
+    """Scrive ``value`` in ``path`` in streaming; gzip se ``path`` termina con ``.gz``.
+
+    Args:
+        codec: Codec di CommonClass.JsonCodec per i gruppi di record
+            nell'output compatto (None = modulo json standard)
+
+    Returns:
+        Il percorso del file scritto
+    """
+    encode_batch = None
+    if indent is None and codec is not None:
+        # Import locale: JsonCodec dipende da PatientListForSpecialties
+        from CommonClass.JsonCodec import dumps, get_codec
+
+        codec = get_codec(codec)
+        if codec != "json":
+            encode_batch = lambda batch: dumps(batch, codec)
+
+    with open_json(path, "w") as f:
+        f.writelines(iter_json(value, indent, encode_batch=encode_batch))
+    return path
+#endregion
+
+
+#region: Lettura
+def iter_json_lists(path: str):
+    """Legge un file ``{chiave: [elemento, ...]}`` un elemento alla volta.
+
+    Yields:
+        Coppie (chiave, elemento) nell'ordine del file; le liste vuote
+        producono la coppia (chiave, None) così che la chiave non vada persa.
+    """
+    decoder = json.JSONDecoder()
+    with open_json(path, "r") as f:
+        reader = _Buffer(f)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            key = reader.decode(decoder)
+            reader.expect(":")
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.expect("]")
+                yield key, None
+            else:
+                while True:
+                    yield key, reader.decode(decoder)
+                    if reader.next_of(",]") == "]":
+                        break
+            if reader.next_of(",}") == "}":
+                return
+
+
+class _Buffer:
+    """Buffer di testo rifornito a blocchi per ``iter_json_lists``."""
+
+    def __init__(self, f):
+        self.f = f
+        self.text = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(_READ_CHUNK)
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return bool(chunk)
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self._fill():
+                raise ValueError("Fine del file JSON inattesa")
+
+    def next_of(self, allowed: str) -> str:
+        char = self.peek()
+        if char not in allowed:
+            raise ValueError(f"JSON non valido: atteso uno tra {allowed!r}, trovato {char!r}")
+        self.pos += 1
+        return char
+
+    def expect(self, char: str) -> None:
+        self.next_of(char)
+
+    def decode(self, decoder):
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Un numero alla fine del buffer potrebbe essere troncato
+            if end == len(self.text) and self._fill():
+                continue
+            self.pos = end
+            return value
+#endregion
@@ -11,6 +11,9 @@ if os.path.basename(__file__) != "main.py":
 
 @dataclass
 class Patient:
+    # Niente __dict__ per istanza: meno memoria e copie più veloci
+    __slots__ = ("id", "eot", "rot", "day", "mtb", "opDay", "workstation", "overdue")
+
     def __init__(self, id: int, eot: float, day: int, mtb: int,
         rot: float = None, opDay = -1, workstation: int = -1, overdue: bool = False):
         self.id = id
@@ -28,6 +31,17 @@ class Patient:
 
     # def __hash__(self):
     #     return hash((self.id, self.day))
+
+    # Tutti i campi sono scalari immutabili: la copia profonda coincide con
+    # quella superficiale e non serve passare dal meccanismo generico di copy
+    def __copy__(self):
+        return Patient(self.id, self.eot, self.day, self.mtb, self.rot,
+                       self.opDay, self.workstation, self.overdue)
+
+    def __deepcopy__(self, memo):
+        clone = self.__copy__()
+        memo[id(self)] = clone
+        return clone
     #endregion
 
 
@@ -4,11 +4,14 @@ import os
 if os.path.basename(__file__) != "main.py":
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../', 'Code')))
 
+from CommonClass.JsonStream import iter_json_lists
 from CommonClass.Patient import Patient
+from CommonClass.PatientTable import PatientTable
 
 
 class PatientListForSpecialties: #PLFS 
-    """ Classe per gestire le liste di pazienti e liste di settimane create dividendole per specialità    """
+    """ Classe per gestire le liste di pazienti e liste di settimane create dividendole per specialità.
+    Ogni specialità può contenere una lista di Patient oppure una PatientTable (formato colonnare). """
     def __init__(self):
         self.list = {
             "Specialty A": [],
@@ -29,6 +32,29 @@ class PatientListForSpecialties: #PLFS
     def keys(self):
         return self.list.keys()
 
+    def copy(self):
+        """ Copia superficiale: liste nuove, pazienti condivisi """
+        obj = PatientListForSpecialties()
+        for key, values in self.list.items():
+            obj[key] = values.copy()
+        return obj
+
+    #region: Formato colonnare
+    def to_tables(self):
+        """ Nuova istanza con una PatientTable per ogni specialità """
+        obj = PatientListForSpecialties()
+        for key, values in self.list.items():
+            obj[key] = values.copy() if isinstance(values, PatientTable) else PatientTable.from_patients(values)
+        return obj
+
+    def to_lists(self):
+        """ Nuova istanza con una lista di Patient per ogni specialità """
+        obj = PatientListForSpecialties()
+        for key, values in self.list.items():
+            obj[key] = values.to_patients() if isinstance(values, PatientTable) else list(values)
+        return obj
+    #endregion
+
     #region: Funzioni Json
     def to_dict(self):
         return {
@@ -40,12 +66,27 @@ class PatientListForSpecialties: #PLFS
         }
 
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, columnar=False):
         obj = cls()
         for key, value in data.items():
             if key not in obj.list:
                 raise ValueError(f"Chiave non valida: {key}")
-            obj[key] = [Patient.from_dict(p) for p in value]
+            obj[key] = PatientTable.from_dict(value) if columnar else [Patient.from_dict(p) for p in value]
+        return obj
+
+    @classmethod
+    def load(cls, path, columnar=False):
+        """ Come from_dict, leggendo il file JSON (anche .gz) un paziente alla volta """
+        obj = cls()
+        patients = {}
+        for key, value in iter_json_lists(str(path)):
+            if key not in obj.list:
+                raise ValueError(f"Chiave non valida: {key}")
+            patients.setdefault(key, [])
+            if value is not None:
+                patients[key].append(Patient.from_dict(value))
+        for key, values in patients.items():
+            obj[key] = PatientTable.from_patients(values) if columnar else values
         return obj
     
         
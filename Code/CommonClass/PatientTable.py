@@ -0,0 +1,132 @@
+import math
+import sys
+import os
+
+import numpy as np
+
+if os.path.basename(__file__) != "main.py":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../', 'Code')))
+
+from CommonClass.Patient import Patient
+
+
+# Colonne della tabella e relativi dtype (ROT mancante = NaN)
+_COLUMNS = {
+    "id": np.int32,
+    "eot": np.float64,
+    "rot": np.float64,
+    "day": np.int32,
+    "mtb": np.int32,
+    "opDay": np.int32,
+    "workstation": np.int16,
+    "overdue": np.bool_,
+}
+
+# Valori di default delle colonne non fornite (come nel costruttore di Patient)
+_DEFAULTS = {"rot": np.nan, "opDay": -1, "workstation": -1, "overdue": False}
+
+
+class PatientTable:
+    """Lista di pazienti in formato colonnare (struct-of-arrays).
+
+    Ogni campo di Patient è un array NumPy: una riga costa ~35 byte contro le
+    centinaia di un oggetto Patient con i suoi scalari Python, e copiare la
+    tabella è una copia di array. Le righe diventano oggetti Patient solo
+    quando servono (indicizzazione con un intero o iterazione), quindi la
+    tabella può sostituire una lista di Patient in PatientListForSpecialties.
+
+    L'indicizzazione con uno slice restituisce una vista (nessuna copia);
+    con una maschera booleana o una lista di indici restituisce una copia.
+    """
+
+    __slots__ = tuple(_COLUMNS)
+
+    def __init__(self, columns: dict | None = None, length: int = 0):
+        columns = columns or {}
+        if columns:
+            length = len(next(iter(columns.values())))
+        for name, dtype in _COLUMNS.items():
+            if name in columns:
+                array = np.asarray(columns[name], dtype=dtype)
+            elif name in _DEFAULTS:
+                array = np.full(length, _DEFAULTS[name], dtype=dtype)
+            else:
+                raise ValueError(f"Colonna obbligatoria mancante: {name}")
+            if len(array) != length:
+                raise ValueError(f"Lunghezza della colonna {name} diversa dalle altre")
+            setattr(self, name, array)
+
+    #region: Costruzione e conversione
+    @classmethod
+    def from_patients(cls, patients) -> "PatientTable":
+        patients = list(patients)
+        columns = {name: [getattr(p, name) for p in patients] for name in _COLUMNS}
+        columns["rot"] = [np.nan if rot is None else rot for rot in columns["rot"]]
+        return cls(columns, len(patients))
+
+    @classmethod
+    def from_columns(cls, **columns) -> "PatientTable":
+        """Tabella da array già colonnari (es. ``split_table_by_specialty``)."""
+        return cls({name: columns[name] for name in _COLUMNS if name in columns})
+
+    def to_patients(self) -> list:
+        """Materializza tutte le righe come oggetti Patient."""
+        rows = zip(*(getattr(self, name).tolist() for name in _COLUMNS))
+        return [
+            Patient(pid, eot, day, mtb, None if math.isnan(rot) else rot, op_day, workstation, overdue)
+            for pid, eot, rot, day, mtb, op_day, workstation, overdue in rows
+        ]
+
+    def row(self, index: int) -> Patient:
+        """Materializza una sola riga come Patient."""
+        rot = float(self.rot[index])
+        return Patient(
+            int(self.id[index]),
+            float(self.eot[index]),
+            int(self.day[index]),
+            int(self.mtb[index]),
+            None if np.isnan(rot) else rot,
+            int(self.opDay[index]),
+            int(self.workstation[index]),
+            bool(self.overdue[index]),
+        )
+    #endregion
+
+    #region: Accesso
+    def __len__(self):
+        return len(self.id)
+
+    def __iter__(self):
+        return iter(self.to_patients())
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.row(key)
+        return PatientTable({name: getattr(self, name)[key] for name in _COLUMNS})
+
+    def columns(self) -> dict:
+        return {name: getattr(self, name) for name in _COLUMNS}
+
+    def copy(self) -> "PatientTable":
+        return PatientTable({name: getattr(self, name).copy() for name in _COLUMNS})
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in _COLUMNS)
+    #endregion
+
+    #region: Funzioni Json
+    def to_dict(self):
+        return [p.to_dict() for p in self.to_patients()]
+
+    def to_json(self):
+        return self.to_dict()
+
+    @classmethod
+    def from_dict(cls, data):
+        # Colonne costruite direttamente dai dict, senza oggetti Patient
+        rows = list(data)
+        columns = {name: [row[name] for row in rows] for name in _COLUMNS}
+        columns["rot"] = [np.nan if rot is None else rot for rot in columns["rot"]]
+        return cls(columns, len(rows))
+    #endregion
@@ -0,0 +1,104 @@
+import sys
+import os
+
+import numpy as np
+
+if os.path.basename(__file__) != "main.py":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../', 'Code')))
+
+from CommonClass.Patient import Patient
+
+
+class ScheduleSnapshot:
+    """Versione immutabile di uno schedule, senza copiare i pazienti.
+
+    Lo snapshot tiene un riferimento ai record base dei pazienti (id, eot,
+    rot, day, mtb), condivisi con le altre versioni dello schedule, e salva
+    a parte solo i campi che cambiano tra le versioni: opDay, workstation e
+    overdue, in array NumPy. I record base non vengono mai modificati.
+
+    Uno stesso paziente può comparire più volte (es. ripianificato in più
+    settimane); l'iterazione restituisce oggetti Patient nuovi, costruiti
+    al momento a partire da record base e delta.
+    """
+
+    __slots__ = ("_records", "_opDay", "_workstation", "_overdue")
+
+    def __init__(self, records=(), opDay=(), workstation=(), overdue=()):
+        self._records = tuple(records)
+        self._opDay = np.asarray(opDay, dtype=np.int32)
+        self._workstation = np.asarray(workstation, dtype=np.int16)
+        self._overdue = np.asarray(overdue, dtype=np.bool_)
+        if not len(self._records) == len(self._opDay) == len(self._workstation) == len(self._overdue):
+            raise ValueError("Record base e delta di lunghezza diversa")
+
+    #region: Costruzione
+    @classmethod
+    def capture(cls, patients, records: dict | None = None) -> "ScheduleSnapshot":
+        """Fotografa lo stato attuale di ``patients``.
+
+        Args:
+            patients: Pazienti dello schedule (non vengono referenziati se
+                ``records`` contiene il loro record base)
+            records: Record base per id (es. la lista d'attesa); se un id
+                manca, il record base è il paziente stesso
+        """
+        patients = list(patients)
+        records = records or {}
+        return cls(
+            [records.get(p.id, p) for p in patients],
+            [p.opDay for p in patients],
+            [p.workstation for p in patients],
+            [p.overdue for p in patients],
+        )
+
+    @classmethod
+    def concat(cls, snapshots) -> "ScheduleSnapshot":
+        """Snapshot unico con le righe degli snapshot dati, nell'ordine."""
+        snapshots = list(snapshots)
+        if not snapshots:
+            return cls()
+        return cls(
+            [record for snapshot in snapshots for record in snapshot._records],
+            np.concatenate([snapshot._opDay for snapshot in snapshots]),
+            np.concatenate([snapshot._workstation for snapshot in snapshots]),
+            np.concatenate([snapshot._overdue for snapshot in snapshots]),
+        )
+    #endregion
+
+    #region: Accesso
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        for record, op_day, workstation, overdue in zip(
+            self._records,
+            self._opDay.tolist(),
+            self._workstation.tolist(),
+            self._overdue.tolist(),
+        ):
+            yield Patient(record.id, record.eot, record.day, record.mtb, record.rot,
+                          op_day, workstation, overdue)
+
+    def __getitem__(self, index: int) -> Patient:
+        record = self._records[index]
+        return Patient(record.id, record.eot, record.day, record.mtb, record.rot,
+                       int(self._opDay[index]), int(self._workstation[index]),
+                       bool(self._overdue[index]))
+
+    def to_patients(self) -> list:
+        return list(self)
+
+    @property
+    def delta_nbytes(self) -> int:
+        """Byte occupati dai soli delta (i record base sono condivisi)."""
+        return self._opDay.nbytes + self._workstation.nbytes + self._overdue.nbytes
+    #endregion
+
+    #region: Funzioni Json
+    def to_dict(self):
+        return [p.to_dict() for p in self]
+
+    def to_json(self):
+        return self.to_dict()
+    #endregion
@@ -0,0 +1,185 @@
+"""Uscita dei grafici come dashboard: JSON compatti e una sola copia di plotly.js.
+
+Con ``Settings.graph_output == "dashboard"`` Graphs non scrive un HTML
+autonomo per ogni figura (che incorpora ogni volta l'intera libreria
+plotly.js, ~4.6 MiB) ma:
+- un file ``<nome>.json`` compatto per figura (solo dati e layout)
+- un manifest ``figures.json`` per cartella del seed, con grafico,
+  specialità e scenario di ogni figura (write_seed_manifest)
+- nella cartella radice dei risultati, una sola copia di plotly.js e una
+  pagina ``index.html`` che elenca le figure di tutti i seed e le carica
+  solo quando vengono scelte (write_dashboard)
+
+La pagina carica i JSON con fetch(), che i browser bloccano sui file
+locali: va aperta tramite un server, ad es.
+    python -m http.server --directory Data
+"""
+
+import html
+import json
+import os
+import sys
+from pathlib import Path
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+if os.path.basename(__file__) != "main.py":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../", "Code")))
+
+MANIFEST_NAME = "figures.json"
+INDEX_NAME = "index.html"
+
+
+def _write_atomic(path, text: str) -> None:
+    """Scrive su un file temporaneo e rinomina: più processi (sweep) possono
+    aggiornare lo stesso file senza lasciarlo troncato."""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temporary, path)
+
+
+def write_figure_json(fig, path: str) -> str:
+    """Scrive la figura (go.Figure o dict {"data", "layout"}) come JSON compatto."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(pio.to_json(fig, validate=False, pretty=False))
+    return path
+
+
+def write_seed_manifest(seed_folder: str, seed, figures_by_scenario: dict) -> str:
+    """Manifest delle figure di un seed.
+
+    Args:
+        seed_folder: Cartella del seed (i percorsi sono salvati relativi a essa)
+        seed: Seed della run
+        figures_by_scenario: {scenario: Graphs.figures}
+    """
+    entries = [
+        {
+            "scenario": scenario,
+            "chart": figure["chart"],
+            "specialty": figure["specialty"] or "",
+            "path": Path(os.path.relpath(figure["path"], seed_folder)).as_posix(),
+        }
+        for scenario, figures in figures_by_scenario.items()
+        for figure in figures
+    ]
+    path = os.path.join(seed_folder, MANIFEST_NAME)
+    _write_atomic(path, json.dumps({"seed": seed, "figures": entries}, indent=1))
+    return path
+
+
+def _plotlyjs_asset(root: Path) -> str:
+    """Nome della copia condivisa di plotly.js in ``root``, scritta se manca."""
+    name = f"plotly-{get_plotlyjs_version()}.min.js"
+    if not (root / name).exists():
+        _write_atomic(root / name, get_plotlyjs())
+    return name
+
+
+def write_dashboard(root) -> str | None:
+    """Scrive plotly.js e ``index.html`` in ``root`` con le figure dei manifest trovati.
+
+    Returns:
+        Il percorso di index.html, oppure None se sotto ``root`` non ci
+        sono manifest (grafici scritti come HTML autonomi)
+    """
+    root = Path(root)
+    entries = []
+    for manifest in sorted(root.rglob(MANIFEST_NAME)):
+        try:
+            with open(manifest, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # Manifest in scrittura da un'altra run: sarà incluso dalla prossima
+            continue
+        folder = manifest.parent.relative_to(root)
+        for entry in data["figures"]:
+            entries.append({
+                **entry,
+                "seed": str(data["seed"]),
+                "path": (folder / entry["path"]).as_posix(),
+            })
+    if not entries:
+        return None
+
+    page = _INDEX_TEMPLATE.format(
+        title=html.escape(root.resolve().name),
+        plotlyjs=_plotlyjs_asset(root),
+        manifest=json.dumps(entries).replace("</", "<\\/"),
+    )
+    path = root / INDEX_NAME
+    _write_atomic(path, page)
+    return str(path)
+
+
+_INDEX_TEMPLATE = """<!DOCTYPE html>
+<html lang="it">
+<head>
+<meta charset="utf-8">
+<title>Grafici - {title}</title>
+<script src="{plotlyjs}"></script>
+<style>
+  body {{ font-family: Arial, sans-serif; margin: 16px; }}
+  label {{ margin-right: 16px; }}
+  #stato {{ color: #b91c1c; margin: 8px 0; }}
+</style>
+</head>
+<body>
+<div>
+  <label>Seed <select id="seed"></select></label>
+  <label>Scenario <select id="scenario"></select></label>
+  <label>Grafico <select id="chart"></select></label>
+  <label>Specialità <select id="specialty"></select></label>
+</div>
+<div id="stato"></div>
+<div id="figura"></div>
+<script>
+const FIGURE = {manifest};
+const CAMPI = ["seed", "scenario", "chart", "specialty"];
+
+function valori(campo, filtro) {{
+  const visti = [];
+  for (const f of FIGURE) {{
+    if (Object.entries(filtro).every(([k, v]) => f[k] === v) && !visti.includes(f[campo])) visti.push(f[campo]);
+  }}
+  if (campo === "seed") visti.sort((a, b) => Number(a) - Number(b) || a.localeCompare(b));
+  return visti;
+}}
+
+// Ogni menu offre solo i valori compatibili con le scelte precedenti
+function aggiorna(daIndice) {{
+  const filtro = {{}};
+  CAMPI.forEach((campo, i) => {{
+    const menu = document.getElementById(campo);
+    if (i >= daIndice) {{
+      const scelto = menu.value;
+      const opzioni = valori(campo, filtro);
+      menu.innerHTML = opzioni.map(v => `<option value="${{v}}">${{v || "-"}}</option>`).join("");
+      if (opzioni.includes(scelto)) menu.value = scelto;
+    }}
+    filtro[campo] = menu.value;
+  }});
+  const figura = FIGURE.find(f => CAMPI.every(c => f[c] === filtro[c]));
+  if (figura) carica(figura.path);
+}}
+
+function carica(percorso) {{
+  const stato = document.getElementById("stato");
+  stato.textContent = "";
+  fetch(encodeURI(percorso))
+    .then(r => {{ if (!r.ok) throw new Error(r.status); return r.json(); }})
+    .then(fig => Plotly.react("figura", fig.data, fig.layout))
+    .catch(e => {{
+      stato.textContent = `Impossibile caricare ${{percorso}} (${{e}}). ` +
+        "Apri la pagina tramite un server, es. python -m http.server";
+    }});
+}}
+
+CAMPI.forEach((campo, i) => document.getElementById(campo).addEventListener("change", () => aggiorna(i + 1)));
+aggiorna(0);
+</script>
+</body>
+</html>
+"""
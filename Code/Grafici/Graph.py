@@ -10,14 +10,17 @@ Gestisce la visualizzazione dei dati di schedulazione operatoria attraverso:
 
 from __future__ import annotations
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import copy
 import json
 import logging
 import os
 import sys
+import time
 
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 
 if os.path.basename(__file__) != "main.py":
@@ -25,8 +28,13 @@ if os.path.basename(__file__) != "main.py":
         os.path.abspath(os.path.join(os.path.dirname(__file__), "../../", "Code"))
     )
 
+from CommonClass.JsonStream import json_path, write_json
 from CommonClass.PatientListForSpecialties import PatientListForSpecialties
 from CommonClass.Patient import Patient
+from Grafici.Dashboard import write_figure_json
+from Grafici.GraphDataStore import dataset_columns, store_dataset
+from Grafici.Kpi import comparison_kpis, is_scenario_aggregates
+from Grafici.Occupancy import DayRoomOccupancy, build_occupancy
 from settings import Settings
 
 START_WEEK_SCHEDULING = Settings.start_week_scheduling
@@ -36,13 +44,22 @@ WEEKLY_EXTRA_TIME_POOL = Settings.weekly_extra_time_pool
 
 logger = logging.getLogger(__name__)
 
+_GRAPH_TIMINGS_FILE = "graph_timings.json"
+
 def CreateScheduleWithReplanned(schedule: dict, plan_eot_input: dict | None) -> dict:
     """Crea una nuova istanza dello schedule integrando i dati di pianificazione EOT.
 
     Risolve anche il problema dei pazienti (come l'ID 1398) presenti SOLO nel piano
     di ripianificazione (plan_eot) e originariamente assenti dallo schedule di base.
+
+    Lo schedule originale non viene modificato (copy-on-write): le liste sono
+    nuove, i pazienti non ripianificati sono condivisi e solo quelli aggiornati
+    dal piano vengono copiati.
     """
-    cloned_schedule = copy.deepcopy(schedule)
+    if isinstance(schedule, PatientListForSpecialties):
+        cloned_schedule = schedule.copy()
+    else:
+        cloned_schedule = {op: list(patients) for op, patients in schedule.items()}
 
     if not plan_eot_input:
         return cloned_schedule
@@ -70,7 +87,7 @@ def CreateScheduleWithReplanned(schedule: dict, plan_eot_input: dict | None) ->
         updated_patients = []
         seen_ids = set()
 
-        # 3. Aggiornamento dei pazienti ESISTENTI nello schedule originale
+        # 3. Aggiornamento dei pazienti ESISTENTI (su una copia del record)
         for p in patients:
             is_dict = isinstance(p, dict)
             p_id = p.get("id") if is_dict else getattr(p, "id", None)
@@ -82,8 +99,9 @@ def CreateScheduleWithReplanned(schedule: dict, plan_eot_input: dict | None) ->
 
             if p_id_str in latest_plan_by_id:
                 pp = latest_plan_by_id[p_id_str]
+                p = dict(p) if is_dict else copy.copy(p)
 
-                # Aggiorna i campi del record esistente
+                # Aggiorna i campi della copia del record
                 if is_dict:
                     p["opDay"] = pp.get("opDay", p.get("opDay"))
                     p["workstation"] = pp.get("workstation", p.get("workstation"))
@@ -129,15 +147,16 @@ def CreateScheduleWithReplanned(schedule: dict, plan_eot_input: dict | None) ->
                     updated_patients.append(new_p)
                 else:
                     try:
-                        new_p = copy.deepcopy(patients[0])
-                        new_p.id = pp.get("id")
-                        new_p.opDay = pp.get("opDay", -1)
-                        new_p.workstation = pp.get("workstation", 0)
-                        new_p.eot = float(pp.get("eot", 0) or 0)
-                        new_p.rot = float(pp.get("rot", 0) or 0)
-                        new_p.day = pp.get("day", 0)
-                        new_p.mtb = pp.get("mtb", 0)
-                        new_p.overdue = pp.get("overdue", False)
+                        new_p = Patient(
+                            id=pp.get("id"),
+                            eot=float(pp.get("eot", 0) or 0),
+                            day=pp.get("day", 0),
+                            mtb=pp.get("mtb", 0),
+                            rot=float(pp.get("rot", 0) or 0),
+                            opDay=pp.get("opDay", -1),
+                            workstation=pp.get("workstation", 0),
+                            overdue=pp.get("overdue", False),
+                        )
                         updated_patients.append(new_p)
                     except Exception:
                         pass
@@ -167,6 +186,17 @@ class Graphs:
             os.makedirs(folderPath)
         self.folderPath = folderPath
         self.graph_data_log_path = os.path.join(self.folderPath, "graph_data_log.jsonl")
+        self.log_graph_data = Settings.graph_data_log
+        # Figure scritte in modalità dashboard: {"path", "chart", "specialty"}
+        self.figures = []
+        # Occupazione per giorno e sala dell'ultimo schedule di MakeGraphs
+        self.occupancy = None
+        # Tempi di MakeGraphs per figura: {"chart", "specialty", "seconds"}
+        self.timings = []
+        # Se non None, le righe del log dei dati vi sono accumulate invece che scritte
+        self._log_lines = None
+        # Hash dei dataset già salvati in graph_data/
+        self._stored_datasets = set()
 
     #region: Funzioni interne
     @staticmethod
@@ -223,7 +253,11 @@ class Graphs:
         plan_entries: list[dict] | None = None,
         extra: dict[str, str | int | float | bool] | None = None,
     ) -> None:
-        """Registra un snapshot dei dati usati per generare un grafico."""
+        """Registra un snapshot dei dati usati per generare un grafico.
+
+        Pazienti e voci del piano sono salvati una sola volta per contenuto
+        (Grafici/GraphDataStore.py): la riga del log ne riporta l'hash.
+        """
         if not self.log_graph_data:
             return
 
@@ -233,54 +267,48 @@ class Graphs:
             "plan_entries_count": len(plan_entries or []),
         }
 
-        if patients is not None:
-            payload["patients"] = [
-                {
-                    "id": self._get_patient_value(p, "id"),
-                    "day": self._get_patient_value(p, "day"),
-                    "opDay": self._get_patient_value(p, "opDay", -1),
-                    "workstation": self._get_patient_value(p, "workstation", -1),
-                    "eot": self._get_patient_value(p, "eot"),
-                    "rot": self._get_patient_value(p, "rot"),
-                    "mtb": self._get_patient_value(p, "mtb"),
-                }
-                for p in patients
-            ]
-
-        if plan_entries is not None:
-            payload["plan_entries"] = [
-                {
-                    "id": entry.get("id"),
-                    "day": entry.get("day"),
-                    "opDay": entry.get("opDay", -1),
-                    "workstation": entry.get("workstation", -1),
-                    "eot": entry.get("eot"),
-                    "rot": entry.get("rot"),
-                    "mtb": entry.get("mtb"),
-                }
-                for entry in plan_entries
-            ]
+        folder = os.path.dirname(self.graph_data_log_path) if self.graph_data_log_path else self.folderPath
+        for key, rows in (("patients", patients), ("plan_entries", plan_entries)):
+            if rows is not None:
+                payload[key] = store_dataset(folder, dataset_columns(rows), self._stored_datasets)
 
         if extra:
             payload["extra"] = extra
 
         log_line = json.dumps(payload, ensure_ascii=False, default=str)
         logger.info("Graph data snapshot: %s", log_line)
+        self._write_log_lines([log_line])
 
-        if self.graph_data_log_path:
+    def _write_log_lines(self, log_lines: list[str]) -> None:
+        """Aggiunge righe al log dei dati (o al buffer di un worker di MakeGraphs)."""
+        if self._log_lines is not None:
+            self._log_lines.extend(log_lines)
+        elif self.graph_data_log_path and log_lines:
             with open(self.graph_data_log_path, "a", encoding="utf-8") as handle:
-                handle.write(log_line + "\n")
+                handle.writelines(line + "\n" for line in log_lines)
 
-    def _show_figure(self, fig: go.Figure, name: str = "grafico") -> None:
-        """Salva il grafico in HTML e opzionalmente lo visualizza.     
+    def _show_figure(self, fig: go.Figure | dict, name: str = "grafico", specialty: str | None = None) -> None:
+        """Salva il grafico in HTML (o in JSON compatto) e opzionalmente lo visualizza.
         Args:
-            fig: Figura Plotly da salvare
-            name: Nome del file HTML (senza estensione)
+            fig: Figura Plotly da salvare, oppure un dict {"data", "layout"}
+                costruito senza go (scritto senza validazione)
+            name: Nome del file (senza estensione)
+            specialty: Specialità del grafico, per il manifest della dashboard
         """
-        
-        fig.write_html(f"{self.folderPath}/{name}.html")
+        if Settings.graph_output == "dashboard":
+            path = write_figure_json(fig, os.path.join(self.folderPath, f"{name}.json"))
+            chart = name.removesuffix(f"_{specialty}") if specialty else name
+            self.figures.append({"path": path, "chart": chart, "specialty": specialty})
+        elif isinstance(fig, dict):
+            pio.write_html(fig, f"{self.folderPath}/{name}.html", validate=False)
+        else:
+            fig.write_html(f"{self.folderPath}/{name}.html")
+
         if self.ShowFigures:
-            fig.show()
+            if isinstance(fig, dict):
+                pio.show(fig, validate=False)
+            else:
+                fig.show()
 
     def _get_color_map(self, ids: list[int]) -> dict[int, str]:
         """Genera una mappa colori progressiva HSL per gli ID pazienti.
@@ -318,53 +346,53 @@ class Graphs:
         }
 
     def _get_free_time_per_day(
-        self, patients: list, day: int, metric: str = "eot"
-    ) -> float:
+        self, occupancy: DayRoomOccupancy, days: range, metric: str = "eot"
+    ) -> list[float]:
         """
-        Calcola il tempo libero in una sala per un determinato giorno.
+        Calcola il tempo libero di una specialità per ciascun giorno di un intervallo.
         Args:
-            patients: Lista pazienti della sala
-            day: Numero del giorno
+            occupancy: Occupazione per giorno e sala della specialità
+            days: Intervallo di giorni
             metric: Metrica da usare ('eot' o 'rot')
 
         Returns:
-            Tempo libero in minuti
+            Tempo libero in minuti per giorno
         """
-        daily_patients = [p for p in patients if p.opDay == day]
-        time_used = sum(getattr(p, metric, 0) for p in daily_patients)
-        return DAILY_OPERATION_LIMIT - time_used
+        time_used = occupancy.days(f"day_{metric}", days.start, days.stop)
+        return (DAILY_OPERATION_LIMIT - time_used).tolist()
 
     #endregion: Funzioni interne
     #region: Funzioni dei grafici 
     
-    def BoxPlotUnusedTime(self, weeks: PatientListForSpecialties, title: str) -> None:
+    def BoxPlotUnusedTime(
+        self,
+        weeks: PatientListForSpecialties,
+        title: str,
+        occupancy: dict[str, DayRoomOccupancy] | None = None,
+    ) -> None:
         """Crea un box plot del tempo inutilizzato per settimana e per sala operatoria.
         
         Args:
             weeks: PatientListForSpecialties con i dati dei pazienti
             title: Titolo del grafico
+            occupancy: Occupazione per giorno e sala di ``weeks`` (build_occupancy),
+                calcolata qui se non fornita
         """
         
         data = []
+        if occupancy is None:
+            occupancy = build_occupancy(weeks)
 
-        for op, patients in weeks.items():
-            if not patients:
-                continue
-
+        for op, op_occupancy in occupancy.items():
             # Calcolo ultimo giorno e numero settimane
-            last_week = (
-                max((p.opDay for p in patients), default=0) // WEEK_LENGTH_DAYS
-            )
+            last_week = op_occupancy.last_day // WEEK_LENGTH_DAYS
 
             for weekNum in range(last_week + 1):
                 # Calcola tempo libero per ogni giorno della settimana
-                unused_times = [
-                    self._get_free_time_per_day(patients, day)
-                    for day in range(
-                        weekNum * WEEK_LENGTH_DAYS,
-                        (weekNum + 1) * WEEK_LENGTH_DAYS,
-                    )
-                ]
+                unused_times = self._get_free_time_per_day(
+                    op_occupancy,
+                    range(weekNum * WEEK_LENGTH_DAYS, (weekNum + 1) * WEEK_LENGTH_DAYS),
+                )
 
                 data.append(
                     go.Box(
@@ -474,16 +502,29 @@ class Graphs:
                 yaxis_title="Tempo di attesa (giorni)",
                 xaxis_title="Settimane",
             )
-            self._show_figure(fig, name=f"WaitingTimeBoxPlot_{op}")
+            self._show_figure(fig, name=f"WaitingTimeBoxPlot_{op}", specialty=op)
 
     def PrintDailyBoxGraph(
         self,
         operation: PatientListForSpecialties,
         baseTitle: str,
         use_rot_as_primary: bool = False,
+        occupancy: dict[str, DayRoomOccupancy] | None = None,
     ):
-        
+        """Grafico giornaliero per sala dei pazienti operati, una settimana alla volta.
+
+        Ogni paziente è un segmento della colonna (giorno, sala): metrica
+        primaria piena davanti, secondaria trasparente dietro. Con
+        ``Settings.daily_box_graph_mode == "aggregated"`` ogni settimana è
+        resa con due sole tracce ad array (vedi _daily_box_week_traces) e la
+        figura è un dict non validato; con "per_patient" ogni paziente ha due
+        go.Bar, come in origine. I totali per giorno e sala vengono da
+        ``occupancy`` (build_occupancy, calcolata qui se non fornita).
+        """
         limite_massimo = DAILY_OPERATION_LIMIT
+        aggregated = Settings.daily_box_graph_mode == "aggregated"
+        if occupancy is None:
+            occupancy = build_occupancy(operation)
 
         # Ciclo principale su ogni specialità
         for op, patients_real in operation.items():
@@ -497,8 +538,6 @@ class Graphs:
                 extra={"use_rot_as_primary": use_rot_as_primary},
             )
 
-            fig = go.Figure()
-
             # Colori: ricavati direttamente dagli ID dei pazienti reali
             ids = sorted(list({p.id for p in patients_real}))
             num_patients = max(1, len(ids))
@@ -511,6 +550,12 @@ class Graphs:
             last_day = max((p.opDay for p in patients_real), default=0)
             num_weeks = (last_day // WEEK_LENGTH_DAYS) + 1
 
+            # Pazienti per (giorno, sala), nell'ordine dello schedule; i totali dall'occupazione
+            patients_by_day_room = defaultdict(list)
+            for p in patients_real:
+                patients_by_day_room[(p.opDay, p.workstation)].append(p)
+            op_occupancy = occupancy[op]
+
             # Linea del limite massimo giornaliero
             shape_limite_massimo = [
                 dict(
@@ -524,13 +569,19 @@ class Graphs:
             ]
 
             shapes_by_week = {}
-            trace_idx_by_week = {w: [] for w in range(num_weeks)}
+            # Segmenti (etichetta asse X, paziente) di ogni settimana, nell'ordine di disegno
+            segments_by_week = {}
 
-            # --- Costruzione dei TRACES per settimana ---
             for weekNum in range(num_weeks):
                 shapes = []
+                segments = []
                 extra_time_pool = WEEKLY_EXTRA_TIME_POOL
                 week_start_day = weekNum * WEEK_LENGTH_DAYS
+                week_days = (week_start_day, week_start_day + WEEK_LENGTH_DAYS)
+                week_count = op_occupancy.days("count", *week_days).tolist()
+                week_rot = op_occupancy.days("rot", *week_days).tolist()
+                week_eot = op_occupancy.days("eot", *week_days).tolist()
+                day_rot = op_occupancy.days("day_rot", *week_days).tolist()
 
                 for day in range(
                     week_start_day,
@@ -538,81 +589,21 @@ class Graphs:
                 ):
                     for room_id in range(Settings.workstations_config[op]):
 
-                        # Filtro i pazienti reali per la sala e il giorno corrente
-                        real_day_room = [
-                            p
-                            for p in patients_real
-                            if p.workstation == room_id + 1 and p.opDay == day
-                        ]
+                        # Pazienti reali della sala e del giorno corrente
+                        real_day_room = patients_by_day_room.get((day, room_id + 1), [])
 
-                        # Totale minuti reali (ROT) e totali minuti stimati (EOT) presi dallo stesso oggetto
-                        minsRot = round(sum(p.rot for p in real_day_room), 2)
-                        minsEot = round(sum(p.eot for p in real_day_room), 2)
+                        # Totale minuti reali (ROT) e totali minuti stimati (EOT); 0 se la sala è vuota
+                        day_offset = day - week_start_day
+                        if week_count[day_offset][room_id]:
+                            minsRot = round(week_rot[day_offset][room_id], 2)
+                            minsEot = round(week_eot[day_offset][room_id], 2)
+                        else:
+                            minsRot = minsEot = 0
 
                         # Etichetta dell'asse X con i totali di giornata per quella sala
                         week_label = START_WEEK_SCHEDULING + weekNum
                         xtext = f"W:{week_label}|D:{day}|OR:{room_id+1}|<br>ToTMin:{minsEot}|<br>RoTMin:{minsRot}"
-
-                        # --- FRONT: Metrica primaria (piena) ---
-                        for p in real_day_room:
-                            y_val = p.rot if use_rot_as_primary else p.eot
-                            label = (
-                                "ROT (reale)"
-                                if use_rot_as_primary
-                                else "EOT (pianificato)"
-                            )
-                            val_hover = p.rot if use_rot_as_primary else p.eot
-
-                            fig.add_trace(
-                                go.Bar(
-                                    x=[xtext],
-                                    y=[y_val],
-                                    name=f"Patient {p.id}",
-                                    text=[
-                                        f"Patient {p.id}: {int(y_val)}m {int((y_val % 1) * 60)}s"
-                                    ],
-                                    hovertemplate=f"Paziente {p.id}<br>{label}: {val_hover:.2f} min<br>D:{p.day}|MTB:{p.mtb}<extra>{label}</extra>",
-                                    marker=dict(
-                                        color=color_map_progressive.get(p.id, "gray")
-                                    ),
-                                    cliponaxis=True,
-                                    textposition="inside",
-                                    offsetgroup="front",
-                                    visible=(weekNum == 0),
-                                )
-                            )
-                            trace_idx_by_week[weekNum].append(len(fig.data) - 1)
-
-                            # --- BACK: Metrica secondaria (trasparente con offset) ---
-                            y_val_sec = p.eot if use_rot_as_primary else p.rot
-                            label_sec = (
-                                "EOT (pianificato)"
-                                if use_rot_as_primary
-                                else "ROT (reale)"
-                            )
-                            val_hover_sec = p.eot if use_rot_as_primary else p.rot
-
-                            fig.add_trace(
-                                go.Bar(
-                                    x=[xtext],
-                                    y=[y_val_sec],
-                                    name=f"Patient {p.id} {label_sec.split()[0]}",
-                                    text=[
-                                        f"Patient {p.id} {label_sec.split()[0]}: {int(y_val_sec)}m {int((y_val_sec % 1) * 60)}s"
-                                    ],
-                                    hovertemplate=f"Paziente {p.id}<br>{label_sec}: {val_hover_sec:.2f} min<br>D:{p.day}|MTB:{p.mtb}<extra>{label_sec}</extra>",
-                                    marker=dict(
-                                        color=color_map_progressive.get(p.id, "gray"),
-                                        opacity=0.3,
-                                    ),
-                                    cliponaxis=True,
-                                    textposition="inside",
-                                    offsetgroup="back",
-                                    offset=-0.2,
-                                    visible=(weekNum == 0),
-                                )
-                            )
-                            trace_idx_by_week[weekNum].append(len(fig.data) - 1)
+                        segments.extend((xtext, p) for p in real_day_room)
 
                     # Linea extra giornaliero (basata sui ROT reali)
                     dayNumInWeek = day - week_start_day
@@ -630,16 +621,91 @@ class Graphs:
                         )
                     )
 
-                    val = (limite_massimo * Settings.workstations_config[op]) - sum(
-                        p.rot for p in patients_real if p.opDay == day
-                    )
+                    val = (limite_massimo * Settings.workstations_config[op]) - day_rot[dayNumInWeek]
                     extra_time_pool = max(0, extra_time_pool + min(0, val))
 
                 shapes_by_week[weekNum] = shapes
+                segments_by_week[weekNum] = segments
+
+            # --- Costruzione dei TRACES per settimana ---
+            trace_idx_by_week = {w: [] for w in range(num_weeks)}
+            if aggregated:
+                data = []
+                for weekNum in range(num_weeks):
+                    for trace in self._daily_box_week_traces(
+                        segments_by_week[weekNum], color_map_progressive, use_rot_as_primary
+                    ):
+                        trace["visible"] = weekNum == 0
+                        trace_idx_by_week[weekNum].append(len(data))
+                        data.append(trace)
+                total_traces = len(data)
+            else:
+                fig = go.Figure()
+                for weekNum in range(num_weeks):
+                    for xtext, p in segments_by_week[weekNum]:
+                        # --- FRONT: Metrica primaria (piena) ---
+                        y_val = p.rot if use_rot_as_primary else p.eot
+                        label = (
+                            "ROT (reale)"
+                            if use_rot_as_primary
+                            else "EOT (pianificato)"
+                        )
+                        val_hover = p.rot if use_rot_as_primary else p.eot
+
+                        fig.add_trace(
+                            go.Bar(
+                                x=[xtext],
+                                y=[y_val],
+                                name=f"Patient {p.id}",
+                                text=[
+                                    f"Patient {p.id}: {int(y_val)}m {int((y_val % 1) * 60)}s"
+                                ],
+                                hovertemplate=f"Paziente {p.id}<br>{label}: {val_hover:.2f} min<br>D:{p.day}|MTB:{p.mtb}<extra>{label}</extra>",
+                                marker=dict(
+                                    color=color_map_progressive.get(p.id, "gray")
+                                ),
+                                cliponaxis=True,
+                                textposition="inside",
+                                offsetgroup="front",
+                                visible=(weekNum == 0),
+                            )
+                        )
+                        trace_idx_by_week[weekNum].append(len(fig.data) - 1)
+
+                        # --- BACK: Metrica secondaria (trasparente con offset) ---
+                        y_val_sec = p.eot if use_rot_as_primary else p.rot
+                        label_sec = (
+                            "EOT (pianificato)"
+                            if use_rot_as_primary
+                            else "ROT (reale)"
+                        )
+                        val_hover_sec = p.eot if use_rot_as_primary else p.rot
+
+                        fig.add_trace(
+                            go.Bar(
+                                x=[xtext],
+                                y=[y_val_sec],
+                                name=f"Patient {p.id} {label_sec.split()[0]}",
+                                text=[
+                                    f"Patient {p.id} {label_sec.split()[0]}: {int(y_val_sec)}m {int((y_val_sec % 1) * 60)}s"
+                                ],
+                                hovertemplate=f"Paziente {p.id}<br>{label_sec}: {val_hover_sec:.2f} min<br>D:{p.day}|MTB:{p.mtb}<extra>{label_sec}</extra>",
+                                marker=dict(
+                                    color=color_map_progressive.get(p.id, "gray"),
+                                    opacity=0.3,
+                                ),
+                                cliponaxis=True,
+                                textposition="inside",
+                                offsetgroup="back",
+                                offset=-0.2,
+                                visible=(weekNum == 0),
+                            )
+                        )
+                        trace_idx_by_week[weekNum].append(len(fig.data) - 1)
+                total_traces = len(fig.data)
 
             # --- Generazione dei bottoni per il cambio settimana ---
             buttons = []
-            total_traces = len(fig.data)
             for weekNum in range(num_weeks):
                 visible = [False] * total_traces
                 for idx in trace_idx_by_week[weekNum]:
@@ -661,41 +727,39 @@ class Graphs:
                     )
                 )
 
-            fig.update_xaxes(showticklabels=True)
-            fig.update_traces(showlegend=False, selector=dict(offsetgroup="back"))
-
-            fig.add_annotation(
-                x=xline - 1,
-                y=limite_massimo,
-                text=f"{limite_massimo} minuti (limite giornaliero)",
-                showarrow=False,
-                yshift=10,
-                font=dict(color="red"),
-            )
-            fig.add_annotation(
-                x=0.5,
-                y=WEEKLY_EXTRA_TIME_POOL + limite_massimo,
-                text="minuti massimi di straordinario disponibili",
-                showarrow=False,
-                yshift=10,
-                font=dict(color="green"),
-            )
             metric_text = (
                 "ROT = barra piena | EOT = barra trasparente"
                 if use_rot_as_primary
                 else "EOT = barra piena | ROT = barra trasparente"
             )
-            fig.add_annotation(
-                x=0.01,
-                y=1.08,
-                xref="paper",
-                yref="paper",
-                text=metric_text,
-                showarrow=False,
-                align="left",
-            )
-
-            fig.update_layout(
+            annotations = [
+                dict(
+                    x=xline - 1,
+                    y=limite_massimo,
+                    text=f"{limite_massimo} minuti (limite giornaliero)",
+                    showarrow=False,
+                    yshift=10,
+                    font=dict(color="red"),
+                ),
+                dict(
+                    x=0.5,
+                    y=WEEKLY_EXTRA_TIME_POOL + limite_massimo,
+                    text="minuti massimi di straordinario disponibili",
+                    showarrow=False,
+                    yshift=10,
+                    font=dict(color="green"),
+                ),
+                dict(
+                    x=0.01,
+                    y=1.08,
+                    xref="paper",
+                    yref="paper",
+                    text=metric_text,
+                    showarrow=False,
+                    align="left",
+                ),
+            ]
+            layout = dict(
                 updatemenus=[
                     dict(
                         active=0,
@@ -706,20 +770,86 @@ class Graphs:
                         yanchor="top",
                     )
                 ],
-                barmode="stack",
-                title=title,
+                annotations=annotations,
+                title=dict(text=title),
                 showlegend=False,
-                yaxis_title="Minuti Totali",
-                xaxis_title="Giorni",
+                xaxis=dict(showticklabels=True, title=dict(text="Giorni")),
+                yaxis=dict(title=dict(text="Minuti Totali")),
             )
 
-            self._show_figure(fig, name=f"DailyBoxGraph_{op}")
+            if aggregated:
+                # Segmenti impilati con base esplicita: nessun impilamento automatico
+                layout["barmode"] = "overlay"
+                # Un dict non riceve il template predefinito che go.Figure applica da sé
+                if pio.templates.default:
+                    layout["template"] = pio.templates[pio.templates.default].to_plotly_json()
+                fig = {"data": data, "layout": layout}
+            else:
+                fig.update_traces(showlegend=False, selector=dict(offsetgroup="back"))
+                layout["barmode"] = "stack"
+                fig.update_layout(layout)
+
+            self._show_figure(fig, name=f"DailyBoxGraph_{op}", specialty=op)
+
+    @staticmethod
+    def _daily_box_week_traces(segments: list, color_map: dict, use_rot_as_primary: bool) -> list[dict]:
+        """Le due tracce (davanti e dietro) di una settimana di PrintDailyBoxGraph.
+
+        Ogni traccia ha un punto per paziente: i segmenti della stessa
+        colonna sono impilati con l'array ``base`` (somma dei segmenti
+        precedenti), colore per punto e ``customdata`` [id, giorno, MTB]
+        per l'hover. La traccia di dietro è spostata con ``offset`` come
+        il gruppo "back" della resa per paziente.
+        """
+        traces = []
+        for primary in (True, False):
+            use_rot = use_rot_as_primary if primary else not use_rot_as_primary
+            label = "ROT (reale)" if use_rot else "EOT (pianificato)"
+            prefix = "Patient {}:" if primary else "Patient {} " + label.split()[0] + ":"
+
+            x, y, base, text, colors, customdata = [], [], [], [], [], []
+            stack_height = defaultdict(float)
+            for xtext, p in segments:
+                value = p.rot if use_rot else p.eot
+                x.append(xtext)
+                y.append(value)
+                base.append(stack_height[xtext])
+                stack_height[xtext] += value
+                text.append(f"{prefix.format(p.id)} {int(value)}m {int((value % 1) * 60)}s")
+                colors.append(color_map.get(p.id, "gray"))
+                customdata.append([p.id, p.day, p.mtb])
+
+            marker = {"color": colors}
+            if not primary:
+                marker["opacity"] = 0.3
+            traces.append({
+                "type": "bar",
+                "x": x,
+                "y": y,
+                "base": base,
+                "text": text,
+                "customdata": customdata,
+                "hovertemplate": (
+                    "Paziente %{customdata[0]}<br>"
+                    f"{label}: %{{y:.2f}} min<br>"
+                    "D:%{customdata[1]}|MTB:%{customdata[2]}"
+                    f"<extra>{label}</extra>"
+                ),
+                "marker": marker,
+                "cliponaxis": True,
+                "textposition": "inside",
+                "offset": -0.4 if primary else -0.2,
+                "width": 0.4,
+                "showlegend": False,
+            })
+        return traces
 
     def PrintTrendLineGraph(
         self,
         operation: PatientListForSpecialties,
         baseTitle: str,
         use_rot_as_primary: bool = False,
+        occupancy: dict[str, DayRoomOccupancy] | None = None,
     ) -> None:
         """Crea grafico di tendenza del carico operatorio con doppio asse Y.
         
@@ -729,9 +859,12 @@ class Graphs:
             operation: PatientListForSpecialties con i dati
             baseTitle: Titolo base del grafico
             use_rot_as_primary: Se True, usa ROT per calcolare tempo libero
+            occupancy: Occupazione per giorno e sala di ``operation``
+                (build_occupancy), calcolata qui se non fornita
         """
         use_rot_as_primary = True
-
+        if occupancy is None:
+            occupancy = build_occupancy(operation)
 
         for op, patients in operation.items():
             if not patients:
@@ -743,10 +876,10 @@ class Graphs:
                 patients=patients,
                 extra={"use_rot_as_primary": use_rot_as_primary},
             )
-            patients = sorted(patients, key=lambda p: (p.opDay, p.workstation))
+            op_occupancy = occupancy[op]
 
             # Genera etichette giorni
-            last_day = max(p.opDay for p in patients)
+            last_day = op_occupancy.last_day
             num_weeks = (last_day // WEEK_LENGTH_DAYS) + 1
             total_days = num_weeks * WEEK_LENGTH_DAYS
             start_day = 0
@@ -757,27 +890,17 @@ class Graphs:
             # Calcola indice giorno inizio schedulazione
             start_index = 0
 
-            # Aggrega tempo libero e numero pazienti per sala e giorno
+            # Tempo libero e numero pazienti per sala e giorno, dall'occupazione
+            time_metric = op_occupancy.days(
+                "rot" if use_rot_as_primary else "eot", start_day, start_day + total_days
+            )
+            counts = op_occupancy.days("count", start_day, start_day + total_days)
             room_ids = range(Settings.workstations_config[op])
-            room_free_time = {room_id + 1: [] for room_id in room_ids}
-            room_patient = {room_id + 1: [] for room_id in room_ids}
-
-            for day_offset in range(total_days):
-                day = start_day + day_offset
-                for room_id in room_ids:
-                    daily_patients = [
-                        p
-                        for p in patients
-                        if p.workstation == room_id + 1 and p.opDay == day
-                    ]
-                    time_metric = (
-                        sum(p.rot for p in daily_patients)
-                        if use_rot_as_primary
-                        else sum(p.eot for p in daily_patients)
-                    )
-                    free_time = DAILY_OPERATION_LIMIT - time_metric
-                    room_free_time[room_id + 1].append(free_time)
-                    room_patient[room_id + 1].append(len(daily_patients))
+            room_free_time = {
+                room_id + 1: (DAILY_OPERATION_LIMIT - time_metric[:, room_id]).tolist()
+                for room_id in room_ids
+            }
+            room_patient = {room_id + 1: counts[:, room_id].tolist() for room_id in room_ids}
 
             # Crea grafico con doppio asse
             fig = make_subplots(specs=[[{"secondary_y": True}]])
@@ -835,7 +958,7 @@ class Graphs:
             fig.update_yaxes(title_text="Tempo libero (minuti)", secondary_y=False)
             fig.update_yaxes(title_text="Numero pazienti", secondary_y=True)
 
-            self._show_figure(fig, name=f"TrendLineGraph_{op}")
+            self._show_figure(fig, name=f"TrendLineGraph_{op}", specialty=op)
 
     def PrintWaitingListLineGraph(
         self,
@@ -962,15 +1085,20 @@ class Graphs:
                 hovermode="x unified",
             )
 
-            self._show_figure(fig, name=f"WaitingListLineGraph_{op}")
+            self._show_figure(fig, name=f"WaitingListLineGraph_{op}", specialty=op)
 
     def MostraTabellaConfrontoPlotly(self, scenari: dict) -> None:
         """
         Genera una visualizzazione in stile tabella interattiva basata su go.Heatmap.
         Supporta il raggruppamento dinamico (espandi/comprimi) delle settimane tramite pulsanti
         e calcola i riepiloghi mensili.
+
+        Ogni scenario può essere uno schedule {specialità: [Patient, ...]}
+        oppure i suoi aggregati già calcolati con Kpi.scenario_aggregates
+        (ad es. letti dalla cache di Utility/Genera_Tabelle.py). I valori
+        vengono da Kpi.comparison_kpis: qui sono solo formattati.
         """
-        
+
 
         def wrap_text_by_words(text: str, max_chars: int = 14) -> str:
             """Avvolge il testo in più righe senza spezzare le parole."""
@@ -993,16 +1121,21 @@ class Graphs:
                 
             return "<br>".join(lines)
 
-        # 1. Determina il numero massimo di settimane
-        max_day = 0
+        # 1. KPI di tutti gli scenari (Grafici/Kpi.py) e numero di settimane
         for scenario_name, operation_data in scenari.items():
-            for spec, pazienti in operation_data.items():
-                for p in pazienti:
-                    if p.opDay > max_day:
-                        max_day = p.opDay
+            if is_scenario_aggregates(operation_data):
+                continue
+            for spec_name, pazienti in operation_data.items():
+                if pazienti is not None and len(pazienti) > 0:
+                    self._log_dataset_snapshot(
+                        context=f"comparison_table:{scenario_name}:{spec_name}",
+                        patients=getattr(pazienti, "patients", pazienti),
+                        extra={"scenario": scenario_name},
+                    )
+
+        kpi = comparison_kpis(scenari)
         weeks_per_month = Settings.weeks_per_month
-        # num_weeks = 1 if max_day == 0 else int((max_day - 1) // WEEK_LENGTH_DAYS + 1)
-        num_weeks = (max_day // WEEK_LENGTH_DAYS) + 1
+        num_weeks = kpi["num_weeks"]
         num_months = (num_weeks - 1) // weeks_per_month + 1
 
         # 2. Costruzione della struttura delle colonne
@@ -1035,127 +1168,93 @@ class Graphs:
                 indices_sintetici.append(current_col_idx + 1)
                 current_col_idx += 2
 
-        rows_data_full = []
-        hover_data_full = []
-        std_limit_daily = DAILY_OPERATION_LIMIT
+        specialties = kpi["specialties"]
+        if specialties.empty:
+            return
 
-        scenario_end_rows = []
-        current_row_idx = 0
+        # Valori per (riga, settimana) e (riga, mese): le righe sono quelle di "specialties"
+        weeks = {
+            column: kpi["weeks"][column].to_numpy().reshape(len(specialties), num_weeks).tolist()
+            for column in ("or_minutes", "overtime_minutes", "or_pct", "overtime_pct")
+        }
+        months = {
+            column: kpi["months"][column].to_numpy().reshape(len(specialties), num_months).tolist()
+            for column in ("weeks", "or_pct", "overtime_pct")
+        }
 
-        # 3. Elaborazione Dati
-        for scenario_name, operation_data in scenari.items():
-            scenario_has_rows = False
-            for spec_name, pazienti in operation_data.items():
-                if not pazienti or len(pazienti) == 0:
-                    continue
+        rows_data_full = []
+        hover_data_full = []
 
-                scenario_has_rows = True
+        # 3. Testo e hover delle celle
+        for i, spec_row in enumerate(specialties.itertuples(index=False)):
+            scenario_name = spec_row.scenario
+            spec_name = spec_row.specialty
+            std_avail_weekly = int(spec_row.or_available)
+            extra_avail_weekly = int(spec_row.overtime_available)
+            pazienti_operati = int(spec_row.patients)
+            attesa_media = round(spec_row.mean_wait, 1)
+
+            formatted_scenario = wrap_text_by_words(scenario_name, max_chars=14)
+            formatted_spec = wrap_text_by_words(spec_name, max_chars=14)
+
+            row_cells = [
+                formatted_scenario,
+                formatted_spec,
+                str(pazienti_operati),
+                f"{attesa_media} gg"
+            ]
+            row_hover = [
+                f"Scenario: <b>{scenario_name}</b>",
+                f"Specialità: <b>{spec_name}</b>",
+                f"Pazienti Totali Operati: <b>{pazienti_operati}</b>",
+                f"Tempo di Attesa Medio: <b>{attesa_media} giorni</b>"
+            ]
 
-                self._log_dataset_snapshot(
-                    context=f"comparison_table:{scenario_name}:{spec_name}",
-                    patients=pazienti,
-                    extra={"scenario": scenario_name},
+            for w in range(1, num_weeks + 1):
+                used_std_weekly = weeks["or_minutes"][i][w - 1]
+                used_extra_weekly = weeks["overtime_minutes"][i][w - 1]
+                pct_or = round(weeks["or_pct"][i][w - 1], 1) if std_avail_weekly > 0 else 0
+                pct_st = round(weeks["overtime_pct"][i][w - 1], 1) if extra_avail_weekly > 0 else 0
+
+                # Dati della singola settimana
+                row_cells.append(f"{pct_or}%")
+                row_cells.append(f"{pct_st}%")
+
+                row_hover.append(
+                    f"<b>Utilizzo OR Settimana {w}</b><br>"
+                    f"Utilizzati: {used_std_weekly:.1f} min<br>"
+                    f"Disponibili: {std_avail_weekly} min<br>"
+                    f"Percentuale: {pct_or}%"
+                )
+                row_hover.append(
+                    f"<b>Straordinari Settimana {w}</b><br>"
+                    f"Utilizzati: {used_extra_weekly:.1f} min<br>"
+                    f"Disponibili: {extra_avail_weekly} min<br>"
+                    f"Percentuale: {pct_st}%"
                 )
 
-                num_rooms = Settings.workstations_config.get(spec_name, 1)
-                std_avail_weekly = std_limit_daily * WEEK_LENGTH_DAYS * num_rooms
-                extra_avail_weekly = WEEKLY_EXTRA_TIME_POOL * num_rooms
-
-                daily_tot_time = {}
-                pazienti_operati = 0
-                somma_attesa = 0
-
-                for p in pazienti:
-                    pazienti_operati += 1
-                    somma_attesa += (p.opDay - p.day)
-                    daily_tot_time[p.opDay] = daily_tot_time.get(p.opDay, 0) + p.rot
-
-                attesa_media = round(somma_attesa / pazienti_operati, 1) if pazienti_operati > 0 else 0
-
-                formatted_scenario = wrap_text_by_words(scenario_name, max_chars=14)
-                formatted_spec = wrap_text_by_words(spec_name, max_chars=14)
-
-                row_cells = [
-                    formatted_scenario,
-                    formatted_spec,
-                    str(pazienti_operati),
-                    f"{attesa_media} gg"
-                ]
-                row_hover = [
-                    f"Scenario: <b>{scenario_name}</b>",
-                    f"Specialità: <b>{spec_name}</b>",
-                    f"Pazienti Totali Operati: <b>{pazienti_operati}</b>",
-                    f"Tempo di Attesa Medio: <b>{attesa_media} giorni</b>"
-                ]
-
-                # Dati settimanali e calcolo medie mensili
-                month_or_pcts = []
-                month_st_pcts = []
-
-                for w in range(1, num_weeks + 1):
-                    # giorni_settimana = range((w - 1) * WEEK_LENGTH_DAYS + 1, w * WEEK_LENGTH_DAYS + 1)
-                    giorni_settimana = range((w - 1) * WEEK_LENGTH_DAYS, w * WEEK_LENGTH_DAYS)
-                    used_std_weekly = 0
-                    used_extra_weekly = 0
-                    std_limit_daily_total = std_limit_daily * num_rooms
-
-                    for d in giorni_settimana:
-                        tot_day_time = daily_tot_time.get(d, 0)
-                        if tot_day_time > std_limit_daily_total:
-                            used_std_weekly += std_limit_daily_total
-                            used_extra_weekly += (tot_day_time - std_limit_daily_total)
-                        else:
-                            used_std_weekly += tot_day_time
-
-                    pct_or = round((used_std_weekly / std_avail_weekly) * 100, 1) if std_avail_weekly > 0 else 0
-                    pct_st = round((used_extra_weekly / extra_avail_weekly) * 100, 1) if extra_avail_weekly > 0 else 0
-
-                    month_or_pcts.append(pct_or)
-                    month_st_pcts.append(pct_st)
-
-                    # Aggiunta dati della singola settimana
-                    row_cells.append(f"{pct_or}%")
-                    row_cells.append(f"{pct_st}%")
-
-                    row_hover.append(
-                        f"<b>Utilizzo OR Settimana {w}</b><br>"
-                        f"Utilizzati: {used_std_weekly:.1f} min<br>"
-                        f"Disponibili: {std_avail_weekly} min<br>"
-                        f"Percentuale: {pct_or}%"
-                    )
-                    row_hover.append(
-                        f"<b>Straordinari Settimana {w}</b><br>"
-                        f"Utilizzati: {used_extra_weekly:.1f} min<br>"
-                        f"Disponibili: {extra_avail_weekly} min<br>"
-                        f"Percentuale: {pct_st}%"
-                    )
-
-                    # Calcolo e aggiunta del Riepilogo Mensile
-                    if w % weeks_per_month == 0 or w == num_weeks:
-                        m = (w - 1) // weeks_per_month + 1
-                        avg_or = round(sum(month_or_pcts) / len(month_or_pcts), 1)
-                        avg_st = round(sum(month_st_pcts) / len(month_st_pcts), 1)
-
-                        row_cells.append(f"<b>{avg_or}%</b>")
-                        row_cells.append(f"<b>{avg_st}%</b>")
-
-                        row_hover.append(f"<b>Media OR Mese {m}</b><br>Media: {avg_or}% su {len(month_or_pcts)} sett.")
-                        row_hover.append(f"<b>Media Straordinari Mese {m}</b><br>Media: {avg_st}% su {len(month_st_pcts)} sett.")
+                # Riepilogo Mensile
+                if w % weeks_per_month == 0 or w == num_weeks:
+                    m = (w - 1) // weeks_per_month + 1
+                    avg_or = round(months["or_pct"][i][m - 1], 1)
+                    avg_st = round(months["overtime_pct"][i][m - 1], 1)
+                    month_weeks = months["weeks"][i][m - 1]
 
-                        # Resetta i dati per il mese successivo
-                        month_or_pcts = []
-                        month_st_pcts = []
+                    row_cells.append(f"<b>{avg_or}%</b>")
+                    row_cells.append(f"<b>{avg_st}%</b>")
 
-                rows_data_full.append(row_cells)
-                hover_data_full.append(row_hover)
-                current_row_idx += 1
+                    row_hover.append(f"<b>Media OR Mese {m}</b><br>Media: {avg_or}% su {month_weeks} sett.")
+                    row_hover.append(f"<b>Media Straordinari Mese {m}</b><br>Media: {avg_st}% su {month_weeks} sett.")
 
-            if scenario_has_rows:
-                # Salva il confine sotto l'ultima riga dello scenario
-                scenario_end_rows.append(current_row_idx - 1)
+            rows_data_full.append(row_cells)
+            hover_data_full.append(row_hover)
 
-        if not rows_data_full:
-            return
+        # Confine sotto l'ultima riga di ogni scenario
+        scenario_names = specialties["scenario"].tolist()
+        scenario_end_rows = [
+            i for i, name in enumerate(scenario_names)
+            if i == len(scenario_names) - 1 or scenario_names[i + 1] != name
+        ]
 
         # 4. Preparazione Dati Filtrati per la Vista Sintetica
         rows_data_synth = [[row[idx] for idx in indices_sintetici] for row in rows_data_full]
@@ -1214,9 +1313,11 @@ class Graphs:
         width_synth = max(800, len(colonne_sintetiche) * min_col_width)
         width_full = max(800, len(colonne_dettagliate) * min_col_width)
 
-        # Disegna una linea orizzontale marcata sotto ogni scenario (tranne l'ultimo)
-        for end_idx in scenario_end_rows[:-1]:
-            fig.add_shape(
+        # Disegna una linea orizzontale marcata sotto ogni scenario (tranne l'ultimo).
+        # Le linee sono assegnate in un colpo solo: add_shape in un ciclo
+        # rivalida ogni volta tutte le forme già presenti (costo quadratico)
+        fig.layout.shapes = [
+            dict(
                 type="line",
                 xref="paper",
                 yref="y",
@@ -1229,6 +1330,8 @@ class Graphs:
                     width=4           
                 )
             )
+            for end_idx in scenario_end_rows[:-1]
+        ]
 
         # 5. Aggiunta Menu (Updatemenus)
         fig.update_layout(
@@ -1293,27 +1396,114 @@ class Graphs:
         plan_eot: dict | None = None,
         use_rot_as_primary: bool = False,
         log_graph_data: bool | None = None,
+        max_workers: int | None = None,
     ) -> None:
         """Genera tutti i grafici di analisi dalla schedulazione.
 
+        Ogni coppia (grafico, specialità) è un job indipendente: con
+        ``max_workers > 1`` i job sono eseguiti in un pool di processi che
+        riceve schedule e occupazione una sola volta per worker. I nomi dei
+        file non dipendono dall'esecuzione e figure, righe del log dei dati
+        e tempi sono raccolti nell'ordine dei job, quindi il risultato è lo
+        stesso dell'esecuzione seriale. I tempi per figura finiscono in
+        ``self.timings`` e in ``graph_timings.json``.
+
         Args:
             data: PatientListForSpecialties con i dati
-            showGraphs: Se True, visualizza i grafici nel browser
+            showGraphs: Se True, visualizza i grafici nel browser (sempre in serie)
             plan_eot: Pianificazione EOT opzionale
             use_rot_as_primary: Se True, usa ROT come metrica primaria
+            max_workers: Processi per i grafici (default: Settings.graph_workers,
+                1 = esecuzione seriale)
         """
 
         self.ShowFigures = showGraphs
         if log_graph_data is not None:
             self.log_graph_data = log_graph_data
+        if max_workers is None:
+            max_workers = Settings.graph_workers
+
+        # Occupazione per giorno e sala calcolata una volta per tutti i grafici
+        self.occupancy = build_occupancy(data)
+
+        jobs = [
+            (method, title, op)
+            for method, title in _MAKE_GRAPHS_CHARTS
+            for op in self.occupancy
+        ]
+        if max_workers is None or max_workers <= 1 or len(jobs) <= 1 or showGraphs:
+            _init_graph_worker(None, self, data, use_rot_as_primary)
+            results = [_render_graph_job(*job) for job in jobs]
+            _job_state.clear()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=min(max_workers, len(jobs)),
+                initializer=_init_graph_worker,
+                initargs=(Settings.Snapshot(), self, data, use_rot_as_primary),
+            ) as pool:
+                results = list(pool.map(_render_graph_job, *zip(*jobs)))
+
+        self.timings = []
+        for (method, _, op), (figures, log_lines, seconds) in zip(jobs, results):
+            self.figures.extend(figures)
+            self._write_log_lines(log_lines)
+            self.timings.append({"chart": method, "specialty": op, "seconds": round(seconds, 4)})
+        write_json(
+            self.timings,
+            json_path(os.path.join(self.folderPath, _GRAPH_TIMINGS_FILE), Settings.json_gzip),
+            Settings.json_indent,
+            Settings.json_codec,
+        )
+
 
-        base_title = "Distribuzione pazienti - "
-        self.PrintDailyBoxGraph(data, base_title, use_rot_as_primary=use_rot_as_primary)
-        trend_title = "Carico operatorio - "
-        self.PrintTrendLineGraph(data, trend_title, use_rot_as_primary=use_rot_as_primary)
-        wait_title = "Lista attesa - "
-        self.PrintWaitingListLineGraph(data, wait_title, use_rot_as_primary=use_rot_as_primary)
-        self.PrintWaitingTimeBoxPlotGraph(data, "Tempi attesa - ", use_rot_as_primary=use_rot_as_primary)
+#region: Job di MakeGraphs
+# Grafici di MakeGraphs, nell'ordine di esecuzione: (metodo di Graphs, titolo base)
+_MAKE_GRAPHS_CHARTS = (
+    ("PrintDailyBoxGraph", "Distribuzione pazienti - "),
+    ("PrintTrendLineGraph", "Carico operatorio - "),
+    ("PrintWaitingListLineGraph", "Lista attesa - "),
+    ("PrintWaitingTimeBoxPlotGraph", "Tempi attesa - "),
+)
+# Grafici che leggono l'occupazione per giorno e sala
+_OCCUPANCY_CHARTS = {"PrintDailyBoxGraph", "PrintTrendLineGraph"}
+
+# Stato del processo che esegue i job (il processo principale in serie)
+_job_state = {}
+
+
+def _init_graph_worker(settings: dict | None, graphs: Graphs, data, use_rot_as_primary: bool) -> None:
+    """Prepara i job di MakeGraphs: in un worker applica la configurazione e
+    usa una copia di ``graphs`` che accumula figure e righe di log."""
+    if settings is not None:
+        Settings.Apply(settings)
+        graphs.figures = []
+        graphs._log_lines = []
+    _job_state.update(graphs=graphs, data=data, use_rot_as_primary=use_rot_as_primary)
+
+
+def _render_graph_job(method: str, title: str, op: str) -> tuple[list, list, float]:
+    """Esegue un grafico di MakeGraphs per una specialità.
+
+    Returns:
+        (figure scritte in modalità dashboard, righe del log dei dati, secondi)
+    """
+    graphs = _job_state["graphs"]
+    kwargs = {"use_rot_as_primary": _job_state["use_rot_as_primary"]}
+    if method in _OCCUPANCY_CHARTS:
+        kwargs["occupancy"] = {op: graphs.occupancy[op]}
+
+    figures_before = len(graphs.figures)
+    log_lines = graphs._log_lines
+    if log_lines is not None:
+        log_lines.clear()
+    start = time.perf_counter()
+    getattr(graphs, method)({op: _job_state["data"][op]}, title, **kwargs)
+    seconds = time.perf_counter() - start
+
+    figures = graphs.figures[figures_before:]
+    del graphs.figures[figures_before:]
+    return figures, list(log_lines or []), seconds
+#endregion
 
 
 if __name__ == "__main__":
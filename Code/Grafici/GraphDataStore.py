@@ -0,0 +1,116 @@
+"""Archivio dei dataset del log dei dati dei grafici, indirizzato per contenuto.
+
+Con ``Graphs.log_graph_data`` ogni grafico registra i pazienti da cui è
+costruito; lo stesso schedule finisce in più grafici e scenari. Ogni
+dataset distinto è salvato una sola volta in ``graph_data/<hash>`` accanto
+a ``graph_data_log.jsonl`` e le righe del log riportano solo l'hash.
+
+L'hash (BLAKE2b, 128 bit) è calcolato sulle colonne del dataset come
+array float64, quindi non dipende dal formato di salvataggio:
+- ``Settings.graph_data_format == "json"``: colonne in JSON compatto
+  (``<hash>.json``, ``.json.gz`` se compresso)
+- ``"npz"``: array NumPy (``<hash>.npz``, np.savez_compressed se compresso)
+La compressione è attiva con ``Settings.graph_data_compress``.
+
+Per leggere un dataset: load_dataset(cartella del log, hash).
+"""
+
+import gzip
+import hashlib
+import json
+import operator
+import os
+import sys
+
+import numpy as np
+
+if os.path.basename(__file__) != "main.py":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../", "Code")))
+
+from CommonClass.PatientTable import PatientTable
+from settings import Settings
+
+DATASET_FOLDER = "graph_data"
+
+# Campi registrati per paziente (o voce del piano), con i default di Patient
+_FIELDS = ("id", "day", "opDay", "workstation", "eot", "rot", "mtb")
+_DEFAULTS = {"opDay": -1, "workstation": -1}
+_FLOAT_FIELDS = {"eot", "rot"}
+_get_fields = operator.attrgetter(*_FIELDS)
+
+
+def dataset_columns(rows) -> np.ndarray:
+    """Matrice float64 (righe x _FIELDS) di pazienti, PatientTable o dict (None = NaN)."""
+    if isinstance(rows, PatientTable):
+        return np.column_stack([getattr(rows, name).astype(np.float64) for name in _FIELDS]).reshape(-1, len(_FIELDS))
+    values = [
+        tuple(row.get(name, _DEFAULTS.get(name)) for name in _FIELDS) if isinstance(row, dict) else _get_fields(row)
+        for row in rows
+    ]
+    return np.array(values, dtype=np.float64).reshape(-1, len(_FIELDS))
+
+
+def dataset_hash(columns: np.ndarray) -> str:
+    return hashlib.blake2b(np.ascontiguousarray(columns).tobytes(), digest_size=16).hexdigest()
+
+
+def _json_column(values: np.ndarray, name: str) -> list:
+    nan = np.isnan(values)
+    if name not in _FLOAT_FIELDS and not nan.any():
+        return values.astype(np.int64).tolist()
+    return [None if missing else value for value, missing in zip(values.tolist(), nan.tolist())]
+
+
+def store_dataset(folder: str, columns: np.ndarray, stored: set | None = None) -> str:
+    """Salva il dataset in ``folder/graph_data`` se non è già presente.
+
+    Args:
+        folder: Cartella del log dei dati
+        columns: Matrice di dataset_columns
+        stored: Hash già salvati da questo processo (evita di ricontrollare il disco)
+
+    Returns:
+        L'hash del dataset
+    """
+    digest = dataset_hash(columns)
+    if stored is not None and digest in stored:
+        return digest
+
+    fmt, compress = Settings.graph_data_format, Settings.graph_data_compress
+    if fmt not in ("json", "npz"):
+        raise ValueError(f"graph_data_format non valido: {fmt!r} (attesi 'json' o 'npz')")
+    suffix = ".npz" if fmt == "npz" else ".json.gz" if compress else ".json"
+    path = os.path.join(folder, DATASET_FOLDER, digest + suffix)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Più worker possono salvare lo stesso dataset: scrittura su file temporaneo e rinomina
+        temporary = f"{path}.{os.getpid()}.tmp"
+        if fmt == "npz":
+            save = np.savez_compressed if compress else np.savez
+            with open(temporary, "wb") as f:
+                save(f, **{name: columns[:, i] for i, name in enumerate(_FIELDS)})
+        else:
+            text = json.dumps(
+                {name: _json_column(columns[:, i], name) for i, name in enumerate(_FIELDS)},
+                separators=(",", ":"),
+            )
+            with (gzip.open if compress else open)(temporary, "wt", encoding="utf-8") as f:
+                f.write(text)
+        os.replace(temporary, path)
+
+    if stored is not None:
+        stored.add(digest)
+    return digest
+
+
+def load_dataset(folder: str, digest: str) -> dict:
+    """Colonne {campo: lista} del dataset ``digest`` salvato in ``folder/graph_data``."""
+    base = os.path.join(folder, DATASET_FOLDER, digest)
+    if os.path.exists(base + ".npz"):
+        with np.load(base + ".npz") as data:
+            return {name: _json_column(data[name], name) for name in _FIELDS}
+    for suffix, opener in ((".json", open), (".json.gz", gzip.open)):
+        if os.path.exists(base + suffix):
+            with opener(base + suffix, "rt", encoding="utf-8") as f:
+                return json.load(f)
+    raise FileNotFoundError(f"Dataset {digest} non trovato in {os.path.dirname(base)}")
@@ -0,0 +1,252 @@
+"""KPI degli scenari di schedulazione calcolati in forma vettoriale.
+
+Ogni specialità di uno schedule (lista di Patient, PatientTable o
+DayRoomOccupancy già costruita da Graphs.MakeGraphs) è letta come colonne
+NumPy e occupazione per giorno (Grafici/Occupancy.py): attese e minuti per
+giorno e per settimana si ottengono con operazioni sugli array, senza
+cicli sui pazienti; il confronto tra scenari costruisce tabelle pandas per
+(scenario, specialità), settimana e mese:
+- specialty_summary: pazienti, attese, pazienti oltre l'MTB e minuti in
+  orario standard/straordinario per specialità (sweep, riga di comando)
+- weekly_usage: minuti in orario standard e in straordinario per
+  specialità e settimana
+- scenario_aggregates: gli aggregati di uno scenario come dict
+  JSON-serializzabile (cache di Utility/Genera_Tabelle.py)
+- comparison_kpis: le tabelle di più scenari, rese da
+  Graphs.MostraTabellaConfrontoPlotly
+
+La divisione tra orario standard e straordinario è giornaliera: i minuti
+(ROT) di un giorno oltre ``daily_operation_limit`` x sale sono
+straordinario. I parametri sono letti da Settings al momento della
+chiamata, quindi valgono anche le modifiche di uno sweep.
+
+Uso da riga di comando (riepilogo di uno o più file di schedule):
+    python Grafici/Kpi.py Data/seed-1/weekly_schedule.json --mesi
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+if os.path.basename(__file__) != "main.py":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../", "Code")))
+
+from Grafici.Occupancy import DayRoomOccupancy, build_occupancy
+from settings import Settings
+
+
+#region: KPI per specialità
+def _weekly_sum(daily: np.ndarray) -> np.ndarray:
+    """Somma per settimana di un vettore giornaliero che parte dal giorno 0."""
+    week_length = Settings.week_length_days
+    padded = np.zeros(-(-len(daily) // week_length) * week_length)
+    padded[:len(daily)] = daily
+    return padded.reshape(-1, week_length).sum(axis=1)
+
+
+def _specialty_kpis(occupancy: DayRoomOccupancy) -> dict:
+    """KPI di una specialità non vuota, con i minuti per settimana dal giorno 0."""
+    columns = occupancy.columns
+    wait = columns["opDay"] - columns["day"]
+    limit = Settings.daily_operation_limit * occupancy.rooms
+
+    # Minuti per giorno da first_day (opDay negativi compresi) ad almeno il giorno 0
+    std = np.minimum(occupancy.day_rot, limit)
+    extra = occupancy.day_overtime
+    first_day = occupancy.first_day
+
+    return {
+        "patients": len(wait),
+        "total_wait": int(wait.sum()),
+        "mean_wait": float(wait.mean()),
+        "max_wait": int(wait.max()),
+        "max_day": occupancy.last_day,
+        "overdue": int((wait > columns["mtb"]).sum()),
+        "rooms": occupancy.rooms,
+        "or_minutes": float(std.sum()),
+        "overtime_minutes": float(extra.sum()),
+        "or_weekly": _weekly_sum(std[-first_day:]),
+        "overtime_weekly": _weekly_sum(extra[-first_day:]),
+    }
+
+
+def _schedule_kpis(schedule) -> dict:
+    """{specialità: _specialty_kpis} delle specialità non vuote, nell'ordine dello schedule."""
+    return {
+        specialty: _specialty_kpis(occupancy)
+        for specialty, occupancy in build_occupancy(schedule).items()
+    }
+
+
+def specialty_summary(schedule) -> pd.DataFrame:
+    """KPI per specialità di uno schedule.
+
+    Returns:
+        DataFrame indicizzato per specialità con patients, total_wait,
+        mean_wait, max_wait, max_day (>= 0), overdue (attesa > MTB),
+        rooms, or_minutes e overtime_minutes (su tutti i giorni)
+    """
+    kpis = _schedule_kpis(schedule)
+    columns = ["patients", "total_wait", "mean_wait", "max_wait", "max_day", "overdue",
+               "rooms", "or_minutes", "overtime_minutes"]
+    return pd.DataFrame(
+        [[values[column] for column in columns] for values in kpis.values()],
+        index=pd.Index(list(kpis), name="specialty"),
+        columns=columns,
+    )
+
+
+def weekly_usage(schedule) -> pd.DataFrame:
+    """Minuti usati per specialità e settimana (1 = giorni 0..week_length_days-1).
+
+    Ogni specialità ha tutte le settimane fino a quella del suo ultimo
+    opDay, anche quelle senza interventi.
+
+    Returns:
+        DataFrame con specialty, week, or_minutes, overtime_minutes
+    """
+    kpis = _schedule_kpis(schedule)
+    lengths = [len(values["or_weekly"]) for values in kpis.values()]
+    return pd.DataFrame({
+        "specialty": np.repeat(np.array(list(kpis), dtype=object), lengths),
+        "week": np.concatenate([np.arange(1, n + 1) for n in lengths]) if kpis else np.array([], dtype=np.int64),
+        "or_minutes": np.concatenate([v["or_weekly"] for v in kpis.values()]) if kpis else np.array([]),
+        "overtime_minutes": np.concatenate([v["overtime_weekly"] for v in kpis.values()]) if kpis else np.array([]),
+    })
+
+
+def scenario_aggregates(schedule) -> dict:
+    """Aggregati JSON-serializzabili di uno scenario.
+
+    Contengono quanto serve a comparison_kpis senza i pazienti, così da
+    poter essere salvati in cache.
+
+    Returns:
+        {specialità: {"pazienti", "attesa_totale", "max_day", "sale",
+        "or_settimanale", "straordinari_settimanali"}}
+    """
+    return {
+        specialty: {
+            "pazienti": values["patients"],
+            "attesa_totale": values["total_wait"],
+            "max_day": values["max_day"],
+            "sale": values["rooms"],
+            "or_settimanale": values["or_weekly"].tolist(),
+            "straordinari_settimanali": values["overtime_weekly"].tolist(),
+        }
+        for specialty, values in _schedule_kpis(schedule).items()
+    }
+
+
+def is_scenario_aggregates(scenario) -> bool:
+    """True se lo scenario contiene già gli aggregati di scenario_aggregates."""
+    return all(isinstance(value, dict) for _, value in scenario.items())
+#endregion
+
+
+#region: Confronto tra scenari
+def comparison_kpis(scenari: dict) -> dict:
+    """KPI per la tabella di confronto di più scenari.
+
+    Args:
+        scenari: {nome scenario: schedule oppure scenario_aggregates(...)}
+
+    Returns:
+        Dict con:
+        - "num_weeks": settimane della tabella (fino all'ultimo opDay di
+          tutti gli scenari)
+        - "specialties": una riga per (scenario, specialità) non vuota con
+          patients, total_wait, mean_wait, rooms, or_available e
+          overtime_available (minuti disponibili a settimana)
+        - "weeks": num_weeks righe per ogni riga di "specialties", nello
+          stesso ordine, con week, or_minutes, overtime_minutes, or_pct,
+          overtime_pct (0 se la disponibilità è nulla)
+        - "months": le medie mensili (gruppi di ``weeks_per_month``
+          settimane) di or_pct e overtime_pct settimanali arrotondati a 1
+          decimale, come nella tabella storica, con il numero di settimane
+    """
+    rows = [
+        (scenario_name, specialty, aggregates)
+        for scenario_name, scenario in scenari.items()
+        for specialty, aggregates in (
+            scenario if is_scenario_aggregates(scenario) else scenario_aggregates(scenario)
+        ).items()
+    ]
+    max_day = max([0] + [aggregates["max_day"] for _, _, aggregates in rows])
+    num_weeks = max_day // Settings.week_length_days + 1
+
+    specialties = pd.DataFrame({
+        "scenario": [scenario_name for scenario_name, _, _ in rows],
+        "specialty": [specialty for _, specialty, _ in rows],
+        "patients": np.array([a["pazienti"] for _, _, a in rows], dtype=np.int64),
+        "total_wait": np.array([a["attesa_totale"] for _, _, a in rows], dtype=np.int64),
+        "rooms": np.array([a["sale"] for _, _, a in rows], dtype=np.int64),
+    })
+    specialties["mean_wait"] = specialties["total_wait"] / specialties["patients"]
+    specialties["or_available"] = (
+        Settings.daily_operation_limit * Settings.week_length_days * specialties["rooms"]
+    )
+    specialties["overtime_available"] = Settings.weekly_extra_time_pool * specialties["rooms"]
+
+    # Matrici (riga, settimana); le settimane oltre l'ultimo opDay della specialità restano a 0
+    used = {"or_minutes": np.zeros((len(rows), num_weeks)), "overtime_minutes": np.zeros((len(rows), num_weeks))}
+    for i, (_, _, aggregates) in enumerate(rows):
+        for column, key in (("or_minutes", "or_settimanale"), ("overtime_minutes", "straordinari_settimanali")):
+            used[column][i, :len(aggregates[key])] = aggregates[key]
+    pct = {
+        "or_pct": _percentage(used["or_minutes"], specialties["or_available"].to_numpy()),
+        "overtime_pct": _percentage(used["overtime_minutes"], specialties["overtime_available"].to_numpy()),
+    }
+
+    weeks = pd.DataFrame({
+        "scenario": np.repeat(specialties["scenario"].to_numpy(), num_weeks),
+        "specialty": np.repeat(specialties["specialty"].to_numpy(), num_weeks),
+        "week": np.tile(np.arange(1, num_weeks + 1), len(rows)),
+        **{column: values.ravel() for column, values in {**used, **pct}.items()},
+    })
+
+    # Come la tabella storica: media delle percentuali settimanali arrotondate a 1 decimale
+    weeks_per_month = Settings.weeks_per_month
+    bounds = [(w, min(w + weeks_per_month, num_weeks)) for w in range(0, num_weeks, weeks_per_month)]
+    rounded = {column: [[round(v, 1) for v in row] for row in values.tolist()] for column, values in pct.items()}
+    months = pd.DataFrame({
+        "scenario": np.repeat(specialties["scenario"].to_numpy(), len(bounds)),
+        "specialty": np.repeat(specialties["specialty"].to_numpy(), len(bounds)),
+        "month": np.tile(np.arange(1, len(bounds) + 1), len(rows)),
+        "weeks": np.tile([last - first for first, last in bounds], len(rows)),
+        **{
+            column: [sum(row[first:last]) / (last - first) for row in values for first, last in bounds]
+            for column, values in rounded.items()
+        },
+    })
+
+    return {"num_weeks": num_weeks, "specialties": specialties, "weeks": weeks, "months": months}
+
+
+def _percentage(used: np.ndarray, available: np.ndarray) -> np.ndarray:
+    """100 * used / available per riga; 0 dove la disponibilità è nulla."""
+    available = available.astype(np.float64)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(available > 0, used / available * 100, 0.0)
+#endregion
+
+
+if __name__ == "__main__":
+    from CommonClass.JsonCodec import load_schedule
+
+    parser = argparse.ArgumentParser(description="Riepilogo dei KPI di file di schedule")
+    parser.add_argument("file", nargs="+", help="File weekly_schedule.json (anche .gz)")
+    parser.add_argument("--mesi", action="store_true", help="Mostra anche l'utilizzo medio mensile")
+    args = parser.parse_args()
+
+    schedules = {path: load_schedule(path, columnar=True) for path in args.file}
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.precision", 1):
+        for path, schedule in schedules.items():
+            print(f"\n{path}")
+            print(specialty_summary(schedule).to_string())
+        if args.mesi:
+            print()
+            print(comparison_kpis(schedules)["months"].to_string(index=False))
@@ -0,0 +1,125 @@
+"""Occupazione delle sale per giorno e sala, calcolata una volta per schedule.
+
+I grafici e i KPI leggono tutti gli stessi totali (minuti EOT/ROT, numero
+di pazienti e straordinario per giorno e sala): invece di riscorrere la
+lista dei pazienti per ogni coppia (giorno, sala), DayRoomOccupancy li
+calcola con una sola passata (np.bincount) in array NumPy indicizzati per
+[giorno, sala]. Graphs.MakeGraphs costruisce l'occupazione dello schedule
+una volta (build_occupancy) e la passa a ogni grafico; Kpi la usa per i
+minuti giornalieri, quindi la tabella di confronto accetta anche scenari
+già convertiti.
+
+Le somme seguono l'ordine dei pazienti nello schedule, come le somme
+Python che sostituiscono: i totali sono identici a quelli di prima.
+"""
+
+import operator
+import os
+import sys
+
+import numpy as np
+
+if os.path.basename(__file__) != "main.py":
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../", "Code")))
+
+from CommonClass.PatientTable import PatientTable
+from settings import Settings
+
+# Colonne dei pazienti usate dall'occupazione e dai KPI: prima le intere, poi eot e rot
+_COLUMNS = ("day", "mtb", "opDay", "workstation", "eot", "rot")
+_INTEGER_COLUMNS = 4
+_get_columns = operator.attrgetter(*_COLUMNS)
+
+
+def patient_columns(patients) -> dict:
+    """Colonne day, mtb, opDay, workstation (interi), eot e rot (NaN se mancante).
+
+    Una PatientTable è usata così com'è; una lista di Patient è convertita
+    con una sola passata.
+    """
+    if isinstance(patients, PatientTable):
+        return {name: getattr(patients, name) for name in _COLUMNS}
+    rows = np.array([_get_columns(p) for p in patients], dtype=np.float64).reshape(-1, len(_COLUMNS))
+    columns = {name: rows[:, i].astype(np.int64) for i, name in enumerate(_COLUMNS[:_INTEGER_COLUMNS])}
+    columns.update({name: rows[:, i] for i, name in enumerate(_COLUMNS) if i >= _INTEGER_COLUMNS})
+    return columns
+
+
+class DayRoomOccupancy:
+    """Minuti, pazienti e straordinario di una specialità per giorno e sala.
+
+    Gli array vanno dal giorno ``first_day`` (0, o l'opDay più basso se
+    negativo) a ``last_day`` (l'opDay più alto, almeno 0); la riga di un
+    giorno è ``day - first_day`` e la colonna di una sala è
+    ``workstation - 1``. Per leggere un intervallo di giorni qualsiasi,
+    con zeri fuori dai giorni presenti, si usa days().
+
+    Attributes:
+        eot, rot, count: [giorno, sala] minuti EOT e ROT e numero di pazienti
+        overtime: [giorno, sala] minuti ROT oltre ``daily_operation_limit``
+        day_eot, day_rot, day_count: [giorno] gli stessi totali su tutte le
+            sale, compresi i pazienti senza una sala valida
+        day_overtime: [giorno] minuti ROT oltre ``daily_operation_limit``
+            x sale
+        columns: colonne dei pazienti (patient_columns)
+        patients: i pazienti da cui è stata costruita
+    """
+
+    __slots__ = (
+        "specialty", "rooms", "first_day", "last_day", "columns", "patients",
+        "eot", "rot", "count", "overtime",
+        "day_eot", "day_rot", "day_count", "day_overtime",
+    )
+
+    def __init__(self, specialty: str, patients, rooms: int | None = None):
+        self.specialty = specialty
+        self.rooms = rooms if rooms is not None else Settings.workstations_config.get(specialty, 1)
+        self.patients = patients
+        self.columns = columns = patient_columns(patients)
+
+        op_day = columns["opDay"].astype(np.int64)
+        self.first_day = min(int(op_day.min()), 0) if len(op_day) else 0
+        self.last_day = max(int(op_day.max()), 0) if len(op_day) else 0
+        num_days = self.last_day - self.first_day + 1
+        day_index = op_day - self.first_day
+
+        self.day_eot = np.bincount(day_index, weights=columns["eot"], minlength=num_days)
+        self.day_rot = np.bincount(day_index, weights=columns["rot"], minlength=num_days)
+        self.day_count = np.bincount(day_index, minlength=num_days)
+
+        # Indice piatto (giorno, sala) dei soli pazienti con una sala della specialità
+        workstation = columns["workstation"].astype(np.int64)
+        valid = (workstation >= 1) & (workstation <= self.rooms)
+        cell = day_index[valid] * self.rooms + workstation[valid] - 1
+        shape = (num_days, self.rooms)
+        self.eot = np.bincount(cell, weights=columns["eot"][valid], minlength=num_days * self.rooms).reshape(shape)
+        self.rot = np.bincount(cell, weights=columns["rot"][valid], minlength=num_days * self.rooms).reshape(shape)
+        self.count = np.bincount(cell, minlength=num_days * self.rooms).reshape(shape)
+
+        limit = Settings.daily_operation_limit
+        self.overtime = np.maximum(self.rot - limit, 0.0)
+        self.day_overtime = np.maximum(self.day_rot - limit * self.rooms, 0.0)
+
+    def __len__(self):
+        return len(self.columns["opDay"])
+
+    def days(self, name: str, start: int, stop: int) -> np.ndarray:
+        """Righe dei giorni ``start``..``stop - 1`` dell'array ``name`` (0 dove non ci sono giorni)."""
+        values = getattr(self, name)
+        window = np.zeros((stop - start,) + values.shape[1:], dtype=values.dtype)
+        first, last = max(start, self.first_day), min(stop, self.last_day + 1)
+        if first < last:
+            window[first - start:last - start] = values[first - self.first_day:last - self.first_day]
+        return window
+
+
+def build_occupancy(schedule) -> dict:
+    """{specialità: DayRoomOccupancy} delle specialità non vuote, nell'ordine dello schedule.
+
+    Le specialità già convertite sono riusate così come sono.
+    """
+    return {
+        specialty: patients if isinstance(patients, DayRoomOccupancy) else DayRoomOccupancy(specialty, patients)
+        for specialty, patients in schedule.items()
+        if patients is not None and len(patients) > 0
+    }
@@ -0,0 +1,199 @@
+"""
+PatientRecordBinary.py
+======================
+Formato colonnare binario per i record pazienti, alternativo a
+``Patient_Record.csv``.
+
+Layout del file (little-endian)::
+
+    magic      8 byte   b"MMSDPR01"
+    header_len uint32   lunghezza dell'header JSON in byte
+    header     JSON     {"version", "rows", "specialties", "columns"}
+    padding             fino al primo multiplo di _ALIGNMENT
+    colonne             un array contiguo per colonna (struct-of-arrays),
+                        ciascuno allineato a _ALIGNMENT byte
+
+Ogni colonna dell'header riporta ``dtype`` (stringa NumPy) e ``offset``
+assoluto nel file, quindi il lettore può mappare le colonne in memoria con
+``np.memmap`` senza parsing né conversioni riga per riga.
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+_MAGIC = b"MMSDPR01"
+_VERSION = 1
+_ALIGNMENT = 64
+
+# Colonne del record paziente e relativi dtype su disco
+_COLUMNS = {
+    "id": "<i4",
+    "specialty": "<i2",
+    "eot": "<f8",
+    "day": "<i4",
+    "mtb": "<i4",
+    "rot": "<f8",
+}
+
+PATIENT_RECORD_BINARY_FILENAME = "Patient_Record.bin"
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def records_to_table(patient_records) -> dict:
+    """
+    Converte le righe [id, specialità, EOT, giorno, MTB, ROT] (formato del
+    generatore legacy) nella tabella colonnare usata dal formato binario.
+    Le specialità sono codificate nell'ordine di prima apparizione.
+    """
+    specialties = list(dict.fromkeys(record[1] for record in patient_records))
+    codes = {name: code for code, name in enumerate(specialties)}
+    return {
+        "id": np.array([r[0] for r in patient_records], dtype=np.int64),
+        "specialty": np.array([codes[r[1]] for r in patient_records], dtype=np.int16),
+        "eot": np.array([r[2] for r in patient_records], dtype=np.float64),
+        "day": np.array([r[3] for r in patient_records], dtype=np.int64),
+        "mtb": np.array([r[4] for r in patient_records], dtype=np.int64),
+        "rot": np.array([r[5] for r in patient_records], dtype=np.float64),
+        "specialties": specialties,
+    }
+
+
+def write_patient_record_binary(table: dict, filename: str) -> str:
+    """
+    Scrive la tabella colonnare dei pazienti nel formato binario.
+
+    Parameters
+    ----------
+    table : dict
+        Tabella {"id", "specialty", "eot", "day", "mtb", "rot", "specialties"}
+        prodotta da ``generate_patient_table`` o ``records_to_table``.
+    filename : str
+        Percorso del file di output.
+
+    Returns
+    -------
+    str
+        Percorso del file scritto.
+    """
+    rows = len(table["id"])
+    arrays = {
+        name: np.ascontiguousarray(table[name], dtype=dtype)
+        for name, dtype in _COLUMNS.items()
+    }
+
+    # L'header contiene gli offset assoluti: si stima la sua dimensione con
+    # offset provvisori e si ricalcola finché il layout non è stabile.
+    columns = {}
+    data_start = 0
+    while True:
+        offset = data_start
+        for name, dtype in _COLUMNS.items():
+            columns[name] = {"dtype": dtype, "offset": offset}
+            offset = _align(offset + arrays[name].nbytes)
+        header = json.dumps(
+            {
+                "version": _VERSION,
+                "rows": rows,
+                "specialties": list(table["specialties"]),
+                "columns": columns,
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+        required_start = _align(len(_MAGIC) + 4 + len(header))
+        if required_start == data_start:
+            break
+        data_start = required_start
+
+    with open(filename, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for name in _COLUMNS:
+            f.write(b"\0" * (columns[name]["offset"] - f.tell()))
+            f.write(arrays[name].tobytes())
+
+    return filename
+
+
+def read_patient_record_binary(filename: str, mmap: bool = True) -> dict:
+    """
+    Legge un file binario dei record pazienti.
+
+    Parameters
+    ----------
+    filename : str
+        Percorso al file scritto da ``write_patient_record_binary``.
+    mmap : bool, optional
+        Se True (default) le colonne sono ``np.memmap`` in sola lettura,
+        altrimenti vengono caricate in memoria.
+
+    Returns
+    -------
+    dict
+        Tabella colonnare {"id", "specialty", "eot", "day", "mtb", "rot",
+        "specialties"}.
+    """
+    with open(filename, "rb") as f:
+        magic = f.read(len(_MAGIC))
+        if magic != _MAGIC:
+            raise ValueError(f"File non riconosciuto come record binario: {filename}")
+        (header_len,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+
+    if header.get("version") != _VERSION:
+        raise ValueError(f"Versione del formato non supportata: {header.get('version')}")
+
+    rows = header["rows"]
+    table = {"specialties": header["specialties"]}
+    for name, column in header["columns"].items():
+        dtype = np.dtype(column["dtype"])
+        if rows == 0:
+            table[name] = np.empty(0, dtype=dtype)
+        elif mmap:
+            table[name] = np.memmap(
+                filename, dtype=dtype, mode="r", offset=column["offset"], shape=(rows,)
+            )
+        else:
+            table[name] = np.fromfile(
+                filename, dtype=dtype, count=rows, offset=column["offset"]
+            )
+    return table
+
+
+def split_table_by_specialty(table: dict) -> dict:
+    """
+    Suddivide la tabella colonnare per specialità senza costruire righe.
+
+    Le specialità sono restituite nell'ordine di prima apparizione nel file
+    (lo stesso ordine prodotto dalla lettura del CSV).
+
+    Returns
+    -------
+    dict[str, dict[str, np.ndarray]]
+        {specialità: {colonna: array}} con le righe nell'ordine del file.
+    """
+    codes = np.asarray(table["specialty"])
+    if codes.size == 0:
+        return {}
+
+    present, first_index = np.unique(codes, return_index=True)
+    result = {}
+    for code in present[np.argsort(first_index)]:
+        rows = np.flatnonzero(codes == code)
+        result[table["specialties"][int(code)]] = {
+            name: np.asarray(table[name])[rows] for name in _COLUMNS if name != "specialty"
+        }
+    return result
+
+
+def is_patient_record_binary(filename: str) -> bool:
+    """True se il file ha l'estensione del formato binario dei record."""
+    return os.path.splitext(filename)[1].lower() == os.path.splitext(
+        PATIENT_RECORD_BINARY_FILENAME
+    )[1]
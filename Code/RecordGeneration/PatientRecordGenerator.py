@@ -4,6 +4,11 @@ import numpy as np
 import time
 import os
 from settings import Settings
+from RecordGeneration.PatientRecordBinary import (
+    PATIENT_RECORD_BINARY_FILENAME,
+    records_to_table,
+    write_patient_record_binary,
+)
 
 
 def set_seed(seed):
@@ -88,6 +93,68 @@ def generate_time(K2_params, K7_params, K8_params, K9_params, K3_params):
     return round(t_K2 + t_K7 + t_K8 + t_K9 + t_K3, 3)
 
 
+def sample_array_from_distribution(
+    rng, distribution, return_type, size, mean=None, std=None, shape=None, scale=None
+) -> np.ndarray:
+    # Versione vettoriale di sample_from_distribution: estrae `size` campioni
+    # con una sola chiamata al generatore `rng` (np.random.Generator).
+    if distribution == "lognormal":
+        values = rng.lognormal(mean, std, size)
+    elif distribution == "gamma":
+        values = rng.gamma(shape, scale, size)
+    elif distribution == "weibull":
+        values = rng.weibull(shape, size) * scale
+    elif distribution == "normal":
+        values = rng.normal(mean, std, size)
+    elif distribution == "poisson":
+        values = rng.poisson(mean, size)
+    else:
+        raise ValueError(
+            "Distribuzione non supportata. Scegli tra 'lognormal', 'gamma', 'weibull', 'normal', 'poisson'."
+        )
+
+    # Stesso arrotondamento della versione scalare (round half-to-even)
+    if return_type == int:
+        return np.rint(values).astype(np.int64)
+    return np.round(values.astype(np.float64), 4)
+
+
+def generate_time_array(rng, params, size) -> np.ndarray:
+    # Versione vettoriale di generate_time: estrae le fasi K2/K7/K8/K9/K3
+    # per `size` pazienti della stessa specialità e ne restituisce la somma.
+    total = np.zeros(size, dtype=np.float64)
+    for phase in ("K2", "K7", "K8", "K9", "K3"):
+        phase_params = params[phase]
+        total += sample_array_from_distribution(
+            rng,
+            phase_params["distribution"],
+            float,
+            size,
+            mean=phase_params.get("mean"),
+            std=phase_params.get("std"),
+            shape=phase_params.get("shape"),
+            scale=phase_params.get("scale"),
+        )
+    return np.round(total, 3)
+
+
+def table_to_records(table) -> list[list]:
+    # Converte la tabella colonnare in righe [id, specialità, EOT, giorno, MTB, ROT]
+    # nello stesso ordine delle colonne del file Patient_Record.csv.
+    specialties = table["specialties"]
+    return [
+        [pid, specialties[code], eot, day, mtb, rot]
+        for pid, code, eot, day, mtb, rot in zip(
+            table["id"].tolist(),
+            table["specialty"].tolist(),
+            table["eot"].tolist(),
+            table["day"].tolist(),
+            table["mtb"].tolist(),
+            table["rot"].tolist(),
+        )
+    ]
+
+
 def write_reports(
     patient_records, weekly_report, seed, project_root
 ) -> tuple[str, str]:
@@ -104,20 +171,47 @@ def write_reports(
     patients_filename = os.path.join(seed_dir, "Patient_Record.csv")
     weekly_filename = os.path.join(seed_dir, "Weekly_Report.csv")
 
-    # Scrittura del file CSV dei pazienti
-    with open(patients_filename, mode="w", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-        writer.writerow(
-            [
-                "Patient ID",
-                "Specialty",
-                "EOT (Estimated Operation Time in minutes)",
-                "Day (Day Added to Waiting List)",
-                "MTB (Priority, max waiting days)",
-                "ROT (Real Operation Time in minutes)",
-            ]
+    # Formato dei record pazienti: "csv", "binary" oppure "both"
+    record_format = Settings.patient_record_format
+    if record_format not in ("csv", "binary", "both"):
+        raise ValueError(
+            "Formato record non supportato. Scegli tra 'csv', 'binary', 'both'."
         )
-        writer.writerows(patient_records)
+
+    if record_format in ("binary", "both"):
+        # Il formato binario è colonnare: le righe del generatore legacy vengono convertite
+        table = (
+            patient_records
+            if isinstance(patient_records, dict)
+            else records_to_table(patient_records)
+        )
+        binary_filename = write_patient_record_binary(
+            table, os.path.join(seed_dir, PATIENT_RECORD_BINARY_FILENAME)
+        )
+
+    if record_format in ("csv", "both"):
+        # I record possono arrivare anche come tabella colonnare (generatore vettoriale)
+        if isinstance(patient_records, dict):
+            patient_records = table_to_records(patient_records)
+
+        # Scrittura del file CSV dei pazienti
+        with open(patients_filename, mode="w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(
+                [
+                    "Patient ID",
+                    "Specialty",
+                    "EOT (Estimated Operation Time in minutes)",
+                    "Day (Day Added to Waiting List)",
+                    "MTB (Priority, max waiting days)",
+                    "ROT (Real Operation Time in minutes)",
+                ]
+            )
+            writer.writerows(patient_records)
+
+    # Se disponibile, il file binario è quello restituito per la rilettura
+    if record_format != "csv":
+        patients_filename = binary_filename
 
     # Scrittura del file CSV del report settimanale
     with open(weekly_filename, mode="w", newline="", encoding="utf-8") as report_file:
@@ -128,6 +222,93 @@ def write_reports(
     return patients_filename, weekly_filename
 
 
+def generate_patient_table(
+    specialties,
+    weekly_hours,
+    num_weeks,
+    seed,
+    specialty_params,
+    people_distribution,
+    priority_params,
+):
+    # Motore di generazione vettoriale: estrae arrivi, specialità, fasi K,
+    # moltiplicatori ROT e priorità MTB dell'intero orizzonte come array NumPy.
+    # Usa un np.random.Generator (PCG64) dedicato inizializzato con `seed`:
+    # a parità di seed lo stream è riproducibile, ma NON coincide con quello
+    # della modalità "legacy" (vedi Settings.patient_generation_mode).
+    #
+    # Restituisce (tabella, weekly_report) dove la tabella è un dizionario
+    # colonnare {"id", "specialty", "eot", "day", "mtb", "rot"} di array NumPy,
+    # con "specialty" codificata come indice nella lista "specialties".
+    # `weekly_hours` è accettato per avere la stessa firma della versione legacy.
+    rng = np.random.default_rng(seed)
+    week_days = Settings.week_length_days
+    num_days = num_weeks * week_days
+
+    # Numero di arrivi per ogni giorno dell'orizzonte
+    people_params = Settings.daily_patient_arrival_distribution_params.get(
+        people_distribution, {}
+    )
+    if people_distribution == "normal":
+        arrivals = np.rint(
+            rng.normal(
+                people_params.get("mean", 15), people_params.get("std", 5), num_days
+            )
+        ).astype(np.int64)
+        arrivals = np.maximum(1, arrivals)
+    elif people_distribution == "poisson":
+        arrivals = np.maximum(1, rng.poisson(people_params.get("mean", 25), num_days))
+    else:
+        arrivals = np.ones(num_days, dtype=np.int64)
+
+    num_patients = int(arrivals.sum())
+    # Giorni assoluti 1..num_days, già ordinati per giorno di inserimento
+    day = np.repeat(np.arange(1, num_days + 1, dtype=np.int64), arrivals)
+    specialty = rng.integers(0, len(specialties), num_patients).astype(np.int16)
+
+    eot = np.empty(num_patients, dtype=np.float64)
+    mtb = np.empty(num_patients, dtype=np.int64)
+    for code, operation_type in enumerate(specialties):
+        mask = specialty == code
+        count = int(mask.sum())
+        if count == 0:
+            continue
+        eot[mask] = generate_time_array(rng, specialty_params[operation_type], count)
+        prio_params = priority_params[operation_type]
+        mtb[mask] = sample_array_from_distribution(
+            rng,
+            prio_params["distribution"],
+            int,
+            count,
+            mean=prio_params["mean"],
+            std=prio_params["std"],
+        )
+
+    rot_min, rot_max = Settings.rot_over_eot_multiplier_range
+    rot = np.round(eot * rng.uniform(rot_min, rot_max, num_patients), 3)
+
+    table = {
+        "id": np.arange(1, num_patients + 1, dtype=np.int64),
+        "specialty": specialty,
+        "eot": eot,
+        "day": day,
+        "mtb": mtb,
+        "rot": rot,
+        "specialties": list(specialties),
+    }
+
+    # Report settimanale calcolato per gruppi sulla colonna dei giorni
+    week_index = (day - 1) // week_days
+    used_minutes = np.bincount(week_index, weights=eot, minlength=num_weeks)
+    patients_in_week = np.bincount(week_index, minlength=num_weeks)
+    weekly_report = [
+        [week + 1, round(float(used_minutes[week]), 2), int(patients_in_week[week])]
+        for week in range(num_weeks)
+    ]
+
+    return table, weekly_report
+
+
 def generate_csv(
     specialties,
     weekly_hours,
@@ -137,11 +318,33 @@ def generate_csv(
     people_distribution,
     priority_params,  # <-- nuovo parametro
     filepath,
+    generation_mode=None,
 ) -> tuple[str, str]:
     # Genera un file CSV con i dati simulati dei pazienti in lista d'attesa.
     # Genera anche un report settimanale con i minuti utilizzati e il numero di pazienti iscritti.
+    # generation_mode: "legacy" (default, una chiamata np.random per fase e paziente,
+    # ordine di estrazione storico) oppure "vectorized" (generate_patient_table).
     if seed is None:
         seed = int(time.time() * 1000) % (2**32 - 1)
+    if generation_mode is None:
+        generation_mode = Settings.patient_generation_mode
+
+    if generation_mode == "vectorized":
+        table, weekly_report = generate_patient_table(
+            specialties,
+            weekly_hours,
+            num_weeks,
+            seed,
+            specialty_params,
+            people_distribution,
+            priority_params,
+        )
+        return write_reports(table, weekly_report, seed, filepath)
+    if generation_mode != "legacy":
+        raise ValueError(
+            "Modalità di generazione non supportata. Scegli tra 'legacy', 'vectorized'."
+        )
+
     set_seed(seed)  # Imposta il seed per la ripetibilità
 
     patient_records = []  # Lista che conterrà tutti i record dei pazienti
@@ -0,0 +1,304 @@
+"""Greedy packing heuristics for the weekly EOT schedule.
+
+The weekly EOT problem is a multiple-bin packing over (day, room) slots with
+capacity ``Settings.daily_operation_limit``. The helpers here build feasible
+assignments quickly, e.g. as MIP starts for the weekly model, or as a
+solver-free weekly planner (``pack_week_heuristic``).
+"""
+
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+if os.path.basename(__file__) != "main.py":
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "../../", "Code"))
+    )
+
+from CommonClass.Patient import Patient
+from settings import Settings
+
+Slot = Tuple[int, int]
+
+
+def empty_slot_loads(specialty: str, week_start_day: int) -> Dict[Slot, float]:
+    """Return the (day, room) slots of the week, in day-then-room order, all empty."""
+    operating_rooms = Settings.workstations_config[specialty]
+    return {
+        (day, room): 0.0
+        for day in range(week_start_day, week_start_day + Settings.week_length_days)
+        for room in range(1, operating_rooms + 1)
+    }
+
+
+def first_fit_decreasing(
+    patients: List[Patient],
+    specialty: str,
+    week_start_day: int,
+    loads: Optional[Dict[Slot, float]] = None,
+) -> Dict[int, Slot]:
+    """Pack patients by decreasing EOT into the first (day, room) slot with room.
+
+    Args:
+        patients: Patients to pack.
+        specialty: Specialty, used for the number of rooms.
+        week_start_day: First day of the week.
+        loads: Current slot loads, updated in place (default: empty week).
+
+    Returns:
+        Assignment {patient id: (day, room)}; patients that fit nowhere are
+        left out.
+    """
+    if loads is None:
+        loads = empty_slot_loads(specialty, week_start_day)
+    day_limit = Settings.daily_operation_limit
+
+    assignment: Dict[int, Slot] = {}
+    for patient in sorted(patients, key=lambda p: (-p.eot, p.id)):
+        for slot, used in loads.items():
+            if used + patient.eot <= day_limit:
+                loads[slot] = used + patient.eot
+                assignment[patient.id] = slot
+                break
+    return assignment
+
+
+def shift_previous_plan(
+    patients: List[Patient],
+    previous_plan: List[Patient],
+    specialty: str,
+    week_start_day: int,
+    loads: Optional[Dict[Slot, float]] = None,
+) -> Dict[int, Slot]:
+    """Carry last week's assignment of the carryover patients into this week.
+
+    Each patient still in the queue that was planned last week keeps its room
+    and weekday, shifted by one week, as long as the slot has capacity left.
+
+    Returns:
+        Assignment {patient id: (day, room)} of the shifted patients.
+    """
+    if loads is None:
+        loads = empty_slot_loads(specialty, week_start_day)
+    day_limit = Settings.daily_operation_limit
+    week_days = Settings.week_length_days
+
+    previous_by_id = {p.id: p for p in previous_plan}
+    assignment: Dict[int, Slot] = {}
+    for patient in sorted(patients, key=lambda p: p.id):
+        previous = previous_by_id.get(patient.id)
+        if previous is None:
+            continue
+        slot = (previous.opDay + week_days, previous.workstation)
+        if slot in loads and loads[slot] + patient.eot <= day_limit:
+            loads[slot] += patient.eot
+            assignment[patient.id] = slot
+    return assignment
+
+
+def build_warm_start(
+    patients: List[Patient],
+    specialty: str,
+    week_start_day: int,
+    previous_plan: Optional[List[Patient]] = None,
+) -> Dict[int, Slot]:
+    """Build a feasible initial assignment for the weekly EOT model.
+
+    Last week's plan is shifted first (when given); the remaining patients are
+    packed with first-fit decreasing.
+
+    Returns:
+        Assignment {patient id: (day, room)}.
+    """
+    loads = empty_slot_loads(specialty, week_start_day)
+    assignment: Dict[int, Slot] = {}
+    if previous_plan:
+        assignment.update(
+            shift_previous_plan(patients, previous_plan, specialty, week_start_day, loads)
+        )
+    remaining = [p for p in patients if p.id not in assignment]
+    assignment.update(first_fit_decreasing(remaining, specialty, week_start_day, loads))
+    return assignment
+
+
+def order_rooms_by_load(
+    assignment: Dict[int, Slot], patients: List[Patient]
+) -> Dict[int, Slot]:
+    """Relabel the rooms of each day so that room 1 has the largest EOT load.
+
+    Makes an assignment compatible with the room-ordering (symmetry breaking)
+    constraints of the weekly model.
+    """
+    eot_by_id = {p.id: p.eot for p in patients}
+    loads: Dict[Slot, float] = {}
+    for patient_id, slot in assignment.items():
+        loads[slot] = loads.get(slot, 0.0) + eot_by_id[patient_id]
+
+    relabel: Dict[Slot, Slot] = {}
+    for day in sorted({day for day, _ in loads}):
+        rooms = sorted(
+            (room for slot_day, room in loads if slot_day == day),
+            key=lambda room: (-loads[(day, room)], room),
+        )
+        for new_room, room in enumerate(rooms, start=1):
+            relabel[(day, room)] = (day, new_room)
+    return {patient_id: relabel[slot] for patient_id, slot in assignment.items()}
+
+
+def assign_rooms(
+    planned: List[Patient], specialty: str, week_start_day: int
+) -> Tuple[List[Patient], List[Patient]]:
+    """Assign rooms to a day-level plan (aggregated weekly formulation).
+
+    Patients are packed by decreasing EOT into the first room of their planned
+    day with enough capacity. Patients never change day, so no MTB deadline
+    is crossed; ``workstation`` is updated in place.
+
+    Returns:
+        (assigned patients, patients that fit in no room of their day)
+    """
+    loads = empty_slot_loads(specialty, week_start_day)
+    day_limit = Settings.daily_operation_limit
+    rooms = Settings.workstations_config[specialty]
+
+    assigned: List[Patient] = []
+    unassigned: List[Patient] = []
+    for patient in sorted(planned, key=lambda p: (p.opDay, -p.eot, p.id)):
+        slot = next(
+            (
+                (patient.opDay, room)
+                for room in range(1, rooms + 1)
+                if loads[(patient.opDay, room)] + patient.eot <= day_limit
+            ),
+            None,
+        )
+        if slot is None:
+            unassigned.append(patient)
+            continue
+        loads[slot] += patient.eot
+        patient.workstation = slot[1]
+        assigned.append(patient)
+    return assigned, unassigned
+
+
+def _best_fit_slot(
+    loads: Dict[Slot, float], eot: float, last_day: Optional[int] = None
+) -> Optional[Slot]:
+    """Slot with the least capacity left that still fits ``eot``.
+
+    With ``last_day`` only slots up to that day are considered.
+    """
+    day_limit = Settings.daily_operation_limit
+    best = None
+    best_left = None
+    for slot, used in loads.items():
+        if last_day is not None and slot[0] > last_day:
+            continue
+        left = day_limit - used - eot
+        if left >= 0 and (best_left is None or left < best_left):
+            best, best_left = slot, left
+    return best
+
+
+def _make_room(
+    loads: Dict[Slot, float],
+    assignment: Dict[int, Slot],
+    eot_by_id: Dict[int, float],
+    deadline_by_id: Dict[int, int],
+    eot: float,
+) -> Optional[Slot]:
+    """Move one planned patient to another slot to free room for ``eot``.
+
+    A patient planned by its deadline is only moved to slots up to that day.
+
+    Returns the freed slot, or None if no single move frees enough room.
+    """
+    day_limit = Settings.daily_operation_limit
+    for patient_id, slot in sorted(assignment.items(), key=lambda item: eot_by_id[item[0]]):
+        moved = eot_by_id[patient_id]
+        if day_limit - loads[slot] + moved < eot:
+            continue
+        deadline = deadline_by_id[patient_id]
+        last_day = deadline if slot[0] <= deadline else None
+        for target, used in loads.items():
+            if last_day is not None and target[0] > last_day:
+                continue
+            if target != slot and used + moved <= day_limit:
+                loads[slot] -= moved
+                loads[target] += moved
+                assignment[patient_id] = target
+                return slot
+    return None
+
+
+def pack_week_heuristic(
+    patients: List[Patient],
+    specialty: str,
+    week_start_day: int,
+    local_search: bool = True,
+) -> Dict[int, Slot]:
+    """Solver-free weekly EOT packing, MTB-aware.
+
+    1. Urgent patients (deadline ``day + mtb`` within this week) are packed
+       first by best-fit decreasing EOT, on a day not after their deadline
+       when possible.
+    2. The others are considered by increasing EOT (this maximizes the number
+       of patients, the objective of the weekly MIP): the shortest ones that
+       fit in the remaining capacity are packed by best-fit decreasing.
+    3. Local search: each left-out patient tries to enter by moving one
+       planned patient to another slot, never past a deadline it meets.
+
+    Returns:
+        Assignment {patient id: (day, room)}.
+    """
+    loads = empty_slot_loads(specialty, week_start_day)
+    week_end = week_start_day + Settings.week_length_days - 1
+    day_limit = Settings.daily_operation_limit
+    eot_by_id = {p.id: p.eot for p in patients}
+    deadline_by_id = {p.id: max(p.day + p.mtb, week_start_day) for p in patients}
+
+    urgent = [p for p in patients if p.day + p.mtb <= week_end]
+    others = [p for p in patients if p.day + p.mtb > week_end]
+
+    assignment: Dict[int, Slot] = {}
+    left_out: List[Patient] = []
+
+    for patient in sorted(urgent, key=lambda p: (-p.eot, p.day + p.mtb, p.id)):
+        deadline = deadline_by_id[patient.id]
+        slot = _best_fit_slot(loads, patient.eot, deadline) or _best_fit_slot(
+            loads, patient.eot
+        )
+        if slot is None:
+            left_out.append(patient)
+            continue
+        loads[slot] += patient.eot
+        assignment[patient.id] = slot
+
+    free_capacity = sum(day_limit - used for used in loads.values())
+    selected: List[Patient] = []
+    for patient in sorted(others, key=lambda p: (p.eot, p.id)):
+        if patient.eot <= free_capacity:
+            selected.append(patient)
+            free_capacity -= patient.eot
+        else:
+            left_out.append(patient)
+
+    for patient in sorted(selected, key=lambda p: (-p.eot, p.id)):
+        slot = _best_fit_slot(loads, patient.eot)
+        if slot is None:
+            left_out.append(patient)
+            continue
+        loads[slot] += patient.eot
+        assignment[patient.id] = slot
+
+    for patient in sorted(left_out, key=lambda p: (p.eot, p.id)):
+        slot = _best_fit_slot(loads, patient.eot)
+        if slot is None and local_search:
+            slot = _make_room(
+                loads, assignment, eot_by_id, deadline_by_id, patient.eot
+            )
+        if slot is not None:
+            loads[slot] += patient.eot
+            assignment[patient.id] = slot
+
+    return assignment
@@ -4,58 +4,193 @@ This module contains the weekly EOT model, utility helpers, ROT resequencing
 logic, weekly ROT simulation, and the main EOT+ROT orchestration flow.
 """
 
+import bisect
 import copy
 import math
 import os
 import sys
+import time
 from typing import Dict, List, Optional, Tuple
 
 import pyomo.environ as pyo
+from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "CommonClass"))
 )
 from CommonClass.Patient import Patient
+from CommonClass.ScheduleSnapshot import ScheduleSnapshot
 from settings import Settings
+from Simulatore.Heuristic import (
+    assign_rooms,
+    build_warm_start,
+    order_rooms_by_load,
+    pack_week_heuristic,
+)
+from Simulatore.SolverBackend import create_solver, get_solver, warm_start_keywords
 
 
 # region Model setup and debug helpers
+
+# Formulations of the room assignment in the weekly models (Settings.eot_formulation)
+EOT_FORMULATIONS = ("room", "symmetry", "aggregated")
+
+
+def get_eot_formulation(formulation: Optional[str] = None) -> str:
+    """Return the formulation to use, validating the configured value."""
+    if formulation is None:
+        formulation = Settings.eot_formulation
+    if formulation not in EOT_FORMULATIONS:
+        raise ValueError(
+            f"Unknown EOT formulation '{formulation}'. "
+            f"Choose among {', '.join(EOT_FORMULATIONS)}."
+        )
+    return formulation
+
+
+def model_room_layout(operating_room_count: int, formulation: str) -> Tuple[int, float]:
+    """Return (rooms, capacity per room and day) of the model for a formulation.
+
+    The aggregated formulation pools the rooms of a day into one virtual room
+    with the whole day's capacity; rooms are assigned after the solve.
+    """
+    if formulation == "aggregated":
+        return 1, operating_room_count * Settings.daily_operation_limit
+    return operating_room_count, Settings.daily_operation_limit
+
+
+def admissible_days(
+    patient: Patient, days: List[int], deadline_window: bool
+) -> List[int]:
+    """Days of the horizon on which a patient may be scheduled.
+
+    With ``deadline_window`` only the days up to the MTB deadline
+    (``day + mtb``) are admissible; patients already past their deadline at
+    the start of the horizon keep every day, so they can still be scheduled.
+    """
+    if not deadline_window:
+        return list(days)
+    deadline = patient.day + patient.mtb
+    if deadline < days[0]:
+        return list(days)
+    return [t for t in days if t <= deadline]
+
+
+def add_assignment_index(
+    model: pyo.ConcreteModel, days_by_patient: Dict[int, List[int]]
+) -> Dict[Tuple[int, int], List[int]]:
+    """Add the sparse index ``model.IDX`` of the admissible (i, t, k) triples.
+
+    Returns:
+        {(t, k): patients i having a variable in that day/room}, in model order.
+    """
+    model.IDX = pyo.Set(
+        dimen=3,
+        initialize=[
+            (i, t, k) for i in model.I for t in days_by_patient[i] for k in model.K
+        ],
+    )
+    slot_patients: Dict[Tuple[int, int], List[int]] = {
+        (t, k): [] for t in model.T for k in model.K
+    }
+    for i, t, k in model.IDX:
+        slot_patients[(t, k)].append(i)
+    return slot_patients
+
+
+def add_room_order_constraints(
+    model: pyo.ConcreteModel,
+    variables: pyo.Var,
+    weight: pyo.Param,
+    slot_patients: Optional[Dict[Tuple[int, int], List[int]]] = None,
+) -> None:
+    """Break the symmetry between identical rooms.
+
+    Each day, room ``k`` must be loaded at least as much as room ``k + 1``.
+    Every solution has a room permutation satisfying this, so the optimum is
+    unchanged, but the solver no longer explores the K! equivalent copies.
+    ``slot_patients`` restricts the sums to a sparse index (see
+    ``add_assignment_index``).
+    """
+    model.KOrdered = pyo.Set(initialize=list(model.K)[:-1])
+
+    def room_order_rule(model, t, k):
+        if slot_patients is None:
+            upper, lower = model.I, model.I
+        else:
+            upper, lower = slot_patients[(t, k)], slot_patients[(t, k + 1)]
+            if not upper and not lower:
+                return pyo.Constraint.Skip
+        return sum(weight[i] * variables[i, t, k] for i in upper) >= sum(
+            weight[i] * variables[i, t, k + 1] for i in lower
+        )
+
+    model.rule_room_order = pyo.Constraint(model.T, model.KOrdered, rule=room_order_rule)
+
+
 def PyomoModel_0(
     new_patients: List[Patient],
     operating_room_count: int,
     start_time: int,
+    formulation: Optional[str] = None,
 ) -> Optional[pyo.ConcreteModel]:
     """Build the base EOT model for one weekly scheduling horizon.
 
     The model assigns each patient to at most one OR/day slot. It also enforces
     that the total EOT assigned to each operating room and day does not exceed the
     daily operation limit.
+
+    ``formulation`` (default ``Settings.eot_formulation``) selects the room
+    handling: "room" is the plain model, "symmetry" adds room-ordering
+    constraints, "aggregated" has a single day-level room with the capacity of
+    all rooms (rooms are assigned afterwards, see ``assign_rooms``).
+
+    Variables only exist for the admissible (patient, day, room) triples: with
+    ``Settings.eot_deadline_window`` a patient cannot be planned after its MTB
+    deadline (see ``admissible_days``).
     """
     if not new_patients:
         return None
 
+    formulation = get_eot_formulation(formulation)
     max_day_for_week = Settings.week_length_days
-    max_worktime_for_day = Settings.daily_operation_limit
+    operating_room_count, max_worktime_for_day = model_room_layout(
+        operating_room_count, formulation
+    )
     patients_sorted = sorted(new_patients, key=lambda patient: patient.id)
+    days = list(range(start_time, start_time + max_day_for_week))
+    days_by_patient = {
+        i: admissible_days(patient, days, Settings.eot_deadline_window)
+        for i, patient in enumerate(patients_sorted)
+    }
 
     def patient_once(model, patient_index):
         return (
-            sum(model.ORs[patient_index, t, k] for t in model.T for k in model.K) <= 1
+            sum(
+                model.ORs[patient_index, t, k]
+                for t in days_by_patient[patient_index]
+                for k in model.K
+            )
+            <= 1
         )
 
     def daily_capacity_rule(model, t, k):
-        return sum(model.ORs[i, t, k] * model.eot[i] for i in model.I) <= model.s[t, k]
+        if not slot_patients[(t, k)]:
+            return pyo.Constraint.Skip
+        return (
+            sum(model.ORs[i, t, k] * model.eot[i] for i in slot_patients[(t, k)])
+            <= model.s[t, k]
+        )
 
     def objective_rule_M1(model):
         """Maximize the number of patients assigned in the week."""
-        return sum(
-            model.ORs[i, t, k] for i in model.I for t in model.T for k in model.K
-        )
+        return sum(model.ORs[i, t, k] for i, t, k in model.IDX)
 
     model = pyo.ConcreteModel()
     model.I = pyo.Set(initialize=range(len(patients_sorted)))
-    model.T = pyo.Set(initialize=range(start_time, start_time + max_day_for_week))
+    model.T = pyo.Set(initialize=days)
     model.K = pyo.Set(initialize=range(1, operating_room_count + 1))
+    slot_patients = add_assignment_index(model, days_by_patient)
 
     model.id_p = pyo.Param(
         model.I,
@@ -75,17 +210,274 @@ def PyomoModel_0(
     )
 
     model.s = pyo.Param(model.T, model.K, initialize=max_worktime_for_day)
-    model.ORs = pyo.Var(model.I, model.T, model.K, domain=pyo.Binary)
+    model.ORs = pyo.Var(model.IDX, domain=pyo.Binary)
 
     model.rule_patient_once = pyo.Constraint(model.I, rule=patient_once)
     model.rule_daily_capacity = pyo.Constraint(
         model.T, model.K, rule=daily_capacity_rule
     )
+    if formulation == "symmetry":
+        add_room_order_constraints(model, model.ORs, model.eot, slot_patients)
     model.Objective = pyo.Objective(rule=objective_rule_M1, sense=pyo.maximize)
 
     return model
 
 
+def set_warm_start(
+    variables: pyo.Var,
+    slot_by_id: Dict[int, int],
+    assignment: Dict[int, Tuple[int, int]],
+    day_offset: int = 0,
+) -> int:
+    """Load a (day, room) assignment into binary variables as a MIP start.
+
+    Free variables are set to 0, then the assigned ``[slot, day - day_offset, room]``
+    entries to 1. Fixed variables are left untouched.
+
+    Returns:
+        Number of patients placed in the start.
+    """
+    for var in variables.values():
+        if not var.fixed:
+            var.set_value(0)
+
+    placed = 0
+    for patient_id, (day, room) in assignment.items():
+        index = (slot_by_id[patient_id], day - day_offset, room)
+        if index in variables and not variables[index].fixed:
+            variables[index].set_value(1)
+            placed += 1
+    return placed
+
+
+def extract_assigned_indices(
+    variables: pyo.Var, threshold: float = 0.5
+) -> List[Tuple[int, ...]]:
+    """Return, sorted, the indexes of the binaries set to 1 in the loaded solution.
+
+    All values are read in one pass (``extract_values``) and only the nonzero
+    entries are kept, instead of calling ``pyo.value`` on every variable.
+    """
+    return sorted(
+        index
+        for index, value in variables.extract_values().items()
+        if value is not None and value > threshold
+    )
+
+
+class PersistentEotModel:
+    """Weekly EOT model built once per specialty and updated in place.
+
+    The model has a pool of patient slots over relative days ``0..week_length-1``
+    and the specialty's rooms. Each week only the mutable EOT parameters and
+    the fixed/free state of the slot variables change; the Sets, Vars and
+    constraints are reused. With a persistent solver (``cplex_persistent``,
+    ``appsi_highs``, ...) the instance stays loaded in memory, so no LP file
+    is written per week. The slot pool grows (doubling) when a week needs
+    more slots than available. The room formulation is fixed when the model
+    is created (``Settings.eot_formulation``).
+    """
+
+    def __init__(self, specialty: str):
+        self.specialty = specialty
+        self.formulation = get_eot_formulation()
+        self.operating_room_count, self.room_capacity = model_room_layout(
+            Settings.workstations_config[specialty], self.formulation
+        )
+        # A persistent instance holds one model: it is never shared
+        self.solver, self.backend, self.plugin_name = create_solver(persistent=True)
+        self.model: Optional[pyo.ConcreteModel] = None
+        self.capacity = 0
+        self.active_slots = 0
+
+    def _build(self, capacity: int) -> None:
+        """Build the slot model structure for ``capacity`` patients."""
+        model = pyo.ConcreteModel()
+        model.I = pyo.Set(initialize=range(capacity))
+        model.T = pyo.Set(initialize=range(Settings.week_length_days))
+        model.K = pyo.Set(initialize=range(1, self.operating_room_count + 1))
+
+        model.eot = pyo.Param(model.I, initialize=0.0, mutable=True)
+        model.s = pyo.Param(
+            model.T, model.K, initialize=self.room_capacity, mutable=True
+        )
+        model.ORs = pyo.Var(model.I, model.T, model.K, domain=pyo.Binary)
+
+        def patient_once(model, patient_index):
+            return (
+                sum(model.ORs[patient_index, t, k] for t in model.T for k in model.K)
+                <= 1
+            )
+
+        def daily_capacity_rule(model, t, k):
+            return (
+                sum(model.ORs[i, t, k] * model.eot[i] for i in model.I) <= model.s[t, k]
+            )
+
+        model.rule_patient_once = pyo.Constraint(model.I, rule=patient_once)
+        model.rule_daily_capacity = pyo.Constraint(
+            model.T, model.K, rule=daily_capacity_rule
+        )
+        if self.formulation == "symmetry":
+            add_room_order_constraints(model, model.ORs, model.eot)
+        model.Objective = pyo.Objective(
+            expr=sum(
+                model.ORs[i, t, k] for i in model.I for t in model.T for k in model.K
+            ),
+            sense=pyo.maximize,
+        )
+
+        # Every slot starts inactive (all of its variables fixed to zero)
+        for var in model.ORs.values():
+            var.fix(0)
+
+        self.model = model
+        self.capacity = capacity
+        self.active_slots = 0
+
+    def _set_slot_active(
+        self, slot: int, active: bool, last_day: Optional[int] = None
+    ) -> List[pyo.Var]:
+        """Fix or free the variables of one slot and return the changed vars.
+
+        With ``last_day`` (relative day) only the days up to it are freed.
+        """
+        touched = []
+        for t in self.model.T:
+            free = active and (last_day is None or t <= last_day)
+            for k in self.model.K:
+                var = self.model.ORs[slot, t, k]
+                if free == var.fixed:
+                    if free:
+                        var.unfix()
+                    else:
+                        var.fix(0)
+                    touched.append(var)
+        return touched
+
+    def solve_week(
+        self,
+        patients: List[Patient],
+        week_start_day: int,
+        timings: Optional[Dict[str, float]] = None,
+        warm_start: Optional[Dict[int, Tuple[int, int]]] = None,
+    ) -> List[Patient]:
+        """Update the model with this week's patients, solve it and return the plan.
+
+        The returned patients carry absolute ``opDay`` and ``workstation`` but
+        are not yet compacted toward the start of the week. ``warm_start`` is
+        an optional {patient id: (day, room)} MIP start.
+        """
+        if timings is None:
+            timings = {}
+        if not patients:
+            return []
+
+        patients_sorted = sorted(patients, key=lambda patient: patient.id)
+        needed = len(patients_sorted)
+
+        # -- build: (re)create the structure if needed, then update params/vars
+        start = time.perf_counter()
+        rebuilt = False
+        if self.model is None or needed > self.capacity:
+            self._build(max(needed, 2 * self.capacity))
+            rebuilt = True
+
+        for slot, patient in enumerate(patients_sorted):
+            self.model.eot[slot] = patient.eot
+        for slot in range(needed, self.active_slots):
+            self.model.eot[slot] = 0.0
+
+        # Deadline windows change every week, so all active slots are checked
+        changed_vars: List[pyo.Var] = []
+        first_slot = 0 if Settings.eot_deadline_window else min(needed, self.active_slots)
+        days = list(range(week_start_day, week_start_day + Settings.week_length_days))
+        for slot in range(first_slot, max(needed, self.active_slots)):
+            last_day = None
+            if slot < needed and Settings.eot_deadline_window:
+                last_day = (
+                    admissible_days(patients_sorted[slot], days, True)[-1] - week_start_day
+                )
+            changed_vars.extend(self._set_slot_active(slot, slot < needed, last_day))
+        self.active_slots = needed
+        timings["build"] = time.perf_counter() - start
+
+        # -- write: push the structure or the changes into the solver instance
+        start = time.perf_counter()
+        classic_persistent = isinstance(self.solver, PersistentSolver)
+        if hasattr(self.solver, "set_instance") and rebuilt:
+            self.solver.set_instance(self.model)
+        elif classic_persistent:
+            # Coefficients of the capacity (and room order) rows depend on the EOT params
+            eot_constraints = list(self.model.rule_daily_capacity.values())
+            if self.formulation == "symmetry":
+                eot_constraints.extend(self.model.rule_room_order.values())
+            for constraint in eot_constraints:
+                self.solver.remove_constraint(constraint)
+                self.solver.add_constraint(constraint)
+            for var in changed_vars:
+                self.solver.update_var(var)
+        elif hasattr(self.solver, "update"):
+            self.solver.update()
+        timings["write"] = time.perf_counter() - start
+
+        # -- solve
+        start = time.perf_counter()
+        timings["backend"] = self.backend
+        solve_options = {}
+        if warm_start:
+            solve_options = warm_start_keywords(self.solver)
+            if solve_options:
+                set_warm_start(
+                    self.model.ORs,
+                    {patient.id: slot for slot, patient in enumerate(patients_sorted)},
+                    warm_start,
+                    day_offset=week_start_day,
+                )
+        if classic_persistent:
+            results = self.solver.solve(
+                tee=Settings.solver_tee,
+                load_solutions=False,
+                save_results=False,
+                **solve_options,
+            )
+        else:
+            results = self.solver.solve(
+                self.model,
+                tee=Settings.solver_tee,
+                load_solutions=False,
+                **solve_options,
+            )
+        timings["solve"] = time.perf_counter() - start
+
+        # -- load: read the variable values back into the model
+        start = time.perf_counter()
+        if hasattr(self.solver, "load_vars"):
+            self.solver.load_vars()
+        else:
+            self.model.solutions.load_from(results)
+        timings["load"] = time.perf_counter() - start
+
+        # -- extract: nonzero assignments of the active slots
+        start = time.perf_counter()
+        planned = [
+            Patient(
+                id=patients_sorted[slot].id,
+                eot=patients_sorted[slot].eot,
+                day=patients_sorted[slot].day,
+                mtb=patients_sorted[slot].mtb,
+                rot=patients_sorted[slot].rot,
+                opDay=week_start_day + t,
+                workstation=k,
+                overdue=False,
+            )
+            for slot, t, k in extract_assigned_indices(self.model.ORs)
+            if slot < needed
+        ]
+        timings["extract"] = time.perf_counter() - start
+        return planned
+
+
 # endregion
 
 
@@ -219,13 +611,145 @@ def execute_rot_schedule(
     )
 
 
+class RoomDayQueue:
+    """Patients of one room and day, indexed for the ROT resequencing.
+
+    ``w_tilde`` only depends on the day, so the priority classes and their
+    orders are computed once per room-day instead of at every pick. Executed
+    patients are removed lazily (alive flags), and ``resequenced()`` yields
+    the remaining patients in the same order as
+    ``resequence_remaining_patients`` would return them, generating the
+    best-fit packing of the low-priority class only as far as it is read.
+    """
+
+    def __init__(
+        self,
+        patients: List[Patient],
+        today: int,
+        week_start_day: int,
+        week_days: int,
+    ):
+        # Patients are kept in id order, the planned order of the room
+        self.patients = sorted(patients, key=lambda p: p.id)
+        self.alive = [True] * len(self.patients)
+        self.size = len(self.patients)
+
+        phi = week_start_day + week_days - today
+        eps = 1e-9
+        w_tilde = [compute_w_tilde(p, today, phi) for p in self.patients]
+        indexes = range(len(self.patients))
+
+        self.high = sorted(
+            (i for i in indexes if w_tilde[i] > 1.0 + eps),
+            key=lambda i: w_tilde[i],
+            reverse=True,
+        )
+        self.borderline = [i for i in indexes if abs(w_tilde[i] - 1.0) <= eps]
+        self.low = [i for i in indexes if w_tilde[i] < 1.0 - eps]
+
+        # Low-priority patients by decreasing EOT (ties by planned order)
+        self.low_by_eot = sorted(self.low, key=lambda i: (-self.patients[i].eot, i))
+        self.low_neg_eot = [-self.patients[i].eot for i in self.low_by_eot]
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+    def first(self) -> int:
+        """Index of the first remaining patient in planned order."""
+        return self.alive.index(True)
+
+    def remove(self, index: int) -> None:
+        self.alive[index] = False
+        self.size -= 1
+
+    def remaining(self) -> List[Patient]:
+        """Remaining patients in planned order."""
+        return [p for p, alive in zip(self.patients, self.alive) if alive]
+
+    def resequenced(self, remaining_capacity_eot: float):
+        """Yield the remaining patient indexes in resequencing order."""
+        alive = self.alive
+        for i in self.high:
+            if alive[i]:
+                yield i
+        for i in self.borderline:
+            if alive[i]:
+                yield i
+
+        # Same subtraction order as resequence_remaining_patients
+        residual_after_high = remaining_capacity_eot
+        for i in self.high:
+            if alive[i]:
+                residual_after_high -= self.patients[i].eot
+        for i in self.borderline:
+            if alive[i]:
+                residual_after_high -= self.patients[i].eot
+
+        if residual_after_high > 0:
+            yield from self._best_fit_low(residual_after_high)
+        else:
+            for i in self.low:
+                if alive[i]:
+                    yield i
+
+    def _best_fit_low(self, local_capacity: float):
+        """Lazy equivalent of ``best_fit_order_low_priority``."""
+        alive = self.alive
+        picked = set()
+        while local_capacity > 0:
+            # First patient with eot <= local_capacity, i.e. the best fit
+            position = bisect.bisect_left(self.low_neg_eot, -local_capacity)
+            best = None
+            best_left = None
+            for j in range(position, len(self.low_by_eot)):
+                i = self.low_by_eot[j]
+                if not alive[i] or i in picked:
+                    continue
+                left = local_capacity - self.patients[i].eot
+                if best is None:
+                    best, best_left = i, left
+                elif left == best_left:
+                    # Equal leftover: the first in planned order wins
+                    best = min(best, i)
+                else:
+                    break
+            if best is None:
+                break
+            picked.add(best)
+            local_capacity -= self.patients[best].eot
+            yield best
+
+        for i in self.low:
+            if alive[i] and i not in picked:
+                yield i
+
+
+def _bucket_by_day_room(
+    patients: List[Patient], week_start_day: int, week_days: int, operating_rooms: int
+) -> Dict[Tuple[int, int], List[Patient]]:
+    """Group the planned patients of the week by (opDay, workstation)."""
+    buckets: Dict[Tuple[int, int], List[Patient]] = {}
+    for p in patients:
+        if (
+            week_start_day <= p.opDay < week_start_day + week_days
+            and 1 <= p.workstation <= operating_rooms
+        ):
+            buckets.setdefault((p.opDay, p.workstation), []).append(p)
+    return buckets
+
+
 def clean_week_with_rot(
     patients: List[Patient],
     specialty: str,
     week_start_day: int,
     extra_time_pool: float,
 ) -> Tuple[List[Patient], List[Patient], float, Dict[str, object]]:
-    """Simulate one week of ROT execution and collect execution statistics."""
+    """Simulate one week of ROT execution and collect execution statistics.
+
+    Each room-day starts with its first planned patient; afterwards the next
+    patient is the first of the resequenced queue that fits without
+    overtime, or else the one needing the least overtime from the weekly pool.
+    """
     day_limit = Settings.daily_operation_limit
     week_days = Settings.week_length_days
     operating_rooms = Settings.workstations_config[specialty]
@@ -241,23 +765,25 @@ def clean_week_with_rot(
         "overflow_to_next_week": 0,
     }
 
+    buckets = _bucket_by_day_room(patients, week_start_day, week_days, operating_rooms)
+
     for today in range(week_start_day, week_start_day + week_days):
-        daily_patients = [p for p in patients if p.opDay == today]
         not_executed_today: List[Patient] = []
 
         for room_index in range(operating_rooms):
-            room_patients = sorted(
-                [p for p in daily_patients if p.workstation == room_index + 1],
-                key=lambda p: p.id,
+            queue = RoomDayQueue(
+                buckets.get((today, room_index + 1), []),
+                today,
+                week_start_day,
+                week_days,
             )
-            planned_order = [p.id for p in room_patients]
+            planned_order = [p.id for p in queue.patients]
 
             rot_sum = 0.0
-            remaining = room_patients[:]
             executed_order: List[int] = []
             first_patient = True
 
-            while remaining:
+            while queue:
                 remaining_capacity_eot = (
                     day_limit + remeaning_extra_time_pool
                 ) - rot_sum
@@ -265,42 +791,26 @@ def clean_week_with_rot(
                     break
 
                 if first_patient:
-                    next_p = remaining[0]
+                    next_index = queue.first()
                     first_patient = False
                 else:
-                    resequenced = resequence_remaining_patients(
-                        candidates=remaining,
-                        today=today,
-                        remaining_capacity_eot=remaining_capacity_eot,
-                        week_start_day=week_start_day,
-                        week_days=week_days,
-                    )
-
-                    if not resequenced:
-                        break
-
                     actual_available = day_limit - rot_sum
-                    feasible_candidates = [
-                        candidate
-                        for candidate in resequenced
-                        if candidate.rot <= actual_available + remeaning_extra_time_pool
-                    ]
-                    if not feasible_candidates:
+                    next_index = None
+                    best_key = None
+                    for index in queue.resequenced(remaining_capacity_eot):
+                        candidate = queue.patients[index]
+                        if candidate.rot > actual_available + remeaning_extra_time_pool:
+                            continue
+                        if candidate.rot <= actual_available:
+                            next_index = index
+                            break
+                        key = (candidate.rot - actual_available, candidate.rot)
+                        if best_key is None or key < best_key:
+                            next_index, best_key = index, key
+                    if next_index is None:
                         break
 
-                    no_overtime = [
-                        candidate
-                        for candidate in feasible_candidates
-                        if candidate.rot <= actual_available
-                    ]
-                    if no_overtime:
-                        next_p = no_overtime[0]
-                    else:
-                        next_p = min(
-                            feasible_candidates,
-                            key=lambda p: (p.rot - actual_available, p.rot),
-                        )
-
+                next_p = queue.patients[next_index]
                 can_execute, remeaning_extra_time_pool = overtime_with_rot(
                     next_p,
                     rot_sum,
@@ -314,8 +824,9 @@ def clean_week_with_rot(
                 rot_sum += next_p.rot
                 executed.append(next_p)
                 executed_order.append(next_p.id)
-                remaining.remove(next_p)
+                queue.remove(next_index)
 
+            remaining = queue.remaining()
             shifted_ids = [p.id for p in remaining]
             swap_positions = sum(
                 1
@@ -405,65 +916,243 @@ def compact_eot_schedule_to_week_start(
 
 
 def plan_week_eot(
-    patients: List[Patient], specialty: str, week_start_day: int
+    patients: List[Patient],
+    specialty: str,
+    week_start_day: int,
+    persistent_model: Optional[PersistentEotModel] = None,
+    timings: Optional[Dict[str, float]] = None,
+    previous_plan: Optional[List[Patient]] = None,
+    formulation: Optional[str] = None,
 ) -> List[Patient]:
-    """Build the weekly EOT plan and compact it toward the start of the week."""
+    """Build the weekly EOT plan and compact it toward the start of the week.
+
+    When ``persistent_model`` is given, the week is solved by updating that
+    model in place instead of building a new ``PyomoModel_0``. If ``timings``
+    is given, it is filled with the seconds spent in the build, write, solve,
+    load and extract phases (for non-persistent solvers the LP write and the
+    solution load are part of solve) and with the name of the solver backend
+    used.
+
+    With ``Settings.eot_warm_start`` enabled, a feasible start is built from
+    ``previous_plan`` (last week's plan, shifted by one week) and first-fit
+    decreasing packing, and passed to solvers that support MIP starts.
+
+    With the "aggregated" formulation the model only chooses the day and
+    rooms are assigned afterwards on that same day. The day-level model is a
+    relaxation of the room model with the same objective, so a plan that
+    fits into rooms is optimal for the room model too; if first-fit
+    decreasing cannot fit it, the week is solved again with the "room"
+    formulation. Either way no patient is dropped or moved to another day.
+
+    ``formulation`` overrides the configured one (non-persistent solves only).
+    """
+    if timings is None:
+        timings = {}
+
+    formulation = (
+        persistent_model.formulation
+        if persistent_model is not None
+        else get_eot_formulation(formulation)
+    )
+    timings["formulation"] = formulation
+    if formulation == "aggregated":
+        # The pooled day capacity would accept patients longer than a room's day
+        patients = [p for p in patients if p.eot <= Settings.daily_operation_limit]
+        if not patients:
+            return []
+
+    warm_start = None
+    if Settings.eot_warm_start and patients:
+        start = time.perf_counter()
+        warm_start = build_warm_start(
+            patients,
+            specialty,
+            week_start_day,
+            previous_plan if Settings.eot_warm_start == "previous_plan" else None,
+        )
+        if formulation == "symmetry":
+            warm_start = order_rooms_by_load(warm_start, patients)
+        elif formulation == "aggregated":
+            warm_start = {pid: (day, 1) for pid, (day, _) in warm_start.items()}
+        timings["warm_start"] = time.perf_counter() - start
+        timings["warm_start_patients"] = len(warm_start)
+
+    if persistent_model is not None:
+        planned = persistent_model.solve_week(
+            patients, week_start_day, timings, warm_start=warm_start
+        )
+        return _finalize_week_plan(
+            planned, patients, specialty, week_start_day, formulation, timings, previous_plan
+        )
+
     operating_rooms = Settings.workstations_config[specialty]
 
-    model = PyomoModel_0(patients, operating_rooms, week_start_day)
-    # Settings.solver.options['mipgap'] = 0.01
-    Settings.solver.options["timelimit"] = 300
-    Settings.solver.solve(model, tee=Settings.solver_tee)
+    start = time.perf_counter()
+    model = PyomoModel_0(patients, operating_rooms, week_start_day, formulation)
+    timings["build"] = time.perf_counter() - start
+    timings["write"] = 0.0
+
+    start = time.perf_counter()
+    solver, timings["backend"], _ = get_solver()
+    solve_options = {}
+    if warm_start:
+        solve_options = warm_start_keywords(solver)
+        if solve_options:
+            set_warm_start(
+                model.ORs,
+                {model.id_p[i]: i for i in model.I},
+                warm_start,
+            )
+    solver.solve(model, tee=Settings.solver_tee, **solve_options)
+    timings["solve"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    patient_by_id = {patient.id: patient for patient in patients}
+    planned = []
+    for i, t, k in extract_assigned_indices(model.ORs):
+        patient = patient_by_id[model.id_p[i]]
+        planned.append(
+            Patient(
+                id=patient.id,
+                eot=patient.eot,
+                day=patient.day,
+                mtb=patient.mtb,
+                rot=patient.rot,
+                opDay=t,
+                workstation=k,
+                overdue=False,
+            )
+        )
+    timings["load"] = 0.0
+    timings["extract"] = time.perf_counter() - start
+
+    return _finalize_week_plan(
+        planned, patients, specialty, week_start_day, formulation, timings, previous_plan
+    )
+
 
+def plan_week_heuristic(
+    patients: List[Patient],
+    specialty: str,
+    week_start_day: int,
+    persistent_model: Optional[PersistentEotModel] = None,
+    timings: Optional[Dict[str, float]] = None,
+    previous_plan: Optional[List[Patient]] = None,
+) -> List[Patient]:
+    """Drop-in replacement of ``plan_week_eot`` that needs no MIP solver.
+
+    Uses ``pack_week_heuristic`` (MTB-aware best-fit decreasing packing, with
+    local search if ``Settings.heuristic_local_search``) and returns the plan
+    with the same contract: new ``Patient`` objects with ``opDay`` and
+    ``workstation`` set, compacted toward the start of the week.
+    ``persistent_model`` and ``previous_plan`` are accepted for signature
+    compatibility and ignored.
+    """
+    if timings is None:
+        timings = {}
+    timings["backend"] = "heuristic"
+    timings["build"] = 0.0
+    timings["write"] = 0.0
+
+    start = time.perf_counter()
+    assignment = pack_week_heuristic(
+        patients,
+        specialty,
+        week_start_day,
+        local_search=Settings.heuristic_local_search,
+    )
+    timings["solve"] = time.perf_counter() - start
+    timings["load"] = 0.0
+
+    start = time.perf_counter()
     planned = [
         Patient(
-            id=model.id_p[i],
-            eot=model.eot[i],
-            day=model.dr[i],
-            mtb=model.mtb[i],
-            rot=[patient for patient in patients if patient.id == model.id_p[i]][0].rot,
-            opDay=t,
-            workstation=k,
+            id=patient.id,
+            eot=patient.eot,
+            day=patient.day,
+            mtb=patient.mtb,
+            rot=patient.rot,
+            opDay=assignment[patient.id][0],
+            workstation=assignment[patient.id][1],
             overdue=False,
         )
-        for i in model.I
-        for k in model.K
-        for t in model.T
-        if pyo.value(model.ORs[i, t, k]) == 1
+        for patient in sorted(patients, key=lambda patient: patient.id)
+        if patient.id in assignment
     ]
+    timings["extract"] = time.perf_counter() - start
 
     planned = compact_eot_schedule_to_week_start(planned, specialty, week_start_day)
     planned.sort(key=lambda patient: (patient.opDay, patient.workstation, patient.id))
     return planned
 
-"""
-Rialloca una settimana utilizzando direttamente i tempi reali (ROT)
-consentendo l'impiego di overtime.
 
-Il modello assegna i pazienti alle sale operatorie rispettando le
-scadenze MTB, i limiti giornalieri e il monte ore straordinario
-disponibile.
-"""
-def reallocate_week_with_rot_overtime(
-    planned_patients: List[Patient],
-    specialty: str,
-    week_start_day: int,
-) -> Tuple[List[Patient], List[Patient]]:
+# Weekly planners selectable with Settings.eot_planner
+WEEK_PLANNERS = {
+    "mip": plan_week_eot,
+    "heuristic": plan_week_heuristic,
+}
 
-    if not planned_patients:
-        return [], []
 
-    operating_rooms = Settings.workstations_config[specialty]
+def get_week_planner(planner: Optional[str] = None):
+    """Return the weekly planning function configured in ``Settings.eot_planner``."""
+    if planner is None:
+        planner = Settings.eot_planner
+    if planner == "rolling":
+        # Imported here: the rolling-horizon module builds on this one
+        from Simulatore.RollingHorizon import plan_week_rolling
 
-    valid_patients = [p for p in planned_patients if (p.day + p.mtb) >= week_start_day]
+        return plan_week_rolling
+    if planner not in WEEK_PLANNERS:
+        raise ValueError(
+            f"Unknown weekly planner '{planner}'. "
+            f"Choose among {', '.join([*WEEK_PLANNERS, 'rolling'])}."
+        )
+    return WEEK_PLANNERS[planner]
 
-    overflow = [p for p in planned_patients if (p.day + p.mtb) < week_start_day]
 
-    for p in overflow:
-        p.overdue = True
+def _finalize_week_plan(
+    planned: List[Patient],
+    patients: List[Patient],
+    specialty: str,
+    week_start_day: int,
+    formulation: str,
+    timings: Dict[str, float],
+    previous_plan: Optional[List[Patient]] = None,
+) -> List[Patient]:
+    """Assign rooms (aggregated formulation), then compact and sort the plan.
 
-    patients_sorted = sorted(valid_patients, key=lambda p: p.id)
+    If the aggregated day plan does not fit into the rooms, the week is
+    solved again from ``patients`` with the "room" formulation.
+    """
+    if formulation == "aggregated":
+        start = time.perf_counter()
+        planned, unassigned = assign_rooms(planned, specialty, week_start_day)
+        timings["room_assignment"] = time.perf_counter() - start
+        timings["room_assignment_unplaced"] = len(unassigned)
+        if unassigned:
+            start = time.perf_counter()
+            room_plan = plan_week_eot(
+                patients,
+                specialty,
+                week_start_day,
+                previous_plan=previous_plan,
+                formulation="room",
+            )
+            timings["room_fallback"] = time.perf_counter() - start
+            return room_plan
+
+    planned = compact_eot_schedule_to_week_start(planned, specialty, week_start_day)
+    planned.sort(key=lambda patient: (patient.opDay, patient.workstation, patient.id))
+    return planned
+
+def build_rot_overtime_model(
+    patients_sorted: List[Patient], operating_rooms: int, week_start_day: int
+) -> pyo.ConcreteModel:
+    """Build the weekly ROT reallocation model with overtime.
 
+    Variables ``x[i, t, k]`` exist only for the days up to each patient's MTB
+    deadline, so no deadline constraints are needed.
+    """
     model = pyo.ConcreteModel()
 
     model.I = pyo.Set(initialize=range(len(patients_sorted)))
@@ -484,33 +1173,29 @@ def reallocate_week_with_rot_overtime(
         model.I, initialize={i: patients_sorted[i].mtb for i in model.I}
     )
 
-    model.x = pyo.Var(model.I, model.T, model.K, domain=pyo.Binary)
-
-    model.overtime = pyo.Var(model.T, model.K, domain=pyo.NonNegativeReals)
-
-    def patient_once(model, i):
-        return sum(model.x[i, t, k] for t in model.T for k in model.K) <= 1
-
     model.day = pyo.Param(
         model.I, initialize={i: patients_sorted[i].day for i in model.I}
     )
 
-    def hard_deadline_rule(model, i, t, k):
-
-        deadline = model.day[i] + model.mtb[i]
+    # Hard MTB deadline: variables exist only up to day + mtb
+    days_by_patient = {
+        i: admissible_days(patients_sorted[i], list(model.T), deadline_window=True)
+        for i in model.I
+    }
+    slot_patients = add_assignment_index(model, days_by_patient)
 
-        if t > deadline:
-            return model.x[i, t, k] == 0
+    model.x = pyo.Var(model.IDX, domain=pyo.Binary)
 
-        return pyo.Constraint.Skip
+    model.overtime = pyo.Var(model.T, model.K, domain=pyo.NonNegativeReals)
 
-    model.deadline = pyo.Constraint(model.I, model.T, model.K, rule=hard_deadline_rule)
+    def patient_once(model, i):
+        return sum(model.x[i, t, k] for t in days_by_patient[i] for k in model.K) <= 1
 
     model.patient_once = pyo.Constraint(model.I, rule=patient_once)
 
     def capacity_rule(model, t, k):
         return (
-            sum(model.rot[i] * model.x[i, t, k] for i in model.I)
+            sum(model.rot[i] * model.x[i, t, k] for i in slot_patients[(t, k)])
             <= Settings.daily_operation_limit + model.overtime[t, k]
         )
 
@@ -524,55 +1209,95 @@ def reallocate_week_with_rot_overtime(
 
     model.overtime_pool = pyo.Constraint(rule=overtime_pool_rule)
 
+    if get_eot_formulation() != "room":
+        add_room_order_constraints(model, model.x, model.rot, slot_patients)
+
     model.obj = pyo.Objective(
-        expr=sum(
-            (100000 + (1000 - t)) * model.x[i, t, k]
-            for i in model.I
-            for t in model.T
-            for k in model.K
-        ),
+        expr=sum((100000 + (1000 - t)) * model.x[i, t, k] for i, t, k in model.IDX),
         sense=pyo.maximize,
     )
 
-    # Settings.solver.options['mipgap'] = 0.01
-    Settings.solver.options["timelimit"] = 300
-    Settings.solver.solve(model, tee=Settings.solver_tee)
+    return model
 
-    scheduled = []
-    overflow = overflow.copy()
 
-    scheduled_ids = set()
+def _with_fields(patient: Patient, **fields) -> Patient:
+    """Copy of ``patient`` with the given fields changed (copy on write)."""
+    clone = copy.copy(patient)
+    for name, value in fields.items():
+        setattr(clone, name, value)
+    return clone
+
 
-    for i in model.I:
-        assigned = False
+"""
+Rialloca una settimana utilizzando direttamente i tempi reali (ROT)
+consentendo l'impiego di overtime.
 
-        for t in model.T:
-            for k in model.K:
+Il modello assegna i pazienti alle sale operatorie rispettando le
+scadenze MTB, i limiti giornalieri e il monte ore straordinario
+disponibile. Con ``Settings.eot_formulation`` pari a "symmetry" o
+"aggregated" vengono aggiunti i vincoli di ordinamento delle sale
+(l'overtime è per sala, quindi qui non si aggregano le sale).
+"""
+def reallocate_week_with_rot_overtime(
+    planned_patients: List[Patient],
+    specialty: str,
+    week_start_day: int,
+    timings: Optional[Dict[str, object]] = None,
+) -> Tuple[List[Patient], List[Patient]]:
 
-                if pyo.value(model.x[i, t, k]) > 0.5:
+    if not planned_patients:
+        return [], []
 
-                    p = copy.deepcopy(patients_sorted[i])
+    build_start = time.perf_counter()
+    operating_rooms = Settings.workstations_config[specialty]
 
-                    p.opDay = t
-                    p.workstation = k
+    valid_patients = [p for p in planned_patients if (p.day + p.mtb) >= week_start_day]
 
-                    scheduled.append(p)
+    # Input records are never mutated: late patients are new copies
+    overflow = [
+        p if p.overdue else _with_fields(p, overdue=True)
+        for p in planned_patients
+        if (p.day + p.mtb) < week_start_day
+    ]
 
-                    scheduled_ids.add(p.id)
+    patients_sorted = sorted(valid_patients, key=lambda p: p.id)
+    model = build_rot_overtime_model(patients_sorted, operating_rooms, week_start_day)
 
-                    assigned = True
-                    break
+    if timings is None:
+        timings = {}
+    timings["build"] = time.perf_counter() - build_start
 
-            if assigned:
-                break
+    start = time.perf_counter()
+    solver, backend, _ = get_solver()
+    timings["backend"] = backend
+    timings["formulation"] = get_eot_formulation()
+    solver.solve(model, tee=Settings.solver_tee)
+    timings["solve"] = time.perf_counter() - start
 
+    start = time.perf_counter()
+    scheduled = []
+
+    scheduled_ids = set()
+
+    for i, t, k in extract_assigned_indices(model.x):
+        if patients_sorted[i].id in scheduled_ids:
+            continue
+
+        p = _with_fields(patients_sorted[i], opDay=t, workstation=k)
+
+        scheduled.append(p)
+
+        scheduled_ids.add(p.id)
+
+    # Unscheduled patients are carried over as they are (shared records)
     for p in patients_sorted:
 
         if p.id not in scheduled_ids:
 
-            overflow.append(copy.deepcopy(p))
+            overflow.append(p)
 
     scheduled.sort(key=lambda p: (p.opDay, p.workstation, p.id))
+    timings["extract"] = time.perf_counter() - start
 
     return scheduled, overflow
 
@@ -580,15 +1305,30 @@ def reallocate_week_with_rot_overtime(
 def optimize_daily_batch_rot_both(
     patients: List[Patient], specialty: str
 ) -> Dict[str, object]:
-    """Run the combined EOT planning and ROT execution workflow."""
+    """Run the combined EOT planning and ROT execution workflow.
+
+    Arrivals are read through a cursor over the patients sorted by arrival
+    day, and the waiting list is a dict keyed by patient id (insertion
+    ordered), so each week only touches the new arrivals and the executed
+    patients.
+
+    The EOT plan of each week is kept as a ``ScheduleSnapshot`` over the
+    waiting-list records (only opDay/workstation/overdue are stored), so
+    the planned patients are not copied; ``plan_eot`` is the concatenation
+    of the weekly snapshots.
+    """
     patient_list = sorted(patients, key=lambda patient: patient.day)
-    patient_by_id = {patient.id: patient for patient in patient_list}
+    arrival_days = [patient.day for patient in patient_list]
 
     day_for_week = Settings.week_length_days
     day_start = Settings.start_week_scheduling * day_for_week
     current_day = day_start
 
-    weekly_patients = [patient for patient in patient_list if patient.day < current_day]
+    # Patients arrived before current_day are patient_list[:arrival_cursor]
+    arrival_cursor = bisect.bisect_left(arrival_days, current_day)
+    waiting: Dict[int, Patient] = {
+        patient.id: patient for patient in patient_list[:arrival_cursor]
+    }
 
     result: Dict[str, object] = {
         specialty: {
@@ -598,14 +1338,26 @@ def optimize_daily_batch_rot_both(
             "extra_time_left": [],
             "realtime_stats": [],
             "weekly_summary": [],
+            "solver_timings": [],
         }
     }
 
+    plan_week = get_week_planner()
+    persistent_model = (
+        PersistentEotModel(specialty)
+        if Settings.eot_model_mode == "persistent" and plan_week is plan_week_eot
+        else None
+    )
+    # Only the rolling-horizon planner takes the arrivals of the next weeks
+    needs_look_ahead = plan_week is get_week_planner("rolling")
+    previous_plan: List[Patient] = []
+    weekly_plans: List[ScheduleSnapshot] = []
+
     while patient_list:
         week_start = current_day
         print(f"Scheduling for {specialty}, week starting day {week_start}")
 
-        if not weekly_patients:
+        if not waiting:
             current_day += day_for_week
             if current_day >= day_start + Settings.weeks_to_fill * day_for_week:
                 print(
@@ -614,18 +1366,38 @@ def optimize_daily_batch_rot_both(
                 )
                 break
 
-            weekly_patients.extend(
-                [
-                    patient
-                    for patient in patient_list
-                    if current_day - day_for_week <= patient.day < current_day
-                    and patient not in weekly_patients
-                ]
-            )
+            next_cursor = bisect.bisect_left(arrival_days, current_day)
+            for patient in patient_list[arrival_cursor:next_cursor]:
+                waiting[patient.id] = patient
+            arrival_cursor = next_cursor
             continue
 
-        planned = plan_week_eot(weekly_patients, specialty, current_day)
-        result[specialty]["plan_eot"].extend(copy.deepcopy(planned))
+        weekly_patients = list(waiting.values())
+
+        week_timings: Dict[str, float] = {}
+        planner_options = {}
+        if needs_look_ahead:
+            # Arrivals of the look-ahead weeks, known in advance
+            look_ahead_end = current_day + (
+                Settings.rolling_horizon_weeks - 1
+            ) * day_for_week
+            planner_options["upcoming_patients"] = patient_list[
+                arrival_cursor : bisect.bisect_left(arrival_days, look_ahead_end)
+            ]
+        planned = plan_week(
+            weekly_patients,
+            specialty,
+            current_day,
+            persistent_model=persistent_model,
+            timings=week_timings,
+            previous_plan=previous_plan,
+            **planner_options,
+        )
+        previous_plan = planned
+        result[specialty]["solver_timings"].append(
+            {"start_day": week_start, **week_timings}
+        )
+        weekly_plans.append(ScheduleSnapshot.capture(planned, waiting))
 
         executed, overflow, extra_left, week_stats = execute_rot_schedule(
             planned,
@@ -639,41 +1411,34 @@ def optimize_daily_batch_rot_both(
         result[specialty]["extra_time_left"].append(extra_left)
         result[specialty]["realtime_stats"].append(week_stats)
 
-        weekly_ids = {patient.id for patient in weekly_patients}
-        planned_ids = {patient.id for patient in planned}
+        # Planned and executed patients all come from the waiting list, so
+        # the carryover is the waiting list minus the executed patients
+        weekly_in = len(waiting)
+        planned_count = len({patient.id for patient in planned})
         executed_ids = {patient.id for patient in executed}
-        overflow_ids = {patient.id for patient in overflow}
-
-        not_planned_ids = weekly_ids - planned_ids
-        carryover_ids = (planned_ids - executed_ids) | overflow_ids | not_planned_ids
-        carryover_count = len(carryover_ids)
-
-        weekly_patients = [
-            patient_by_id[pid] for pid in carryover_ids if pid in patient_by_id
-        ]
-        weekly_patients.sort(key=lambda patient: patient.day)
+        overflow_count = len({patient.id for patient in overflow})
+        for pid in executed_ids:
+            waiting.pop(pid, None)
+        carryover_count = len(waiting)
 
         current_day += day_for_week
-        existing_ids = {patient.id for patient in weekly_patients}
-        new_arrivals = [
-            patient
-            for patient in patient_list
-            if current_day - day_for_week <= patient.day < current_day
-            and patient.id not in existing_ids
-        ]
-        weekly_patients.extend(new_arrivals)
+        next_cursor = bisect.bisect_left(arrival_days, current_day)
+        new_arrivals = patient_list[arrival_cursor:next_cursor]
+        arrival_cursor = next_cursor
+        for patient in new_arrivals:
+            waiting[patient.id] = patient
 
         summary = {
             "specialty": specialty,
             "start_day": week_start,
-            "weekly_in": len(weekly_ids),
-            "planned": len(planned_ids),
+            "weekly_in": weekly_in,
+            "planned": planned_count,
             "executed": len(executed_ids),
-            "overflow": len(overflow_ids),
-            "not_planned": len(not_planned_ids),
+            "overflow": overflow_count,
+            "not_planned": weekly_in - planned_count,
             "carryover_next": carryover_count,
             "new_arrivals": len(new_arrivals),
-            "next_week_in": len(weekly_patients),
+            "next_week_in": len(waiting),
         }
 
         result[specialty]["weekly_summary"].append(summary)
@@ -693,6 +1458,7 @@ def optimize_daily_batch_rot_both(
             )
             break
 
+    result[specialty]["plan_eot"] = ScheduleSnapshot.concat(weekly_plans)
     return result
 
 
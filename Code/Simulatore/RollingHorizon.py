@@ -0,0 +1,294 @@
+"""Rolling-horizon weekly EOT planning.
+
+Each step optimizes a look-ahead of ``Settings.rolling_horizon_weeks`` weeks
+and commits only the first one. Besides the current waiting list, the
+look-ahead can include the known future arrivals or a forecast of them, so
+the first week is planned knowing what capacity later weeks will need.
+
+With the "aggregate_future" decomposition only the first week is modelled
+per day and room; later weeks are single capacity buckets, which keeps the
+model size almost constant as the horizon grows.
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pyomo.environ as pyo
+
+if os.path.basename(__file__) != "main.py":
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "../../", "Code"))
+    )
+
+from CommonClass.Patient import Patient
+from settings import Settings
+from Simulatore.Heuristic import pack_week_heuristic
+from Simulatore.Optimizer import (
+    compact_eot_schedule_to_week_start,
+    extract_assigned_indices,
+)
+from Simulatore.SolverBackend import apply_solver_options, get_solver
+
+ROLLING_DECOMPOSITIONS = ("full", "aggregate_future")
+
+
+def forecast_arrivals(
+    patients: List[Patient], week_start_day: int, horizon_weeks: int
+) -> List[Patient]:
+    """Pseudo-patients standing for the arrivals of the look-ahead weeks.
+
+    Each future week gets as many patients as arrived in the last week, with
+    the mean EOT and MTB of the waiting list. Pseudo-patients have negative
+    ids and only reserve capacity: they are never committed.
+    """
+    week_days = Settings.week_length_days
+    if not patients:
+        return []
+    # Sums in id order, so the forecast does not depend on the queue order
+    patients = sorted(patients, key=lambda patient: patient.id)
+
+    last_week = [p for p in patients if week_start_day - week_days <= p.day < week_start_day]
+    mean_eot = sum(p.eot for p in patients) / len(patients)
+    mean_mtb = round(sum(p.mtb for p in patients) / len(patients))
+
+    forecast = []
+    for week in range(1, horizon_weeks):
+        arrival_day = week_start_day + (week - 1) * week_days
+        for _ in range(len(last_week)):
+            forecast.append(
+                Patient(
+                    id=-(len(forecast) + 1),
+                    eot=mean_eot,
+                    day=arrival_day,
+                    mtb=mean_mtb,
+                    rot=mean_eot,
+                )
+            )
+    return forecast
+
+
+def _release_week(patient: Patient, week_start_day: int) -> int:
+    """First look-ahead week in which the patient can be planned."""
+    if patient.day < week_start_day:
+        return 0
+    return (patient.day - week_start_day) // Settings.week_length_days + 1
+
+
+def build_rolling_model(
+    patients: List[Patient],
+    operating_rooms: int,
+    week_start_day: int,
+    horizon_weeks: int,
+    decomposition: str,
+) -> pyo.ConcreteModel:
+    """Build the look-ahead model over ``horizon_weeks`` weeks.
+
+    ``x[i, t, k]`` assigns patient ``i`` to day ``t`` and room ``k`` (first
+    week, or every week with the "full" decomposition); with
+    "aggregate_future", ``y[i, w]`` assigns it to the future week ``w`` as a
+    whole. Assignments are worth ``rolling_discount ** w``, plus
+    ``rolling_deadline_weight`` when made by the MTB deadline.
+    """
+    week_days = Settings.week_length_days
+    day_limit = Settings.daily_operation_limit
+    detailed_weeks = horizon_weeks if decomposition == "full" else 1
+
+    def week_days_of(week):
+        first = week_start_day + week * week_days
+        return range(first, first + week_days)
+
+    def value(patient, week, day):
+        on_time = day <= patient.day + patient.mtb
+        return Settings.rolling_discount ** week * (
+            1 + Settings.rolling_deadline_weight * on_time
+        )
+
+    release = [_release_week(p, week_start_day) for p in patients]
+
+    model = pyo.ConcreteModel()
+    model.I = pyo.Set(initialize=range(len(patients)))
+    model.T = pyo.Set(
+        initialize=[t for week in range(detailed_weeks) for t in week_days_of(week)]
+    )
+    model.K = pyo.Set(initialize=range(1, operating_rooms + 1))
+    model.W = pyo.Set(initialize=range(detailed_weeks, horizon_weeks))
+
+    model.XIDX = pyo.Set(
+        dimen=3,
+        initialize=[
+            (i, t, k)
+            for i in model.I
+            for week in range(release[i], detailed_weeks)
+            for t in week_days_of(week)
+            for k in model.K
+        ],
+    )
+    model.YIDX = pyo.Set(
+        dimen=2,
+        initialize=[(i, w) for i in model.I for w in model.W if w >= release[i]],
+    )
+    model.x = pyo.Var(model.XIDX, domain=pyo.Binary)
+    model.y = pyo.Var(model.YIDX, domain=pyo.Binary)
+
+    x_by_patient: Dict[int, List] = {i: [] for i in model.I}
+    x_by_slot: Dict[Tuple[int, int], List] = {(t, k): [] for t in model.T for k in model.K}
+    for i, t, k in model.XIDX:
+        x_by_patient[i].append(model.x[i, t, k])
+        x_by_slot[(t, k)].append(i)
+    y_by_patient: Dict[int, List] = {i: [] for i in model.I}
+    y_by_week: Dict[int, List[int]] = {w: [] for w in model.W}
+    for i, w in model.YIDX:
+        y_by_patient[i].append(model.y[i, w])
+        y_by_week[w].append(i)
+
+    def patient_once(model, i):
+        assignments = x_by_patient[i] + y_by_patient[i]
+        if not assignments:
+            return pyo.Constraint.Skip
+        return sum(assignments) <= 1
+
+    def room_capacity(model, t, k):
+        if not x_by_slot[(t, k)]:
+            return pyo.Constraint.Skip
+        return sum(patients[i].eot * model.x[i, t, k] for i in x_by_slot[(t, k)]) <= day_limit
+
+    def week_capacity(model, w):
+        if not y_by_week[w]:
+            return pyo.Constraint.Skip
+        return (
+            sum(patients[i].eot * model.y[i, w] for i in y_by_week[w])
+            <= operating_rooms * week_days * day_limit
+        )
+
+    model.patient_once = pyo.Constraint(model.I, rule=patient_once)
+    model.room_capacity = pyo.Constraint(model.T, model.K, rule=room_capacity)
+    model.week_capacity = pyo.Constraint(model.W, rule=week_capacity)
+
+    model.obj = pyo.Objective(
+        expr=sum(
+            value(patients[i], (t - week_start_day) // week_days, t) * model.x[i, t, k]
+            for i, t, k in model.XIDX
+        )
+        + sum(
+            value(patients[i], w, week_start_day + w * week_days) * model.y[i, w]
+            for i, w in model.YIDX
+        ),
+        sense=pyo.maximize,
+    )
+    return model
+
+
+def plan_week_rolling(
+    patients: List[Patient],
+    specialty: str,
+    week_start_day: int,
+    persistent_model=None,
+    timings: Optional[Dict[str, float]] = None,
+    previous_plan: Optional[List[Patient]] = None,
+    upcoming_patients: Optional[List[Patient]] = None,
+) -> List[Patient]:
+    """Rolling-horizon replacement of ``plan_week_eot``.
+
+    Optimizes ``Settings.rolling_horizon_weeks`` weeks and returns the plan
+    of the first one with the ``plan_week_eot`` contract (new ``Patient``
+    objects with ``opDay``/``workstation``, compacted to the start of the
+    week). The look-ahead holds ``upcoming_patients`` (known arrivals of the
+    next weeks) or, with ``Settings.rolling_arrivals == "forecast"``, the
+    pseudo-patients of ``forecast_arrivals``.
+
+    Each step is limited to ``Settings.rolling_time_limit`` seconds; if the
+    solver finds no solution in time, the week falls back to the heuristic
+    packing. ``persistent_model`` and ``previous_plan`` are accepted for
+    signature compatibility and ignored.
+    """
+    if timings is None:
+        timings = {}
+    if not patients:
+        return []
+
+    horizon_weeks = max(1, Settings.rolling_horizon_weeks)
+    decomposition = Settings.rolling_decomposition
+    if decomposition not in ROLLING_DECOMPOSITIONS:
+        raise ValueError(
+            f"Unknown rolling decomposition '{decomposition}'. "
+            f"Choose among {', '.join(ROLLING_DECOMPOSITIONS)}."
+        )
+    operating_rooms = Settings.workstations_config[specialty]
+    week_end = week_start_day + Settings.week_length_days
+
+    look_ahead: List[Patient] = []
+    if horizon_weeks > 1:
+        if Settings.rolling_arrivals == "known" and upcoming_patients:
+            horizon_end = week_start_day + (horizon_weeks - 1) * Settings.week_length_days
+            look_ahead = [
+                p for p in upcoming_patients if week_start_day <= p.day < horizon_end
+            ]
+        elif Settings.rolling_arrivals == "forecast":
+            look_ahead = forecast_arrivals(patients, week_start_day, horizon_weeks)
+
+    queue = sorted(patients, key=lambda patient: patient.id)
+    model_patients = queue + look_ahead
+    timings["backend"] = "rolling"
+    timings["horizon_weeks"] = horizon_weeks
+    timings["look_ahead_patients"] = len(look_ahead)
+
+    start = time.perf_counter()
+    model = build_rolling_model(
+        model_patients, operating_rooms, week_start_day, horizon_weeks, decomposition
+    )
+    timings["build"] = time.perf_counter() - start
+    timings["write"] = 0.0
+
+    start = time.perf_counter()
+    solver, backend, plugin_name = get_solver()
+    apply_solver_options(solver, plugin_name, time_limit=Settings.rolling_time_limit)
+    timings["backend"] = backend
+    try:
+        solver.solve(model, tee=Settings.solver_tee)
+        # A time limit reached without an incumbent returns normally but loads no values
+        solved = any(value is not None for value in model.x.extract_values().values())
+        if not solved:
+            print(f"[WARN] rolling horizon: no solution for day {week_start_day} (no incumbent)")
+    except (RuntimeError, ValueError) as e:
+        print(f"[WARN] rolling horizon: no solution for day {week_start_day} ({e})")
+        solved = False
+    timings["solve"] = time.perf_counter() - start
+    timings["load"] = 0.0
+
+    start = time.perf_counter()
+    if solved:
+        assignment = {
+            queue[i].id: (t, k)
+            for i, t, k in extract_assigned_indices(model.x)
+            if i < len(queue) and t < week_end
+        }
+    else:
+        assignment = pack_week_heuristic(
+            queue,
+            specialty,
+            week_start_day,
+            local_search=Settings.heuristic_local_search,
+        )
+    timings["fallback"] = not solved
+
+    planned = [
+        Patient(
+            id=patient.id,
+            eot=patient.eot,
+            day=patient.day,
+            mtb=patient.mtb,
+            rot=patient.rot,
+            opDay=assignment[patient.id][0],
+            workstation=assignment[patient.id][1],
+            overdue=False,
+        )
+        for patient in queue
+        if patient.id in assignment
+    ]
+    timings["extract"] = time.perf_counter() - start
+
+    planned = compact_eot_schedule_to_week_start(planned, specialty, week_start_day)
+    planned.sort(key=lambda patient: (patient.opDay, patient.workstation, patient.id))
+    return planned
@@ -5,17 +5,19 @@ Modulo principale di simulazione: lettura dei dati, schedulazione EOT+ROT
 e serializzazione dei risultati su file JSON/CSV.
 
 Funzioni esposte:
-    - read_and_split_by_operation_with_metadata : letttura CSV → dict per specialità
+    - read_and_split_by_operation_with_metadata : letttura CSV/binario → dict per specialità
     - group_daily_with_mtb_logic_optimized_rot  : orchestrazione EOT + simulazione ROT
     - export_json_schedule                      : esportazione schedule su JSON
     - ExportCSVResults                          : esportazione risultati su CSV
 """
 
 # ── Librerie standard ────────────────────────────────────────────────────────
+from __future__ import annotations
+
 import csv
-import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 # ── Risoluzione del path quando il modulo viene eseguito direttamente ────────
 if os.path.basename(__file__) != "main.py":
@@ -24,8 +26,15 @@ if os.path.basename(__file__) != "main.py":
     )
 
 # ── Moduli interni ───────────────────────────────────────────────────────────
+from CommonClass.JsonStream import json_path, write_json
 from CommonClass.Patient import Patient
 from CommonClass.PatientListForSpecialties import PatientListForSpecialties
+from CommonClass.PatientTable import PatientTable
+from RecordGeneration.PatientRecordBinary import (
+    is_patient_record_binary,
+    read_patient_record_binary,
+    split_table_by_specialty,
+)
 from settings import Settings
 from Simulatore.Optimizer import optimize_daily_batch_rot_both
 
@@ -33,6 +42,7 @@ from Simulatore.Optimizer import optimize_daily_batch_rot_both
 _ROT_OUTPUT_DIR = "./Data/"
 _EXTRA_TIME_FILE = "extra_time.json"
 _OVERFLOW_FILE = "overflow.json"
+_SOLVER_TIMINGS_FILE = "solver_timings.json"
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -46,16 +56,24 @@ def read_and_split_by_operation_with_metadata(csv_file: str) -> dict:
     {specialità: [Patient, ...]} con tutti i metadati necessari alla
     simulazione (EOT, ROT, giorno di inserimento, priorità MTB).
 
+    Se il file è nel formato binario colonnare (``Patient_Record.bin``) le
+    colonne vengono mappate in memoria e suddivise per specialità senza
+    costruire dizionari di riga.
+
     Parameters
     ----------
     csv_file : str
-        Percorso al file Patient_Record.csv generato da PatientRecordGenerator.
+        Percorso al file Patient_Record.csv (o Patient_Record.bin) generato
+        da PatientRecordGenerator.
 
     Returns
     -------
     dict[str, list[Patient]]
         Un dizionario indicizzato per specialità.
     """
+    if is_patient_record_binary(csv_file):
+        return read_and_split_binary_records(csv_file)
+
     result = {}
 
     with open(csv_file, mode="r", newline="", encoding="utf-8") as f:
@@ -79,6 +97,30 @@ def read_and_split_by_operation_with_metadata(csv_file: str) -> dict:
     return result
 
 
+def read_and_split_binary_records(binary_file: str) -> dict:
+    """
+    Legge il file binario colonnare dei pazienti e restituisce lo stesso
+    dizionario {specialità: [Patient, ...]} di
+    ``read_and_split_by_operation_with_metadata``.
+
+    Parameters
+    ----------
+    binary_file : str
+        Percorso al file Patient_Record.bin.
+
+    Returns
+    -------
+    dict[str, list[Patient]]
+        Un dizionario indicizzato per specialità.
+    """
+    table = read_patient_record_binary(binary_file, mmap=True)
+
+    return {
+        specialty: PatientTable.from_columns(**columns).to_patients()
+        for specialty, columns in split_table_by_specialty(table).items()
+    }
+
+
 # endregion
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -86,9 +128,60 @@ def read_and_split_by_operation_with_metadata(csv_file: str) -> dict:
 # ─────────────────────────────────────────────────────────────────────────────
 
 
+def _map_specialties(func, items: list, max_workers: int | None = None) -> list:
+    """
+    Applica ``func(specialità, pazienti)`` a ogni coppia di ``items``.
+
+    Le specialità non condividono capacità, quindi con ``max_workers > 1``
+    vengono elaborate in parallelo in un pool di processi; ogni worker
+    riceve una copia della configurazione corrente (``Settings.Snapshot``).
+    I risultati sono restituiti sempre nell'ordine di ``items``, quindi
+    l'output non dipende né dalla dimensione del pool né dall'ordine di
+    completamento.
+
+    Parameters
+    ----------
+    func : callable
+        Funzione a livello di modulo (serializzabile con pickle).
+    items : list[tuple[str, list[Patient]]]
+        Coppie (specialità, pazienti).
+    max_workers : int, optional
+        Numero di processi. Default: ``Settings.specialty_workers``.
+
+    Returns
+    -------
+    list
+        I risultati di ``func`` nell'ordine di ``items``.
+    """
+    if max_workers is None:
+        max_workers = Settings.specialty_workers
+    if max_workers is None or max_workers <= 1 or len(items) <= 1:
+        return [func(op_type, patients) for op_type, patients in items]
+
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(items)),
+        initializer=Settings.Apply,
+        initargs=(Settings.Snapshot(),),
+    ) as pool:
+        return list(
+            pool.map(
+                func,
+                [op_type for op_type, _ in items],
+                [patients for _, patients in items],
+            )
+        )
+
+
+def _schedule_specialty(op_type: str, patients: list) -> dict:
+    """Flusso EOT + ROT di una singola specialità (eseguibile in un worker)."""
+    return optimize_daily_batch_rot_both(patients, op_type)
+
+
+
 def group_daily_with_mtb_logic_optimized_rot(
     ops_dict: PatientListForSpecialties,
     data_folder: str = "./Data/",
+    max_workers: int | None = None,
 ) -> PatientListForSpecialties:
     """
     Pianifica l'intero orizzonte settimanale usando il doppio flusso EOT/ROT:
@@ -101,7 +194,8 @@ def group_daily_with_mtb_logic_optimized_rot(
        successiva.
 
     I risultati intermedi vengono serializzati in:
-        - ``./Data/Rot/extra_time.json``  (piano EOT, statistiche, extra-time)
+        - ``./Data/Rot/extra_time.json``  (piano EOT, statistiche, extra-time,
+          tempi build/write/solve/load del modello EOT per settimana)
         - ``./Data/Rot/overflow.json``    (pazienti non completati nella settimana)
 
     Parameters
@@ -109,6 +203,9 @@ def group_daily_with_mtb_logic_optimized_rot(
     ops_dict : PatientListForSpecialties
         Dizionario {specialità: [Patient, ...]} prodotto da
         ``read_and_split_by_operation_with_metadata``.
+    max_workers : int, optional
+        Processi usati per schedulare le specialità in parallelo.
+        Default: ``Settings.specialty_workers`` (1 = esecuzione seriale).
 
     Returns
     -------
@@ -122,6 +219,7 @@ def group_daily_with_mtb_logic_optimized_rot(
     extra_times = {}
     realtime_stats = {}
     plans_eot = {}
+    solver_timings = {}
 
     # ── Helper: serializzazione Patient → dict JSON ───────────────────────────
     def patient_to_dict(p: Patient) -> dict:
@@ -151,16 +249,18 @@ def group_daily_with_mtb_logic_optimized_rot(
             "overdue": getattr(p, "overdue", None),
         }
 
-    # ── Loop per specialità ───────────────────────────────────────────────────
-    for op_type, patients in ops_dict.items():
+    # ── Schedulazione per specialità (seriale o in parallelo) ─────────────────
+    items = list(ops_dict.items())
+    results = _map_specialties(_schedule_specialty, items, max_workers)
 
-        data = optimize_daily_batch_rot_both(patients, op_type)
+    # ── Unione dei risultati nell'ordine delle specialità ─────────────────────
+    for (op_type, _), data in zip(items, results):
 
         # Schedule realizzato (ROT)
         result[op_type] = data[op_type]["realized_rot"]
 
-        # Piano EOT convertito in lista di dict (per la serializzazione JSON)
-        plans_eot[op_type] = [patient_to_dict(p) for p in data[op_type]["plan_eot"]]
+        # Piano EOT: generatore di dict, consumato durante la scrittura del JSON
+        plans_eot[op_type] = (patient_to_dict(p) for p in data[op_type]["plan_eot"])
 
         # Overflow: ogni settimana è separata da un paziente sentinella id=-1
         for week_overflow in data[op_type]["overflow"]:
@@ -170,23 +270,27 @@ def group_daily_with_mtb_logic_optimized_rot(
         # Extra-time residuo e statistiche real-time per settimana
         extra_times[op_type] = data[op_type]["extra_time_left"]
         realtime_stats[op_type] = data[op_type].get("realtime_stats", [])
+        solver_timings[op_type] = data[op_type].get("solver_timings", [])
 
-    # ── Serializzazione output ────────────────────────────────────────────────
+    # ── Serializzazione output (in streaming dalle strutture vive) ────────────
     #os.makedirs(_ROT_OUTPUT_DIR, exist_ok=True)
-    extra_time_file = os.path.join(data_folder, _EXTRA_TIME_FILE)
-    with open(extra_time_file, "w", encoding="utf-8") as f:
-        json.dump(
-            {
-                "extra_times": extra_times,
-                "realtime_stats": realtime_stats,
-                "plan_eot": plans_eot,
-            },
-            f,
-            indent=4,
-        )
-    overflow_file = os.path.join(data_folder, _OVERFLOW_FILE)
-    with open(overflow_file, "w", encoding="utf-8") as f:
-        json.dump(overflows.to_json(), f, indent=4)
+    write_json(
+        {
+            "extra_times": extra_times,
+            "realtime_stats": realtime_stats,
+            "plan_eot": plans_eot,
+            "solver_timings": solver_timings,
+        },
+        json_path(os.path.join(data_folder, _EXTRA_TIME_FILE), Settings.json_gzip),
+        Settings.json_indent,
+        Settings.json_codec,
+    )
+    write_json(
+        overflows,
+        json_path(os.path.join(data_folder, _OVERFLOW_FILE), Settings.json_gzip),
+        Settings.json_indent,
+        Settings.json_codec,
+    )
 
     return result
 
@@ -195,8 +299,63 @@ def group_daily_with_mtb_logic_optimized_rot(
 
 
 # region PUNTO 3
+def _rebuild_specialty_using_rot_cplex(specialty: str, patients: list) -> tuple:
+    """
+    Riallocazione settimanale con il modello ROT di una singola specialità
+    (eseguibile in un worker).
+
+    Returns
+    -------
+    tuple[list[Patient], list[dict]]
+        Pazienti pianificati e, per ogni settimana, le informazioni sul
+        solver (backend usato).
+    """
+    from Simulatore.Optimizer import reallocate_week_with_rot_overtime
+
+    planned_patients = []
+    week_infos = []
+
+    weeks = {}
+
+    for p in patients:
+
+        # if p.opDay == -1:
+        #     continue
+
+        # Calculate week number (starting from Settings.start_week_scheduling)
+        week_num = (
+            (p.day - 1) // Settings.week_length_days
+        ) + Settings.start_week_scheduling
+
+        weeks.setdefault(week_num, []).append(p)
+
+    carryover = []
+
+    for week_num in sorted(weeks.keys()):
+
+        current_week_patients = carryover + weeks[week_num]
+
+        # Calculate the actual starting day for this week number
+        # Formula: day = (week_num - 1 + start_week) * week_length_days
+        week_start_day = (
+            week_num - 1 + Settings.start_week_scheduling
+        ) * Settings.week_length_days
+
+        week_info = {"start_day": week_start_day}
+        planned, carryover = reallocate_week_with_rot_overtime(
+            current_week_patients, specialty, week_start_day, timings=week_info
+        )
+
+        planned_patients.extend(planned)
+        week_infos.append(week_info)
+
+    return planned_patients, week_infos
+
+
 def rebuild_schedule_using_rot_cplex(
     schedule: PatientListForSpecialties,
+    max_workers: int | None = None,
+    data_folder: str | None = None,
 ) -> PatientListForSpecialties:
     """
     Ricostruisce lo schedule utilizzando i tempi reali (ROT) tramite una
@@ -213,6 +372,12 @@ def rebuild_schedule_using_rot_cplex(
     schedule : PatientListForSpecialties
        Schedule iniziale contenente i pazienti assegnati alle varie
        specialità.
+    max_workers : int, optional
+       Processi usati per riallocare le specialità in parallelo.
+       Default: ``Settings.specialty_workers`` (1 = esecuzione seriale).
+    data_folder : str, optional
+       Se indicata, vi viene scritto ``solver_timings.json`` con il backend
+       del solver usato per ogni settimana e specialità.
 
     Returns
     -------
@@ -221,47 +386,24 @@ def rebuild_schedule_using_rot_cplex(
        tempi reali (ROT).
     """
 
-    from Simulatore.Optimizer import reallocate_week_with_rot_overtime
-
     result = PatientListForSpecialties()
 
-    for specialty, patients in schedule.items():
-
-        result[specialty] = []
-
-        weeks = {}
-
-        for p in patients:
-
-            # if p.opDay == -1:
-            #     continue
-
-            # Calculate week number (starting from Settings.start_week_scheduling)
-            week_num = (
-                (p.day - 1) // Settings.week_length_days
-            ) + Settings.start_week_scheduling
-
-            weeks.setdefault(week_num, []).append(p)
-
-        carryover = []
-
-        for week_num in sorted(weeks.keys()):
-
-            current_week_patients = carryover + weeks[week_num]
-
-            # Calculate the actual starting day for this week number
-            # Formula: day = (week_num - 1 + start_week) * week_length_days
-            week_start_day = (
-                week_num - 1 + Settings.start_week_scheduling
-            ) * Settings.week_length_days
-
-            planned, carryover = reallocate_week_with_rot_overtime(
-                current_week_patients, specialty, week_start_day
-            )
-
-            result[specialty].extend(planned)
-
-        next_week = max(weeks.keys()) + 1
+    items = list(schedule.items())
+    results = _map_specialties(_rebuild_specialty_using_rot_cplex, items, max_workers)
+
+    solver_timings = {}
+    for (specialty, _), (planned_patients, week_infos) in zip(items, results):
+        result[specialty] = planned_patients
+        solver_timings[specialty] = week_infos
+
+    if data_folder is not None:
+        os.makedirs(data_folder, exist_ok=True)
+        write_json(
+            solver_timings,
+            json_path(os.path.join(data_folder, _SOLVER_TIMINGS_FILE), Settings.json_gzip),
+            Settings.json_indent,
+            Settings.json_codec,
+        )
 
     return result
 
@@ -277,12 +419,17 @@ def export_json_schedule(
     data, filepath: str, filename: str = "weekly_schedule.json"
 ) -> str:
     """
-    Esporta il dizionario dello schedule in un file JSON.
+    Esporta lo schedule in un file JSON, scritto in streaming.
+
+    Indentazione e compressione seguono ``Settings.json_indent`` e
+    ``Settings.json_gzip`` (con gzip il nome del file riceve il suffisso
+    ``.gz``).
 
     Parameters
     ----------
-    data : dict
-        Dati da serializzare (tipicamente ``schedule.to_dict()``).
+    data : PatientListForSpecialties | dict
+        Dati da serializzare: lo schedule stesso (i pazienti vengono
+        scritti uno alla volta) oppure un dict già convertito.
     filepath : str
         Cartella di destinazione (viene creata se non esiste).
     filename : str, optional
@@ -294,10 +441,9 @@ def export_json_schedule(
         Percorso assoluto del file creato.
     """
     os.makedirs(filepath, exist_ok=True)
-    file = os.path.join(filepath, filename)
+    file = json_path(os.path.join(filepath, filename), Settings.json_gzip)
 
-    with open(file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    write_json(data, file, Settings.json_indent, Settings.json_codec)
 
     print(f"JSON exported to {file}")
     return file
@@ -0,0 +1,149 @@
+"""Solver backend selection for the weekly scheduling models.
+
+Maps the configured backend (CPLEX, HiGHS, CBC or GLPK) onto the Pyomo solver
+plugins and translates the generic time limit, MIP gap and thread count
+settings into each plugin's own option names. When the configured backend is
+not available on this node, the first available fallback is used.
+"""
+
+import os
+import sys
+from typing import Dict, Optional, Tuple
+
+import pyomo.environ as pyo
+
+if os.path.basename(__file__) != "main.py":
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "../../", "Code"))
+    )
+
+from settings import Settings
+
+# Pyomo plugin names for each backend: (standard, persistent)
+SOLVER_BACKENDS: Dict[str, Tuple[str, Optional[str]]] = {
+    "cplex": ("cplex", "cplex_persistent"),
+    "highs": ("appsi_highs", "appsi_highs"),
+    "cbc": ("cbc", None),
+    "glpk": ("glpk", None),
+}
+
+# Option names of each Pyomo plugin for the generic solver settings
+SOLVER_OPTION_NAMES: Dict[str, Dict[str, Optional[str]]] = {
+    "cplex": {"time_limit": "timelimit", "mip_gap": "mipgap", "threads": "threads"},
+    "cplex_persistent": {
+        "time_limit": "timelimit",
+        "mip_gap": "mip_tolerances_mipgap",
+        "threads": "threads",
+    },
+    "appsi_highs": {
+        "time_limit": "time_limit",
+        "mip_gap": "mip_rel_gap",
+        "threads": "threads",
+    },
+    "cbc": {"time_limit": "sec", "mip_gap": "ratioGap", "threads": "threads"},
+    "glpk": {"time_limit": "tmlim", "mip_gap": "mipgap", "threads": None},
+}
+
+# Standard solver instances of this process, by candidate backend list
+_solver_cache: Dict[Tuple[str, ...], Tuple[object, str, str]] = {}
+
+
+def _candidate_backends():
+    """Configured backend first, then the fallbacks, without duplicates."""
+    candidates = [Settings.solver_backend] + list(Settings.solver_fallback_backends)
+    return list(dict.fromkeys(candidates))
+
+
+def _is_available(solver) -> bool:
+    try:
+        return bool(solver.available(exception_flag=False))
+    except Exception:
+        return False
+
+
+def apply_solver_options(
+    solver,
+    plugin_name: str,
+    time_limit: Optional[float] = None,
+    mip_gap: Optional[float] = None,
+    threads: Optional[int] = None,
+) -> None:
+    """Set the generic solver settings using the plugin's option names.
+
+    ``None`` arguments default to ``Settings.solver_time_limit``,
+    ``Settings.solver_mip_gap`` and ``Settings.solver_threads``; settings that
+    are still ``None`` (or unsupported by the plugin) are left untouched.
+    """
+    values = {
+        "time_limit": Settings.solver_time_limit if time_limit is None else time_limit,
+        "mip_gap": Settings.solver_mip_gap if mip_gap is None else mip_gap,
+        "threads": Settings.solver_threads if threads is None else threads,
+    }
+    names = SOLVER_OPTION_NAMES.get(plugin_name, {})
+    for key, value in values.items():
+        option_name = names.get(key)
+        if value is not None and option_name is not None:
+            solver.options[option_name] = value
+
+
+def warm_start_keywords(solver) -> Dict[str, bool]:
+    """Return the ``solve()`` keywords that pass the current var values as a MIP start.
+
+    An empty dict is returned for solvers that do not support MIP starts.
+    """
+    try:
+        capable = bool(solver.warm_start_capable())
+    except Exception:
+        capable = False
+    if not capable:
+        return {}
+    # Persistent plugins accept the same keyword (DirectOrPersistentSolver pops "warmstart")
+    return {"warmstart": True}
+
+
+def create_solver(persistent: bool = False) -> Tuple[object, str, str]:
+    """Create a new solver for the first available backend.
+
+    Args:
+        persistent: Prefer the backend's persistent plugin. Backends without
+            one fall back to their standard plugin.
+
+    Returns:
+        (solver, backend name, plugin name), with the options already applied.
+    """
+    for backend in _candidate_backends():
+        if backend not in SOLVER_BACKENDS:
+            raise ValueError(
+                f"Unknown solver backend '{backend}'. "
+                f"Choose among {', '.join(SOLVER_BACKENDS)}."
+            )
+        standard, persistent_name = SOLVER_BACKENDS[backend]
+        plugin_name = persistent_name if persistent and persistent_name else standard
+        solver = pyo.SolverFactory(plugin_name)
+        if _is_available(solver):
+            apply_solver_options(solver, plugin_name)
+            return solver, backend, plugin_name
+
+    raise RuntimeError(
+        "No MIP solver available among: " + ", ".join(_candidate_backends())
+    )
+
+
+def get_solver() -> Tuple[object, str, str]:
+    """Return this process' standard solver (created once, then reused).
+
+    Returns:
+        (solver, backend name, plugin name)
+    """
+    key = tuple(_candidate_backends())
+    if key not in _solver_cache:
+        _solver_cache[key] = create_solver(persistent=False)
+    solver, backend, plugin_name = _solver_cache[key]
+    # Options are re-applied so that Settings changes (e.g. sweep variants) apply
+    apply_solver_options(solver, plugin_name)
+    return solver, backend, plugin_name
+
+
+def reset_solvers() -> None:
+    """Drop the cached solver instances (e.g. in a freshly started worker)."""
+    _solver_cache.clear()
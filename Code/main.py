@@ -1,6 +1,8 @@
 import json
 import os
 
+from CommonClass.JsonStream import find_json, open_json
+from Grafici.Dashboard import write_dashboard, write_seed_manifest
 from Grafici.Graph import Graphs, CreateScheduleWithReplanned
 from RecordGeneration.PatientRecordGenerator import generate_csv
 from settings import Settings
@@ -13,9 +15,18 @@ from Simulatore.Simulation import rebuild_schedule_using_rot_cplex
 
 
 # Main function to generate patient records and weekly reports
-def main():
+def main(seed=None, data_root=None, make_graphs=True):
     """
     Main function to generate patient records and weekly reports.
+
+    Args:
+        seed: Seed of the run (default: Settings.GetSeed())
+        data_root: Folder where the seed-<n> results folder is created
+            (default: Settings.resultsData_folder under the project root)
+        make_graphs: If False, skip the graph and comparison-table stage
+
+    Returns:
+        Dictionary with the results folder and the schedules of each scenario
     """
 
     specialties = list(Settings.workstations_config.keys())
@@ -24,13 +35,16 @@ def main():
         Settings.week_hours_to_fill
     )
 
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # + "/Data"
-    data_root = os.path.join(project_root, Settings.resultsData_folder)
+    if seed is None:
+        seed = Settings.GetSeed()
+    if data_root is None:
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # + "/Data"
+        data_root = os.path.join(project_root, Settings.resultsData_folder)
     paths = generate_csv(
         specialties=specialties,
         weekly_hours=weekly_hours,
         num_weeks=Settings.weeks_to_fill,
-        seed=Settings.GetSeed(),  # 197558074,
+        seed=seed,  # 197558074,
         specialty_params=Settings.specialty_params,
         people_distribution=Settings.daily_patient_arrival_distribution,
         priority_params=Settings.priority_params,  # <-- passa il nuovo dizionario
@@ -44,27 +58,35 @@ def main():
     schedule = group_daily_with_mtb_logic_optimized_rot(all_patient_records, resultsData_folder)
     plan_eot = None
     try:
-        with open(f"{resultsData_folder}/extra_time.json", "r", encoding="utf-8") as f:
+        with open_json(find_json(f"{resultsData_folder}/extra_time.json")) as f:
             extra = json.load(f)
         plan_eot = extra.get("plan_eot", None)
     except Exception as e:
         print(f"[WARN] plan_eot non letto: {e}")
 
     schedule_stimato_ripianificato = CreateScheduleWithReplanned(schedule, plan_eot)
-    scheduleJson_path = export_json_schedule(schedule_stimato_ripianificato.to_dict(), resultsData_folder)
+    scheduleJson_path = export_json_schedule(schedule_stimato_ripianificato, resultsData_folder)
     
-    Graphs(f"{resultsData_folder}{Settings.images_folder}").MakeGraphs(
-        schedule_stimato_ripianificato, plan_eot=plan_eot
-    )
+    # Graphs of each scenario, for the dashboard manifest
+    graph_runs = {}
+    if make_graphs:
+        graph_runs["Stimato + Ripianificato"] = Graphs(f"{resultsData_folder}{Settings.images_folder}")
+        graph_runs["Stimato + Ripianificato"].MakeGraphs(
+            schedule_stimato_ripianificato, plan_eot=plan_eot
+        )
 
 
-    schedule_rot_cplex = rebuild_schedule_using_rot_cplex(all_patient_records)
-    scheduleJson_path = export_json_schedule(
-        schedule_rot_cplex.to_dict(), resultsData_folder + "/rot_cplex/"
+    schedule_rot_cplex = rebuild_schedule_using_rot_cplex(
+        all_patient_records, data_folder=resultsData_folder + "/rot_cplex/"
     )
-    Graphs(f"{resultsData_folder}/rot_cplex/{Settings.images_folder}").MakeGraphs(
-        schedule_rot_cplex, plan_eot=plan_eot, use_rot_as_primary=True
+    scheduleJson_path = export_json_schedule(
+        schedule_rot_cplex, resultsData_folder + "/rot_cplex/"
     )
+    if make_graphs:
+        graph_runs["PostSchedulato"] = Graphs(f"{resultsData_folder}/rot_cplex/{Settings.images_folder}")
+        graph_runs["PostSchedulato"].MakeGraphs(
+            schedule_rot_cplex, plan_eot=plan_eot, use_rot_as_primary=True
+        )
 
     dictSchedules = {
         "Stimato": schedule,
@@ -72,9 +94,29 @@ def main():
         "PostSchedulato": schedule_rot_cplex,
     }
 
-    Graphs(f"{resultsData_folder}").MostraTabellaConfrontoPlotly(dictSchedules)
-
-    print(f"Graphs and tables generated in {resultsData_folder}")
+    if make_graphs:
+        # The graphed scenarios reuse the day x room occupancy built by MakeGraphs
+        table_scenarios = {
+            scenario: graph_runs[scenario].occupancy if scenario in graph_runs else scenario_schedule
+            for scenario, scenario_schedule in dictSchedules.items()
+        }
+        graph_runs["Confronto scenari"] = Graphs(f"{resultsData_folder}")
+        graph_runs["Confronto scenari"].MostraTabellaConfrontoPlotly(table_scenarios)
+        print(f"Graphs and tables generated in {resultsData_folder}")
+        if Settings.graph_output == "dashboard":
+            write_seed_manifest(
+                resultsData_folder,
+                seed,
+                {scenario: graphs.figures for scenario, graphs in graph_runs.items()},
+            )
+            index_path = write_dashboard(data_root)
+            print(f"Dashboard updated: {index_path}")
+
+    return {
+        "seed": seed,
+        "results_folder": resultsData_folder,
+        "schedules": dictSchedules,
+    }
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-import pyomo.environ as pyo
+import copy
 import time
 
 
@@ -22,6 +22,22 @@ class Settings:
             Settings.seed = int(time.time() * 1000) % (2**32 - 1)
         return Settings.seed
 
+    def Snapshot():
+        """Return the current configuration as a plain dict."""
+        return {
+            key: copy.deepcopy(value)
+            for key, value in vars(Settings).items()
+            if not key.startswith("_")
+            and not callable(value)
+        }
+
+    def Apply(overrides):
+        """Override configuration values in place (e.g. inside a sweep worker)."""
+        for key, value in (overrides or {}).items():
+            if not hasattr(Settings, key):
+                raise KeyError(f"Unknown setting: {key}")
+            setattr(Settings, key, copy.deepcopy(value))
+
     #show_graphs = True  # Whether to display graphs after generation
 
     #endregion
@@ -46,6 +62,19 @@ class Settings:
     # Intervallo del moltiplicatore per simulare ROT a partire da EOT:
     # ROT = EOT * U(min, max)
     rot_over_eot_multiplier_range = (0.8, 1.3)
+    # Motore di generazione dei pazienti:
+    # - "legacy"    : una chiamata np.random per fase K e per paziente. Mantiene
+    #                 l'ordine di estrazione storico, quindi a parità di seed
+    #                 riproduce esattamente i Patient_Record.csv già generati.
+    # - "vectorized": estrae l'intero orizzonte come array NumPy in un solo
+    #                 passaggio (np.random.default_rng(seed)). Riproducibile a
+    #                 parità di seed, ma con uno stream diverso da "legacy".
+    patient_generation_mode = "legacy"
+    # Formato su disco dei record pazienti:
+    # - "csv"   : solo Patient_Record.csv (default)
+    # - "binary": solo Patient_Record.bin, colonnare e mappabile in memoria
+    # - "both"  : entrambi; generate_csv restituisce il percorso del file binario
+    patient_record_format = "csv"
 
     specialty_params = {
         "Specialty A": {
@@ -85,6 +114,45 @@ class Settings:
     results_filename = "Results.csv"
     
     images_folder = "./Images/"
+    # Rendering of the daily box graph (Graphs.PrintDailyBoxGraph):
+    # - "aggregated" : two array-backed bar traces per week, stacked with
+    #                  explicit base arrays and built without go validation
+    # - "per_patient": two go.Bar traces per patient (original rendering)
+    daily_box_graph_mode = "aggregated"
+    # Output format of the graphs (Grafici/Dashboard.py):
+    # - "html"     : one standalone HTML file per figure, plotly.js embedded
+    # - "dashboard": one compact JSON file per figure and a figures.json
+    #                manifest per seed; the results root gets a single
+    #                plotly.js copy and an index.html that loads the figures
+    #                on demand by seed, scenario, chart and specialty
+    graph_output = "html"
+    # Worker processes used by Graphs.MakeGraphs to render the (chart,
+    # specialty) figures concurrently (1 = serial). File names and the order
+    # of the dashboard manifest and data log do not depend on the pool size.
+    graph_workers = 1
+    # Graph data log (default of Graphs.log_graph_data): every distinct patient
+    # dataset is stored once under graph_data/<hash> next to
+    # graph_data_log.jsonl, and the log records reference it by hash
+    # (Grafici/GraphDataStore.py):
+    # - graph_data_log     : if True, every chart logs the data it was built from
+    # - graph_data_format  : "json" (compact columns) or "npz" (NumPy binary)
+    # - graph_data_compress: if True, gzip the JSON / compress the npz
+    graph_data_log = False
+    graph_data_format = "json"
+    graph_data_compress = False
+    # JSON result files (weekly_schedule, extra_time, overflow, solver_timings)
+    # are written in streaming (CommonClass/JsonStream.py):
+    # - json_indent: indentation spaces, None = compact output
+    # - json_gzip  : if True the files are gzip-compressed, with a ".gz" suffix
+    json_indent = 4
+    json_gzip = False
+    # Codec used to load schedules and to encode compact output
+    # (CommonClass/JsonCodec.py): "auto" (msgspec, then orjson, then the
+    # standard json module), "msgspec", "orjson" or "json". A codec that is
+    # not installed falls back to the next one in that order. Compact output
+    # through orjson/msgspec matches the json module except for the float
+    # exponent form (1e16 vs 1e+16) and NaN/Infinity, written as null.
+    json_codec = "auto"
     #endregion
 
     #region Optimization Settings
@@ -97,7 +165,76 @@ class Settings:
     week_length_days = 5
     # Weekly operation time overflow in minutes
     weekly_extra_time_pool = 180
-    # Solver configuration
-    solver = pyo.SolverFactory('cplex')  # Use CPLEX solver
+    # Solver configuration (see Simulatore/SolverBackend.py)
+    # Backend: "cplex", "highs" (appsi/highspy), "cbc" or "glpk"
+    solver_backend = "cplex"
+    # Backends tried in order when the configured one is not available
+    solver_fallback_backends = ["highs", "cbc", "glpk"]
+    # Generic options, mapped onto each backend's own option names
+    solver_time_limit = 300  # seconds
+    solver_mip_gap = None  # e.g. 0.01
+    solver_threads = None
+    # Weekly EOT model handling:
+    # - "rebuild"   : build a new PyomoModel_0 every week (default)
+    # - "persistent": build the model once per specialty and only update the
+    #                 patient parameters/active variables each week
+    eot_model_mode = "rebuild"
+    # Weekly EOT planner:
+    # - "mip"      : weekly MIP (PyomoModel_0 / persistent model), default
+    # - "heuristic": solver-free MTB-aware best-fit decreasing packing
+    # - "rolling"  : rolling-horizon MIP over several weeks, first week committed
+    eot_planner = "mip"
+    # Local search (moving one planned patient to free room) in the heuristic
+    heuristic_local_search = True
+    # Rolling-horizon planner (eot_planner = "rolling"):
+    # weeks optimized at each step (only the first one is committed)
+    rolling_horizon_weeks = 3
+    # Arrivals of the look-ahead weeks: "known" (generated arrivals),
+    # "forecast" (last week's arrivals with the queue's mean EOT/MTB) or "none"
+    rolling_arrivals = "known"
+    # "full": every week per day and room; "aggregate_future": only the first
+    # week per day and room, later weeks as one capacity bucket each
+    rolling_decomposition = "aggregate_future"
+    # Objective weights: discount per week of delay, bonus for meeting the MTB
+    rolling_discount = 0.8
+    rolling_deadline_weight = 1.0
+    # Time limit (seconds) of each rolling-horizon solve
+    rolling_time_limit = 60
+    # If True, the weekly EOT model only lets a patient be planned up to its
+    # MTB deadline (day + mtb); patients already overdue keep the whole week
+    eot_deadline_window = False
+    # Room formulation of the weekly EOT and ROT models (rooms are identical):
+    # - "room"      : one binary per patient/day/room (default)
+    # - "symmetry"  : as "room", plus constraints ordering the rooms of each
+    #                 day by load, removing the K! equivalent solutions
+    # - "aggregated": EOT model at day level (one pooled room per day), rooms
+    #                 assigned afterwards by first-fit decreasing on the same
+    #                 day; if a day does not fit into its rooms the week is
+    #                 re-solved with "room", so plans keep the room model's
+    #                 quality. The ROT model uses the "symmetry" constraints
+    eot_formulation = "room"
+    # MIP start for the weekly EOT model. It is only passed to solvers whose
+    # plugin reports warm_start_capable(); on any other backend the setting
+    # is silently ignored and the model is solved cold (this includes the
+    # open-source appsi_highs plugin on Pyomo releases where it does not
+    # report MIP-start support):
+    # - None           : no warm start (default)
+    # - "ffd"          : first-fit decreasing packing of the weekly queue
+    # - "previous_plan": last week's plan shifted by one week for carryover
+    #                    patients, first-fit decreasing for the others
+    eot_warm_start = None
+    # Worker processes used to schedule independent specialties concurrently
+    # (1 = serial). Results are merged in specialty order, so they do not
+    # depend on the pool size.
+    specialty_workers = 1
+    #endregion
+
+    #region Sweep Settings
+    # Folder (under the project root) where sweep runs write their results
+    sweep_folder = "./Data/sweep/"
+    # Number of worker processes for the seed sweep (None = os.cpu_count())
+    sweep_workers = None
+    # Name of the summary table written by the sweep
+    sweep_summary_filename = "sweep_summary.csv"
     #endregion
 
@@ -0,0 +1,220 @@
+"""Parallel seed sweep built around main.main().
+
+Runs N seeds x configuration variants across a process pool. Every job runs
+in its own output folder (``<sweep_folder>/<variant>/seed-<n>``) with its own
+solver instance, and the per-seed KPIs are collected into a single summary
+table.
+
+Usage:
+    python sweep.py --seeds 1-50 --workers 8
+    python sweep.py --seeds 1,2,3 --variants variants.json --graphs
+
+``variants.json`` maps a variant name to a dict of Settings overrides, e.g.
+``{"base": {}, "tight": {"daily_operation_limit": 420}}``. Solver backends
+can be benchmarked against each other the same way, e.g.
+``{"cplex": {"solver_backend": "cplex"}, "highs": {"solver_backend": "highs"}}``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Grafici.Dashboard import write_dashboard
+from Grafici.Kpi import specialty_summary
+from settings import Settings
+from Simulatore.SolverBackend import reset_solvers
+
+_DEFAULT_VARIANT = "base"
+_SUMMARY_FIELDS = [
+    "variant",
+    "seed",
+    "scenario",
+    "specialty",
+    "patients",
+    "mean_wait",
+    "max_wait",
+    "overdue",
+    "or_minutes",
+    "overtime_minutes",
+    "elapsed_s",
+    "error",
+]
+
+
+def _init_worker():
+    """Give each worker process its own solver instance."""
+    reset_solvers()
+
+
+def compute_schedule_kpis(schedule) -> list[dict]:
+    """Compute the per-specialty KPIs of one schedule.
+
+    Args:
+        schedule: PatientListForSpecialties with opDay/workstation assigned
+
+    Returns:
+        One dict per non-empty specialty with patients, waiting times,
+        overdue count, regular OR minutes and overtime minutes (ROT based),
+        computed by Grafici.Kpi
+    """
+    summary = specialty_summary(schedule)
+    return [
+        {
+            "specialty": specialty,
+            "patients": int(row.patients),
+            "mean_wait": round(float(row.mean_wait), 3),
+            "max_wait": int(row.max_wait),
+            "overdue": int(row.overdue),
+            "or_minutes": round(float(row.or_minutes), 3),
+            "overtime_minutes": round(float(row.overtime_minutes), 3),
+        }
+        for specialty, row in summary.iterrows()
+    ]
+
+
+def _run_job(variant, seed, base_settings, overrides, output_root, make_graphs):
+    """Run main() for one (variant, seed) pair inside a worker process."""
+    from main import main
+
+    # Workers are reused across jobs: restore the base configuration first
+    Settings.Apply(base_settings)
+    Settings.Apply(overrides)
+    Settings.seed = seed
+
+    data_root = os.path.join(output_root, variant, "")
+    os.makedirs(data_root, exist_ok=True)
+
+    start = time.perf_counter()
+    result = main(seed=seed, data_root=data_root, make_graphs=make_graphs)
+    elapsed = round(time.perf_counter() - start, 3)
+
+    rows = []
+    for scenario, schedule in result["schedules"].items():
+        for kpi in compute_schedule_kpis(schedule):
+            rows.append(
+                {
+                    "variant": variant,
+                    "seed": seed,
+                    "scenario": scenario,
+                    "elapsed_s": elapsed,
+                    "error": "",
+                    **kpi,
+                }
+            )
+    return rows
+
+
+def run_sweep(
+    seeds,
+    variants: dict | None = None,
+    max_workers: int | None = None,
+    output_root: str | None = None,
+    make_graphs: bool = False,
+) -> str:
+    """Run every (variant, seed) pair across a process pool.
+
+    Args:
+        seeds: Iterable of integer seeds
+        variants: {variant name: Settings overrides} (default: one "base" variant)
+        max_workers: Number of worker processes (default: Settings.sweep_workers)
+        output_root: Root folder of the sweep (default: Settings.sweep_folder)
+        make_graphs: If True, each run also renders its graphs
+
+    Returns:
+        Path of the summary CSV table
+    """
+    if not variants:
+        variants = {_DEFAULT_VARIANT: {}}
+    if max_workers is None:
+        max_workers = Settings.sweep_workers
+    if output_root is None:
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output_root = os.path.join(project_root, Settings.sweep_folder)
+    os.makedirs(output_root, exist_ok=True)
+
+    base_settings = Settings.Snapshot()
+    jobs = [(variant, seed) for variant in variants for seed in seeds]
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(
+                _run_job,
+                variant,
+                seed,
+                base_settings,
+                variants[variant],
+                output_root,
+                make_graphs,
+            ): (variant, seed)
+            for variant, seed in jobs
+        }
+        for future in as_completed(futures):
+            variant, seed = futures[future]
+            try:
+                results[(variant, seed)] = future.result()
+                print(f"[SWEEP] done variant={variant} seed={seed}")
+            except Exception as e:
+                print(f"[SWEEP] failed variant={variant} seed={seed}: {e}")
+                results[(variant, seed)] = [
+                    {"variant": variant, "seed": seed, "error": str(e)}
+                ]
+
+    # Rows follow the job order, independently of completion order
+    summary_path = os.path.join(output_root, Settings.sweep_summary_filename)
+    with open(summary_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=_SUMMARY_FIELDS, restval="")
+        writer.writeheader()
+        for job in jobs:
+            writer.writerows(results[job])
+
+    print(f"Sweep summary written to {summary_path}")
+
+    # Runs finish in any order: rebuild each dashboard index once all seeds are in
+    if make_graphs:
+        for variant in variants:
+            index_path = write_dashboard(os.path.join(output_root, variant))
+            if index_path:
+                print(f"Dashboard of variant {variant}: {index_path}")
+    return summary_path
+
+
+def _parse_seeds(text: str) -> list[int]:
+    """Parse "1-50" or "1,2,7" (or a mix, "1-5,9") into a list of seeds."""
+    seeds = []
+    for part in text.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-", 1)
+            seeds.extend(range(int(first), int(last) + 1))
+        elif part:
+            seeds.append(int(part))
+    return seeds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel seed sweep of main()")
+    parser.add_argument("--seeds", default="1-10", help='Seeds, e.g. "1-50" or "1,2,7"')
+    parser.add_argument("--variants", default=None, help="JSON file {name: {setting: value}}")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--output", default=None, help="Sweep output folder")
+    parser.add_argument("--graphs", action="store_true", help="Render graphs for every run")
+    args = parser.parse_args()
+
+    variants = None
+    if args.variants:
+        with open(args.variants, "r", encoding="utf-8") as f:
+            variants = json.load(f)
+
+    run_sweep(
+        _parse_seeds(args.seeds),
+        variants=variants,
+        max_workers=args.workers,
+        output_root=args.output,
+        make_graphs=args.graphs,
+    )
@@ -1,6 +1,9 @@
-import sys
+import argparse
 import json
+import os
+import sys
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 CODE_DIR = Path(__file__).resolve().parent.parent / "Code"
@@ -8,43 +11,145 @@ if str(CODE_DIR) not in sys.path:
     sys.path.append(str(CODE_DIR))
 
 from Grafici.Graph import Graphs
+from Grafici.Kpi import scenario_aggregates
+from CommonClass.JsonCodec import load_schedule
 from CommonClass.PatientListForSpecialties import PatientListForSpecialties
+from settings import Settings
 
 _ROOT_PATH = Path(__file__).parent.parent  # Assuming this file is in Utility/Genera_Tabelle.py
 _DATA_FOLDER = "./Data/"
 _DATA_PATH = _ROOT_PATH / _DATA_FOLDER
 _SCHEDULING_FILE_NAME = "weekly_schedule.json"
 _ROT_FOLDER = "./rot_cplex"
+# Indice della cache degli aggregati, salvato nella cartella dei dati
+_CACHE_FILE_NAME = "cache_scenari.json"
+_CACHE_VERSION = 1
 
 
 def carica_dati_da_json(path_file)-> PatientListForSpecialties:
-    with open(path_file, 'r', encoding='utf-8') as f:
-        contenuto = json.load(f)
-    return PatientListForSpecialties.from_dict(contenuto)
+    # Decodifica con il codec di Settings.json_codec (anche file .gz)
+    return load_schedule(path_file)
+
+
+def aggrega_file(path_file) -> dict:
+    """Aggregati (Kpi.scenario_aggregates) di un file di schedule; eseguita nei worker."""
+    # Lettura colonnare: i KPI non hanno bisogno degli oggetti Patient
+    return scenario_aggregates(load_schedule(path_file, columnar=True))
+
+
+def parametri_cache() -> dict:
+    """Configurazione da cui dipendono gli aggregati: se cambia, la cache non vale più."""
+    return {
+        "week_length_days": Settings.week_length_days,
+        "daily_operation_limit": Settings.daily_operation_limit,
+        "workstations_config": Settings.workstations_config,
+    }
+
+
+def leggi_cache(percorso_cache) -> dict:
+    """Voci della cache {percorso relativo: {mtime, size, aggregati}} (vuota se non valida)."""
+    try:
+        with open(percorso_cache, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("versione") != _CACHE_VERSION or cache.get("parametri") != parametri_cache():
+        return {}
+    return cache.get("file", {})
 
 
-def crea_scenari_per_tabella(cartella_dati=_DATA_PATH, nome_file=_SCHEDULING_FILE_NAME):
+def scrivi_cache(percorso_cache, voci) -> None:
+    # Scrittura su file temporaneo e rinomina: un'interruzione non lascia una cache troncata
+    temporaneo = f"{percorso_cache}.tmp"
+    with open(temporaneo, "w", encoding="utf-8") as f:
+        json.dump({"versione": _CACHE_VERSION, "parametri": parametri_cache(), "file": voci}, f)
+    os.replace(temporaneo, percorso_cache)
+
+
+def aggrega_scenari(cartella_dati=_DATA_PATH, nome_file=_SCHEDULING_FILE_NAME,
+                    max_workers=None, usa_cache=True) -> dict:
     """
-    Legge i file base e 'rot' per ogni seed, li ordina numericamente
-    e crea il dizionario 'scenari' pronto per MostraTabellaConfrontoPlotly.
+    Aggregati di tutti i file di schedule sotto ``cartella_dati``.
+
+    Vengono rielaborati solo i file nuovi o modificati (mtime o dimensione
+    diversi da quelli nell'indice ``_CACHE_FILE_NAME``), in parallelo in un
+    pool di ``max_workers`` processi (default os.cpu_count()); gli altri
+    aggregati sono letti dalla cache, che viene poi aggiornata.
+
+    Returns:
+        {percorso del file: aggregati}
     """
     percorso_base = Path(cartella_dati)
+    percorso_cache = percorso_base / _CACHE_FILE_NAME
+    cache = leggi_cache(percorso_cache) if usa_cache else {}
+
+    percorsi = list(percorso_base.rglob(nome_file)) + list(percorso_base.rglob(nome_file + ".gz"))
+    voci = {}
+    da_elaborare = []
+    for percorso_file in percorsi:
+        chiave = percorso_file.relative_to(percorso_base).as_posix()
+        stato = percorso_file.stat()
+        voce = cache.get(chiave)
+        if voce and voce["mtime"] == stato.st_mtime_ns and voce["size"] == stato.st_size:
+            voci[chiave] = voce
+        else:
+            da_elaborare.append((chiave, percorso_file, stato))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if da_elaborare:
+        print(f"File da elaborare: {len(da_elaborare)} (in cache: {len(voci)})")
+    if max_workers <= 1 or len(da_elaborare) <= 1:
+        risultati = [_aggrega_sicuro(p) for _, p, _ in da_elaborare]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(da_elaborare)),
+            initializer=Settings.Apply,
+            initargs=(Settings.Snapshot(),),
+        ) as pool:
+            risultati = list(pool.map(_aggrega_sicuro, [p for _, p, _ in da_elaborare]))
+
+    for (chiave, percorso_file, stato), (aggregati, errore) in zip(da_elaborare, risultati):
+        if errore is not None:
+            print(f"Errore leggendo {percorso_file}: {errore}")
+            continue
+        voci[chiave] = {"mtime": stato.st_mtime_ns, "size": stato.st_size, "aggregati": aggregati}
+
+    # I file rimossi spariscono anche dall'indice
+    if usa_cache and (da_elaborare or voci.keys() != cache.keys()):
+        scrivi_cache(percorso_cache, voci)
+
+    # Stesso ordine della ricerca dei file, in cache o no
+    chiavi = [p.relative_to(percorso_base).as_posix() for p in percorsi]
+    return {percorso_base / chiave: voci[chiave]["aggregati"] for chiave in chiavi if chiave in voci}
+
+
+def _aggrega_sicuro(path_file):
+    """(aggregati, None) oppure (None, errore): un file illeggibile non ferma il pool."""
+    try:
+        return aggrega_file(path_file), None
+    except Exception as e:
+        return None, str(e)
+
+
+def crea_scenari_per_tabella(cartella_dati=_DATA_PATH, nome_file=_SCHEDULING_FILE_NAME,
+                             max_workers=None, usa_cache=True):
+    """
+    Legge gli aggregati dei file base e 'rot' per ogni seed, li ordina numericamente
+    e crea il dizionario 'scenari' pronto per MostraTabellaConfrontoPlotly.
+    """
     dati_grezzi = {}
-    
-    for percorso_file in percorso_base.rglob(nome_file):
-        try:
-            pazienti_obj = carica_dati_da_json(percorso_file)
-            is_rot = (percorso_file.parent.name == _ROT_FOLDER.strip("./"))
-            nome_seed = percorso_file.parent.parent.name if is_rot else percorso_file.parent.name
-            
-            if nome_seed not in dati_grezzi:
-                dati_grezzi[nome_seed] = {}
-                
-            chiave_tipo = "rot" if is_rot else "base"
-            dati_grezzi[nome_seed][chiave_tipo] = pazienti_obj
-                
-        except Exception as e:
-            print(f"Errore leggendo {percorso_file}: {e}")
+
+    aggregati_file = aggrega_scenari(cartella_dati, nome_file, max_workers, usa_cache)
+    for percorso_file, aggregati in aggregati_file.items():
+        is_rot = (percorso_file.parent.name == _ROT_FOLDER.strip("./"))
+        nome_seed = percorso_file.parent.parent.name if is_rot else percorso_file.parent.name
+
+        if nome_seed not in dati_grezzi:
+            dati_grezzi[nome_seed] = {}
+
+        chiave_tipo = "rot" if is_rot else "base"
+        dati_grezzi[nome_seed][chiave_tipo] = aggregati
 
     # Funzione di supporto per estrarre il numero dal nome del seed (es. "seed-1" -> 1)
     # Serve per ordinare correttamente (1, 2, 3... 10) invece di (1, 10, 2, 3)
@@ -55,24 +160,30 @@ def crea_scenari_per_tabella(cartella_dati=_DATA_PATH, nome_file=_SCHEDULING_FIL
     seed_ordinati = sorted(dati_grezzi.keys(), key=estrai_numero_seed)
 
     scenari = {}
-    
+
     for seed in seed_ordinati:
         if "base" in dati_grezzi[seed]:
             scenari[f"{seed}"] = dati_grezzi[seed]["base"]
-            
+
         if "rot" in dati_grezzi[seed]:
             scenari[f"{seed} Rot"] = dati_grezzi[seed]["rot"]
 
     return scenari
 
-def Genera_tabelle(cartella_dati=_DATA_PATH, nome_file=_SCHEDULING_FILE_NAME):
-    scenari = crea_scenari_per_tabella(cartella_dati, nome_file)
+def Genera_tabelle(cartella_dati=_DATA_PATH, nome_file=_SCHEDULING_FILE_NAME,
+                   max_workers=None, usa_cache=True):
+    scenari = crea_scenari_per_tabella(cartella_dati, nome_file, max_workers, usa_cache)
     cartella_output = Path(cartella_dati) / "tabelle"
     cartella_output.mkdir(parents=True, exist_ok=True)
-    
+
     graph = Graphs(str(cartella_output))
     graph.MostraTabellaConfrontoPlotly(scenari)
 
 if __name__ == "__main__":
-    Genera_tabelle(_DATA_PATH, _SCHEDULING_FILE_NAME)
-    
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Tabella di confronto degli scenari")
+    parser.add_argument("--cartella", default=str(_DATA_PATH), help="Cartella con i risultati dei seed")
+    parser.add_argument("--processi", type=int, default=None, help="Processi per leggere i file (default: tutti i core)")
+    parser.add_argument("--senza-cache", action="store_true", help="Rielabora tutti i file ignorando la cache")
+    args = parser.parse_args()
+
+    Genera_tabelle(args.cartella, _SCHEDULING_FILE_NAME, args.processi, not args.senza_cache)
@@ -0,0 +1,100 @@
+"""
+Tempo di caricamento di weekly_schedule.json per seed con i diversi codec.
+
+Confronta, sugli stessi file:
+- riferimento: json.load + PatientListForSpecialties.from_dict (come in
+  origine in Genera_Tabelle.carica_dati_da_json)
+- streaming: PatientListForSpecialties.load
+- ogni codec installato di CommonClass.JsonCodec (msgspec, orjson, json),
+  con risultato a liste di Patient e colonnare (PatientTable)
+
+I file sono quelli trovati sotto --cartella (come crea_scenari_per_tabella)
+oppure, se non indicata, --seed schedule sintetici generati al momento.
+
+Uso:
+    python Utility/benchmark_codec.py --seed 20 --pazienti 5000
+    python Utility/benchmark_codec.py --cartella Data
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CODE_DIR = Path(__file__).resolve().parent.parent / "Code"
+if str(CODE_DIR) not in sys.path:
+    sys.path.append(str(CODE_DIR))
+
+from CommonClass.JsonCodec import JSON_CODECS, available_codecs, load_schedule
+from CommonClass.JsonStream import write_json
+from CommonClass.Patient import Patient
+from CommonClass.PatientListForSpecialties import PatientListForSpecialties
+
+_NOME_FILE = "weekly_schedule.json"
+
+
+def genera_file(cartella, seed, pazienti):
+    """Schedule sintetico di ``pazienti`` pazienti per specialità."""
+    rng = random.Random(seed)
+    schedule = PatientListForSpecialties()
+    for specialita in schedule:
+        schedule[specialita] = [
+            Patient(
+                id=pid,
+                eot=round(rng.uniform(20, 200), 2),
+                day=rng.randrange(260),
+                mtb=rng.choice([3, 15, 30, 60]),
+                rot=round(rng.uniform(20, 250), 2),
+                opDay=rng.randrange(5, 265),
+                workstation=rng.randint(1, 3),
+            )
+            for pid in range(pazienti)
+        ]
+    percorso = Path(cartella) / f"seed-{seed}" / _NOME_FILE
+    percorso.parent.mkdir(parents=True)
+    write_json(schedule, str(percorso))
+    return percorso
+
+
+def riferimento(percorso):
+    with open(percorso, encoding="utf-8") as f:
+        return PatientListForSpecialties.from_dict(json.load(f))
+
+
+def tempo_medio(caricatore, percorsi):
+    inizio = time.perf_counter()
+    for percorso in percorsi:
+        caricatore(percorso)
+    return (time.perf_counter() - inizio) / len(percorsi)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dei codec JSON")
+    parser.add_argument("--cartella", default=None, help="Cartella con i risultati dei seed")
+    parser.add_argument("--seed", type=int, default=10, help="Seed sintetici da generare")
+    parser.add_argument("--pazienti", type=int, default=5000, help="Pazienti per specialità")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporanea:
+        if args.cartella:
+            percorsi = sorted(Path(args.cartella).rglob(_NOME_FILE))
+        else:
+            percorsi = [genera_file(temporanea, seed, args.pazienti) for seed in range(1, args.seed + 1)]
+        if not percorsi:
+            sys.exit(f"Nessun {_NOME_FILE} trovato")
+
+        disponibili = available_codecs()
+        print(f"File: {len(percorsi)}, codec installati: {', '.join(disponibili)}")
+        print(f"{'riferimento':<22} {tempo_medio(riferimento, percorsi) * 1000:9.1f} ms/seed")
+        print(f"{'streaming':<22} {tempo_medio(PatientListForSpecialties.load, percorsi) * 1000:9.1f} ms/seed")
+        for codec in JSON_CODECS:
+            if codec not in disponibili:
+                print(f"{codec:<22} non installato")
+                continue
+            for colonnare in (False, True):
+                nome = f"{codec}{' colonnare' if colonnare else ''}"
+                tempo = tempo_medio(lambda p: load_schedule(p, colonnare, codec), percorsi)
+                print(f"{nome:<22} {tempo * 1000:9.1f} ms/seed")
@@ -0,0 +1,120 @@
+"""
+Spazio su disco e tempo di scrittura dei grafici di un seed, HTML contro dashboard.
+
+Per ciascuna modalità di Settings.graph_output genera, per ``--seed``
+seed sintetici, i grafici di MakeGraphs di due scenari e la tabella di
+confronto, come main.py:
+- html     : un HTML autonomo per figura, ognuno con plotly.js incorporato
+- dashboard: un JSON compatto per figura e il manifest del seed; alla
+             fine una sola copia di plotly.js e index.html nella radice
+Riporta tempo e dimensione medi per seed e, per la dashboard, il costo
+una tantum di plotly.js e dell'indice. Con ``--processi`` i grafici di
+MakeGraphs sono generati in parallelo (Settings.graph_workers) e viene
+mostrato il grafico più lento.
+
+Uso:
+    python Utility/benchmark_dashboard.py --seed 3 --settimane 8 --pazienti 60
+    python Utility/benchmark_dashboard.py --processi 4
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CODE_DIR = Path(__file__).resolve().parent.parent / "Code"
+if str(CODE_DIR) not in sys.path:
+    sys.path.append(str(CODE_DIR))
+
+from settings import Settings
+from CommonClass.Patient import Patient
+from CommonClass.PatientListForSpecialties import PatientListForSpecialties
+from Grafici.Dashboard import write_dashboard, write_seed_manifest
+from Grafici.Graph import Graphs
+
+
+def genera_schedule(settimane, pazienti, seed):
+    """``pazienti`` pazienti a settimana per specialità, su giorni e sale casuali."""
+    rng = random.Random(seed)
+    giorni = settimane * Settings.week_length_days
+    schedule = PatientListForSpecialties()
+    pid = 0
+    for specialita, sale in Settings.workstations_config.items():
+        lista = []
+        for _ in range(settimane * pazienti):
+            op_day = rng.randrange(giorni)
+            lista.append(Patient(
+                id=pid,
+                eot=round(rng.uniform(20, 200), 2),
+                day=max(0, op_day - rng.randrange(30)),
+                mtb=rng.choice([3, 15, 30, 60]),
+                rot=round(rng.uniform(20, 250), 2),
+                opDay=op_day,
+                workstation=rng.randint(1, sale),
+            ))
+            pid += 1
+        schedule[specialita] = lista
+    return schedule
+
+
+def dimensione(cartella):
+    return sum(f.stat().st_size for f in Path(cartella).rglob("*") if f.is_file())
+
+
+def genera_seed(radice, seed, schedule):
+    """Grafici di un seed come in main.py; restituisce la cartella del seed e i tempi per figura."""
+    cartella = os.path.join(radice, f"seed-{seed}")
+    grafici = {
+        "Stimato + Ripianificato": Graphs(os.path.join(cartella, "Images")),
+        "PostSchedulato": Graphs(os.path.join(cartella, "rot_cplex", "Images")),
+        "Confronto scenari": Graphs(cartella),
+    }
+    grafici["Stimato + Ripianificato"].MakeGraphs(schedule)
+    grafici["PostSchedulato"].MakeGraphs(schedule, use_rot_as_primary=True)
+    grafici["Confronto scenari"].MostraTabellaConfrontoPlotly(
+        {"Stimato + Ripianificato": schedule, "PostSchedulato": schedule}
+    )
+    if Settings.graph_output == "dashboard":
+        write_seed_manifest(cartella, seed, {nome: g.figures for nome, g in grafici.items()})
+    return cartella, grafici["Stimato + Ripianificato"].timings + grafici["PostSchedulato"].timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dell'uscita dei grafici")
+    parser.add_argument("--seed", type=int, default=3, help="Numero di seed")
+    parser.add_argument("--settimane", type=int, default=8)
+    parser.add_argument("--pazienti", type=int, default=60, help="Pazienti a settimana per specialità")
+    parser.add_argument("--processi", type=int, default=1, help="Processi per MakeGraphs (1 = in serie)")
+    args = parser.parse_args()
+    Settings.graph_workers = args.processi
+
+    schedules = {seed: genera_schedule(args.settimane, args.pazienti, seed) for seed in range(1, args.seed + 1)}
+
+    with tempfile.TemporaryDirectory() as temporanea:
+        for modo in ("html", "dashboard"):
+            Settings.graph_output = modo
+            radice = os.path.join(temporanea, modo)
+            tempi, dimensioni, tempi_figure = [], [], []
+            for seed, schedule in schedules.items():
+                inizio = time.perf_counter()
+                cartella, timings = genera_seed(radice, seed, schedule)
+                tempi.append(time.perf_counter() - inizio)
+                dimensioni.append(dimensione(cartella))
+                tempi_figure.extend(timings)
+
+            riga = (
+                f"{modo:<10} per seed: tempo={sum(tempi) / len(tempi):6.2f}s "
+                f"disco={sum(dimensioni) / len(dimensioni) / 2**20:7.2f} MiB"
+            )
+            if modo == "dashboard":
+                inizio = time.perf_counter()
+                write_dashboard(radice)
+                tempo_indice = time.perf_counter() - inizio
+                comune = dimensione(radice) - sum(dimensioni)
+                riga += f" | una tantum (plotly.js + index.html): {tempo_indice:.2f}s, {comune / 2**20:.2f} MiB"
+            print(riga)
+            lenta = max(tempi_figure, key=lambda t: t["seconds"])
+            print(f"{'':<10} figura più lenta: {lenta['chart']} {lenta['specialty']} {lenta['seconds']:.2f}s")
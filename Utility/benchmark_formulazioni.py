@@ -0,0 +1,141 @@
+"""
+Confronto delle formulazioni del modello settimanale (Settings.eot_formulation)
+al crescere del numero di sale operatorie.
+
+Per ogni numero di sale (default 2..10) genera una coda settimanale con un
+carico EOT pari a ``--carico`` volte la capacità della settimana, poi risolve:
+- il modello EOT settimanale (plan_week_eot)
+- il modello di riallocazione ROT con overtime (reallocate_week_with_rot_overtime)
+con le formulazioni "room", "symmetry" e "aggregated", riportando tempi e
+numero di pazienti pianificati (la qualità deve coincidere tra formulazioni).
+
+Uso:
+    python Utility/benchmark_formulazioni.py --sale 2-10 --time-limit 60
+"""
+
+import argparse
+import copy
+import csv
+import sys
+import time
+from pathlib import Path
+
+CODE_DIR = Path(__file__).resolve().parent.parent / "Code"
+if str(CODE_DIR) not in sys.path:
+    sys.path.append(str(CODE_DIR))
+
+from settings import Settings
+from CommonClass.Patient import Patient
+from RecordGeneration.PatientRecordGenerator import generate_patient_table
+from Simulatore.Optimizer import (
+    EOT_FORMULATIONS,
+    plan_week_eot,
+    reallocate_week_with_rot_overtime,
+)
+
+_SPECIALITA = "Specialty A"
+_CAMPI = [
+    "sale",
+    "formulazione",
+    "pazienti",
+    "eot_tempo_s",
+    "eot_pianificati",
+    "rot_tempo_s",
+    "rot_pianificati",
+]
+
+
+def genera_coda_settimanale(sale, carico, seed):
+    """Estrae pazienti finché l'EOT totale non supera carico x capacità settimanale."""
+    capacita = sale * Settings.daily_operation_limit * Settings.week_length_days
+    tabella, _ = generate_patient_table(
+        [_SPECIALITA],
+        80,
+        40,
+        seed,
+        Settings.specialty_params,
+        "normal",
+        Settings.priority_params,
+    )
+
+    # I pazienti arrivano tutti nella settimana precedente a quella pianificata
+    pazienti = []
+    totale = 0.0
+    for i in range(len(tabella["id"])):
+        if totale >= carico * capacita:
+            break
+        pazienti.append(
+            Patient(
+                id=int(tabella["id"][i]),
+                eot=float(tabella["eot"][i]),
+                day=int(tabella["day"][i]) % Settings.week_length_days,
+                mtb=int(tabella["mtb"][i]),
+                rot=float(tabella["rot"][i]),
+            )
+        )
+        totale += pazienti[-1].eot
+    return pazienti
+
+
+def misura(sale, formulazione, pazienti):
+    Settings.workstations_config = {_SPECIALITA: sale}
+    Settings.eot_formulation = formulazione
+    inizio_settimana = Settings.week_length_days
+
+    inizio = time.perf_counter()
+    pianificati = plan_week_eot(copy.deepcopy(pazienti), _SPECIALITA, inizio_settimana)
+    tempo_eot = time.perf_counter() - inizio
+
+    inizio = time.perf_counter()
+    riallocati, _ = reallocate_week_with_rot_overtime(
+        copy.deepcopy(pianificati), _SPECIALITA, inizio_settimana
+    )
+    tempo_rot = time.perf_counter() - inizio
+
+    return {
+        "sale": sale,
+        "formulazione": formulazione,
+        "pazienti": len(pazienti),
+        "eot_tempo_s": round(tempo_eot, 3),
+        "eot_pianificati": len(pianificati),
+        "rot_tempo_s": round(tempo_rot, 3),
+        "rot_pianificati": len(riallocati),
+    }
+
+
+def _intervallo(testo):
+    primo, _, ultimo = testo.partition("-")
+    return range(int(primo), int(ultimo or primo) + 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark delle formulazioni EOT/ROT")
+    parser.add_argument("--sale", default="2-10", help='Numero di sale, es. "2-10"')
+    parser.add_argument("--carico", type=float, default=1.2, help="EOT in coda / capacità")
+    parser.add_argument("--seed", type=int, default=Settings.seed)
+    parser.add_argument("--time-limit", type=float, default=Settings.solver_time_limit)
+    parser.add_argument("--output", default=None, help="File CSV dei risultati")
+    args = parser.parse_args()
+
+    Settings.solver_time_limit = args.time_limit
+    Settings.eot_warm_start = None
+
+    risultati = []
+    for sale in _intervallo(args.sale):
+        pazienti = genera_coda_settimanale(sale, args.carico, args.seed)
+        for formulazione in EOT_FORMULATIONS:
+            riga = misura(sale, formulazione, pazienti)
+            risultati.append(riga)
+            print(
+                f"sale={riga['sale']:2d} {riga['formulazione']:<10} "
+                f"pazienti={riga['pazienti']:4d} | "
+                f"EOT {riga['eot_tempo_s']:8.3f}s pianificati={riga['eot_pianificati']:4d} | "
+                f"ROT {riga['rot_tempo_s']:8.3f}s pianificati={riga['rot_pianificati']:4d}"
+            )
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=_CAMPI)
+            writer.writeheader()
+            writer.writerows(risultati)
+        print(f"Risultati salvati in {args.output}")
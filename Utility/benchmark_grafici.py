@@ -0,0 +1,93 @@
+"""
+Tempo di costruzione e dimensione dell'HTML di PrintDailyBoxGraph.
+
+Confronta le due rese di Settings.daily_box_graph_mode sugli stessi
+pazienti sintetici:
+- per_patient: due go.Bar per paziente (resa originale)
+- aggregated : due tracce ad array per settimana, figura come dict
+Per ciascuna riporta numero di tracce, tempo di costruzione della figura,
+tempo di scrittura dell'HTML e dimensione del file (totale e senza la
+libreria plotly.js incorporata).
+
+Uso:
+    python Utility/benchmark_grafici.py --settimane 15 --pazienti 250
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CODE_DIR = Path(__file__).resolve().parent.parent / "Code"
+if str(CODE_DIR) not in sys.path:
+    sys.path.append(str(CODE_DIR))
+
+from plotly.offline import get_plotlyjs
+
+from settings import Settings
+from CommonClass.Patient import Patient
+from CommonClass.PatientListForSpecialties import PatientListForSpecialties
+from Grafici.Graph import Graphs
+
+_SPECIALITA = "Specialty A"
+
+
+class GraphsMisurati(Graphs):
+    """Misura a parte costruzione della figura e scrittura dell'HTML."""
+
+    def _show_figure(self, fig, name="grafico"):
+        self.fine_costruzione = time.perf_counter()
+        self.tracce = len(fig["data"] if isinstance(fig, dict) else fig.data)
+        super()._show_figure(fig, name)
+        self.percorso = os.path.join(self.folderPath, f"{name}.html")
+
+
+def genera_pazienti(settimane, pazienti, seed):
+    """``pazienti`` pazienti a settimana distribuiti su giorni e sale."""
+    rng = random.Random(seed)
+    sale = Settings.workstations_config[_SPECIALITA]
+    giorni = settimane * Settings.week_length_days
+    return [
+        Patient(
+            id=pid,
+            eot=round(rng.uniform(20, 200), 2),
+            day=max(0, (op_day := rng.randrange(giorni)) - rng.randrange(30)),
+            mtb=rng.choice([3, 15, 30, 60]),
+            rot=round(rng.uniform(20, 250), 2),
+            opDay=op_day,
+            workstation=rng.randint(1, sale),
+        )
+        for pid in range(settimane * pazienti)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark di PrintDailyBoxGraph")
+    parser.add_argument("--settimane", type=int, default=15)
+    parser.add_argument("--pazienti", type=int, default=250, help="Pazienti a settimana")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    schedule = PatientListForSpecialties()
+    schedule[_SPECIALITA] = genera_pazienti(args.settimane, args.pazienti, args.seed)
+    plotlyjs = len(get_plotlyjs().encode("utf-8"))
+    print(f"Pazienti: {len(schedule[_SPECIALITA])}, settimane: {args.settimane}")
+
+    with tempfile.TemporaryDirectory() as cartella:
+        for modo in ("per_patient", "aggregated"):
+            Settings.daily_box_graph_mode = modo
+            graph = GraphsMisurati(os.path.join(cartella, modo))
+            inizio = time.perf_counter()
+            graph.PrintDailyBoxGraph(schedule, "Benchmark ")
+            fine = time.perf_counter()
+            dimensione = os.path.getsize(graph.percorso)
+            print(
+                f"{modo:<12} tracce={graph.tracce:6d} "
+                f"costruzione={graph.fine_costruzione - inizio:7.2f}s "
+                f"scrittura={fine - graph.fine_costruzione:6.2f}s "
+                f"html={dimensione / 2**20:7.2f} MiB "
+                f"(senza plotly.js {(dimensione - plotlyjs) / 2**20:7.2f} MiB)"
+            )
@@ -0,0 +1,147 @@
+"""
+Dimensione dei modelli settimanali con indici sparsi (scadenze MTB).
+
+Confronta, al variare della quota di pazienti con scadenza (day + mtb)
+interna alla settimana:
+- modello ROT: versione densa originale (tutte le x[i,t,k] più i vincoli
+  x == 0 oltre la scadenza) contro build_rot_overtime_model, che crea le
+  variabili solo per le terne ammissibili
+- modello EOT: PyomoModel_0 senza e con Settings.eot_deadline_window
+
+Per ogni caso riporta variabili, vincoli, dimensione del file LP e tempo di
+costruzione. Non serve alcun solver.
+
+Uso:
+    python Utility/benchmark_indici_sparsi.py --sale 4 --pazienti 300
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pyomo.environ as pyo
+
+CODE_DIR = Path(__file__).resolve().parent.parent / "Code"
+if str(CODE_DIR) not in sys.path:
+    sys.path.append(str(CODE_DIR))
+
+from settings import Settings
+from CommonClass.Patient import Patient
+from Simulatore.Optimizer import PyomoModel_0, build_rot_overtime_model
+
+_QUOTE = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+
+# region Modello ROT denso di riferimento (versione originale)
+def modello_rot_denso(patients_sorted, operating_rooms, week_start_day):
+    model = pyo.ConcreteModel()
+    model.I = pyo.Set(initialize=range(len(patients_sorted)))
+    model.T = pyo.Set(
+        initialize=range(week_start_day, week_start_day + Settings.week_length_days)
+    )
+    model.K = pyo.Set(initialize=range(1, operating_rooms + 1))
+    model.rot = pyo.Param(model.I, initialize={i: patients_sorted[i].rot for i in model.I})
+    model.mtb = pyo.Param(model.I, initialize={i: patients_sorted[i].mtb for i in model.I})
+    model.day = pyo.Param(model.I, initialize={i: patients_sorted[i].day for i in model.I})
+    model.x = pyo.Var(model.I, model.T, model.K, domain=pyo.Binary)
+    model.overtime = pyo.Var(model.T, model.K, domain=pyo.NonNegativeReals)
+
+    def hard_deadline_rule(model, i, t, k):
+        if t > model.day[i] + model.mtb[i]:
+            return model.x[i, t, k] == 0
+        return pyo.Constraint.Skip
+
+    model.deadline = pyo.Constraint(model.I, model.T, model.K, rule=hard_deadline_rule)
+    model.patient_once = pyo.Constraint(
+        model.I,
+        rule=lambda m, i: sum(m.x[i, t, k] for t in m.T for k in m.K) <= 1,
+    )
+    model.capacity = pyo.Constraint(
+        model.T,
+        model.K,
+        rule=lambda m, t, k: sum(m.rot[i] * m.x[i, t, k] for i in m.I)
+        <= Settings.daily_operation_limit + m.overtime[t, k],
+    )
+    model.overtime_pool = pyo.Constraint(
+        expr=sum(model.overtime[t, k] for t in model.T for k in model.K)
+        <= Settings.weekly_extra_time_pool
+    )
+    model.obj = pyo.Objective(
+        expr=sum(
+            (100000 + (1000 - t)) * model.x[i, t, k]
+            for i in model.I
+            for t in model.T
+            for k in model.K
+        ),
+        sense=pyo.maximize,
+    )
+    return model
+# endregion
+
+
+def genera_coda(pazienti, quota, inizio_settimana, seed):
+    """Coda settimanale in cui ``quota`` dei pazienti scade dentro la settimana."""
+    rng = random.Random(seed)
+    coda = []
+    for pid in range(pazienti):
+        day = rng.randrange(inizio_settimana)
+        if rng.random() < quota:
+            scadenza = inizio_settimana + rng.randrange(Settings.week_length_days)
+        else:
+            scadenza = inizio_settimana + Settings.week_length_days + rng.randrange(30)
+        eot = round(rng.uniform(20, 200), 2)
+        coda.append(
+            Patient(id=pid, eot=eot, day=day, mtb=scadenza - day,
+                    rot=round(eot * rng.uniform(0.8, 1.3), 2))
+        )
+    return coda
+
+
+def misura(costruttore):
+    inizio = time.perf_counter()
+    model = costruttore()
+    tempo = time.perf_counter() - inizio
+
+    with tempfile.TemporaryDirectory() as cartella:
+        lp = os.path.join(cartella, "model.lp")
+        model.write(lp, io_options={"symbolic_solver_labels": False})
+        dimensione = os.path.getsize(lp)
+
+    variabili = sum(1 for _ in model.component_data_objects(pyo.Var, active=True))
+    vincoli = sum(1 for _ in model.component_data_objects(pyo.Constraint, active=True))
+    return variabili, vincoli, dimensione, tempo
+
+
+def stampa(modello, quota, variabili, vincoli, dimensione, tempo):
+    print(
+        f"{modello:<14} quota={quota:4.2f} | variabili={variabili:7d} "
+        f"vincoli={vincoli:7d} LP={dimensione / 1024:9.1f} KiB costruzione={tempo:7.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark degli indici sparsi")
+    parser.add_argument("--sale", type=int, default=4)
+    parser.add_argument("--pazienti", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=Settings.seed)
+    args = parser.parse_args()
+
+    inizio_settimana = 2 * Settings.week_length_days
+    for quota in _QUOTE:
+        coda = genera_coda(args.pazienti, quota, inizio_settimana, args.seed)
+        ordinati = sorted(coda, key=lambda p: p.id)
+
+        stampa("ROT denso", quota, *misura(
+            lambda: modello_rot_denso(ordinati, args.sale, inizio_settimana)))
+        stampa("ROT sparso", quota, *misura(
+            lambda: build_rot_overtime_model(ordinati, args.sale, inizio_settimana)))
+
+        for finestra in (False, True):
+            Settings.eot_deadline_window = finestra
+            stampa("EOT finestra" if finestra else "EOT completo", quota, *misura(
+                lambda: PyomoModel_0(coda, args.sale, inizio_settimana)))
+        print()
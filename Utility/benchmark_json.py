@@ -0,0 +1,107 @@
+"""
+Dimensione e tempi di scrittura/lettura dei file JSON dei risultati.
+
+Genera uno schedule con il flusso EOT/ROT (pianificatore euristico, nessun
+solver richiesto) e scrive weekly_schedule.json ed extra_time.json in tre
+modi:
+- riferimento: json.dump(schedule.to_dict(), indent=4), come in origine
+- write_json con indent=4 (stesso file del riferimento), compatto e gzip
+Per ciascuno riporta dimensione del file, tempo di scrittura, picco di
+memoria allocata (tracemalloc) e tempo di rilettura dello schedule.
+
+Uso:
+    python Utility/benchmark_json.py --settimane 52
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+CODE_DIR = Path(__file__).resolve().parent.parent / "Code"
+if str(CODE_DIR) not in sys.path:
+    sys.path.append(str(CODE_DIR))
+
+from settings import Settings
+from CommonClass.JsonStream import open_json, write_json
+from CommonClass.PatientListForSpecialties import PatientListForSpecialties
+from RecordGeneration.PatientRecordGenerator import generate_csv
+from Simulatore.Simulation import (
+    group_daily_with_mtb_logic_optimized_rot,
+    read_and_split_by_operation_with_metadata,
+)
+
+
+def genera_schedule(seed, cartella):
+    paths = generate_csv(
+        specialties=list(Settings.workstations_config.keys()),
+        weekly_hours=Settings.week_hours_to_fill,
+        num_weeks=Settings.weeks_to_fill,
+        seed=seed,
+        specialty_params=Settings.specialty_params,
+        people_distribution=Settings.daily_patient_arrival_distribution,
+        priority_params=Settings.priority_params,
+        filepath=cartella,
+    )
+    cartella_seed = os.path.dirname(os.path.abspath(paths[0]))
+    record = read_and_split_by_operation_with_metadata(paths[0])
+    schedule = group_daily_with_mtb_logic_optimized_rot(record, cartella_seed)
+    with open_json(os.path.join(cartella_seed, "extra_time.json")) as f:
+        extra = json.load(f)
+    return schedule, extra
+
+
+def scrivi_riferimento(valore, percorso):
+    with open(percorso, "w", encoding="utf-8") as f:
+        json.dump(valore.to_dict() if hasattr(valore, "to_dict") else valore, f, indent=4)
+
+
+def misura(scrittura):
+    """Tempo (senza tracemalloc, che rallenta) e picco di memoria allocata."""
+    inizio = time.perf_counter()
+    scrittura()
+    tempo = time.perf_counter() - inizio
+    tracemalloc.start()
+    scrittura()
+    picco = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return tempo, picco
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dei file JSON dei risultati")
+    parser.add_argument("--settimane", type=int, default=52)
+    parser.add_argument("--seed", type=int, default=Settings.seed)
+    args = parser.parse_args()
+
+    Settings.weeks_to_fill = args.settimane
+    Settings.eot_planner = "heuristic"
+
+    with tempfile.TemporaryDirectory() as cartella:
+        schedule, extra = genera_schedule(args.seed, cartella + "/")
+
+        modi = {
+            "riferimento": ("weekly_schedule.json", lambda v, p: scrivi_riferimento(v, p)),
+            "indent=4": ("weekly_schedule.json", lambda v, p: write_json(v, p, 4)),
+            "compatto": ("weekly_schedule.json", lambda v, p: write_json(v, p, None)),
+            "gzip": ("weekly_schedule.json.gz", lambda v, p: write_json(v, p, None)),
+        }
+        for file, valore in (("schedule", schedule), ("extra_time", extra)):
+            for modo, (nome, scrivi) in modi.items():
+                percorso = os.path.join(cartella, f"{modo}-{file}-{nome}")
+                tempo, picco = misura(lambda: scrivi(valore, percorso))
+                riga = (f"{file:<11} {modo:<12} dimensione={os.path.getsize(percorso) / 2**20:8.2f} MiB "
+                        f"scrittura={tempo:7.3f}s picco={picco:8.2f} MiB")
+                if file == "schedule":
+                    inizio = time.perf_counter()
+                    if modo == "riferimento":
+                        with open(percorso, encoding="utf-8") as f:
+                            PatientListForSpecialties.from_dict(json.load(f))
+                    else:
+                        PatientListForSpecialties.load(percorso)
+                    riga += f" lettura={time.perf_counter() - inizio:7.3f}s"
+                print(riga)
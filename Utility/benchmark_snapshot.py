@@ -0,0 +1,113 @@
+"""
+Memoria e tempi delle copie dello schedule nell'intera pipeline.
+
+Esegue generazione dei record, flusso EOT/ROT
+(group_daily_with_mtb_logic_optimized_rot), CreateScheduleWithReplanned e
+riallocazione ROT (rebuild_schedule_using_rot_cplex) su un orizzonte lungo
+con tre specialità, e riporta per ogni fase il tempo e il picco di
+memoria allocata (tracemalloc), più il picco RSS del processo.
+
+Per il confronto prima/dopo va eseguito su entrambe le versioni del codice
+con gli stessi argomenti.
+
+Uso:
+    python Utility/benchmark_snapshot.py --settimane 52 --pianificatore heuristic --limite-solver 5
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+CODE_DIR = Path(__file__).resolve().parent.parent / "Code"
+if str(CODE_DIR) not in sys.path:
+    sys.path.append(str(CODE_DIR))
+
+from settings import Settings
+from Grafici.Graph import CreateScheduleWithReplanned
+from RecordGeneration.PatientRecordGenerator import generate_csv
+from Simulatore.Simulation import (
+    group_daily_with_mtb_logic_optimized_rot,
+    read_and_split_by_operation_with_metadata,
+    rebuild_schedule_using_rot_cplex,
+)
+
+_SALE = {"Specialty A": 2, "Specialty B": 3, "Specialty C": 1}
+
+
+def fase(nome, funzione, tempi):
+    """Esegue una fase registrandone tempo e picco di memoria allocata."""
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    inizio = time.perf_counter()
+    risultato = funzione()
+    tempi.append((nome, time.perf_counter() - inizio,
+                  (tracemalloc.get_traced_memory()[1] - base) / 2**20))
+    return risultato
+
+
+def esegui(seed, cartella):
+    paths = generate_csv(
+        specialties=list(Settings.workstations_config.keys()),
+        weekly_hours=Settings.week_hours_to_fill,
+        num_weeks=Settings.weeks_to_fill,
+        seed=seed,
+        specialty_params=Settings.specialty_params,
+        people_distribution=Settings.daily_patient_arrival_distribution,
+        priority_params=Settings.priority_params,
+        filepath=cartella,
+    )
+    cartella_seed = os.path.dirname(os.path.abspath(paths[0]))
+    record = read_and_split_by_operation_with_metadata(paths[0])
+
+    tempi = []
+    schedule = fase("flusso EOT/ROT", lambda: group_daily_with_mtb_logic_optimized_rot(
+        record, cartella_seed), tempi)
+    with open(os.path.join(cartella_seed, "extra_time.json"), encoding="utf-8") as f:
+        plan_eot = json.load(f)["plan_eot"]
+    fase("ripianificato", lambda: CreateScheduleWithReplanned(schedule, plan_eot), tempi)
+    fase("riallocazione ROT", lambda: rebuild_schedule_using_rot_cplex(record), tempi)
+    pazienti = sum(len(pazienti) for pazienti in record.values())
+    return pazienti, tempi
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark delle copie dello schedule")
+    parser.add_argument("--settimane", type=int, default=52)
+    parser.add_argument("--pianificatore", default=Settings.eot_planner,
+                        help='Settings.eot_planner ("mip", "heuristic", "rolling")')
+    parser.add_argument("--arrivi", type=float, default=10,
+                        help="Media dei nuovi pazienti al giorno per specialità")
+    parser.add_argument("--limite-solver", type=float, default=Settings.solver_time_limit,
+                        help="Limite di tempo del solver per settimana (s)")
+    parser.add_argument("--seed", type=int, default=Settings.seed)
+    args = parser.parse_args()
+
+    Settings.weeks_to_fill = args.settimane
+    Settings.daily_patient_arrival_distribution_params = {
+        "normal": {"mean": args.arrivi, "std": args.arrivi / 4},
+        "poisson": {"mean": args.arrivi},
+    }
+    # Tutte le specialità; la C usa i parametri della B
+    Settings.workstations_config = dict(_SALE)
+    Settings.specialty_params["Specialty C"] = Settings.specialty_params["Specialty B"]
+    Settings.priority_params["Specialty C"] = Settings.priority_params["Specialty B"]
+    Settings.solver_time_limit = args.limite_solver
+    Settings.eot_planner = args.pianificatore
+
+    tracemalloc.start()
+    with tempfile.TemporaryDirectory() as cartella:
+        pazienti, tempi = esegui(args.seed, cartella + "/")
+    tracemalloc.stop()
+
+    print(f"Pazienti: {pazienti}, settimane: {args.settimane}, "
+          f"specialità: {len(Settings.workstations_config)}")
+    for nome, tempo, picco in tempi:
+        print(f"{nome:<18} tempo={tempo:8.3f}s picco allocato={picco:8.2f} MiB")
+    # ru_maxrss è in KiB su Linux
+    print(f"Picco RSS del processo: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
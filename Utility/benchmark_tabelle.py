@@ -0,0 +1,115 @@
+"""
+Tempo di generazione della tabella di confronto scenari con e senza cache.
+
+Crea --seed cartelle sintetiche (weekly_schedule.json base e rot_cplex)
+e misura:
+- riferimento: tutti i file letti come liste di Patient e passati a
+  MostraTabellaConfrontoPlotly (come in origine in Genera_Tabelle.py)
+- cache fredda: aggregati di tutti i file calcolati in parallelo e salvati
+- cache calda: nessun file cambiato
+- +1 seed: un seed aggiunto allo studio, solo i suoi file rielaborati
+Controlla anche che la figura ottenuta dagli aggregati in cache sia
+identica a quella ottenuta dai pazienti.
+
+Uso:
+    python Utility/benchmark_tabelle.py --seed 200 --pazienti 3000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CODE_DIR = Path(__file__).resolve().parent.parent / "Code"
+if str(CODE_DIR) not in sys.path:
+    sys.path.append(str(CODE_DIR))
+
+from CommonClass.JsonStream import write_json
+from CommonClass.Patient import Patient
+from CommonClass.PatientListForSpecialties import PatientListForSpecialties
+from Genera_Tabelle import _SCHEDULING_FILE_NAME, carica_dati_da_json, crea_scenari_per_tabella
+from Grafici.Graph import Graphs
+
+
+class GraphsInMemoria(Graphs):
+    """Tiene l'ultima figura invece di scriverla su disco."""
+
+    def _show_figure(self, fig, name="grafico"):
+        self.figura = fig
+
+
+def genera_seed(cartella, seed, pazienti):
+    """Schedule sintetici base e rot_cplex di un seed."""
+    rng = random.Random(seed)
+    for sottocartella in ("", "rot_cplex"):
+        schedule = PatientListForSpecialties()
+        for specialita in schedule:
+            schedule[specialita] = [
+                Patient(
+                    id=pid,
+                    eot=round(rng.uniform(20, 200), 2),
+                    day=(day := rng.randrange(260)),
+                    mtb=rng.choice([3, 15, 30, 60]),
+                    rot=round(rng.uniform(20, 250), 2),
+                    opDay=day + rng.randrange(1, 40),
+                    workstation=rng.randint(1, 3),
+                )
+                for pid in range(pazienti)
+            ]
+        percorso = Path(cartella) / f"seed-{seed}" / sottocartella / _SCHEDULING_FILE_NAME
+        percorso.parent.mkdir(parents=True, exist_ok=True)
+        write_json(schedule, str(percorso))
+
+
+def riferimento(cartella):
+    """Scenari con i pazienti di tutti i file, ordinati come in Genera_Tabelle."""
+    scenari = {}
+    for percorso in sorted(Path(cartella).rglob(_SCHEDULING_FILE_NAME)):
+        is_rot = percorso.parent.name == "rot_cplex"
+        seed = percorso.parent.parent.name if is_rot else percorso.parent.name
+        scenari[f"{seed} Rot" if is_rot else seed] = carica_dati_da_json(percorso)
+    return dict(sorted(scenari.items(), key=lambda kv: (int(kv[0].split()[0].split("-")[1]), kv[0])))
+
+
+def tabella(scenari):
+    graph = GraphsInMemoria(tempfile.gettempdir())
+    graph.MostraTabellaConfrontoPlotly(scenari)
+    return graph.figura
+
+
+def cronometra(funzione):
+    inizio = time.perf_counter()
+    risultato = funzione()
+    return risultato, time.perf_counter() - inizio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark della tabella di confronto scenari")
+    parser.add_argument("--seed", type=int, default=200, help="Seed dello studio")
+    parser.add_argument("--pazienti", type=int, default=3000, help="Pazienti per specialità")
+    parser.add_argument("--processi", type=int, default=None, help="Processi (default: tutti i core)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cartella:
+        for seed in range(1, args.seed + 1):
+            genera_seed(cartella, seed, args.pazienti)
+        print(f"Seed: {args.seed}, file: {2 * args.seed}")
+
+        figura_rif, tempo = cronometra(lambda: tabella(riferimento(cartella)))
+        print(f"{'riferimento':<14} {tempo:8.2f} s")
+
+        scenari, tempo = cronometra(lambda: crea_scenari_per_tabella(cartella, max_workers=args.processi))
+        _, tempo_tabella = cronometra(lambda: tabella(scenari))
+        print(f"{'cache fredda':<14} {tempo + tempo_tabella:8.2f} s")
+
+        scenari, tempo = cronometra(lambda: crea_scenari_per_tabella(cartella, max_workers=args.processi))
+        figura, tempo_tabella = cronometra(lambda: tabella(scenari))
+        print(f"{'cache calda':<14} {tempo + tempo_tabella:8.2f} s")
+        print(f"Figure identiche: {'sì' if figura.to_json() == figura_rif.to_json() else 'NO'}")
+
+        genera_seed(cartella, args.seed + 1, args.pazienti)
+        scenari, tempo = cronometra(lambda: crea_scenari_per_tabella(cartella, max_workers=args.processi))
+        _, tempo_tabella = cronometra(lambda: tabella(scenari))
+        print(f"{'+1 seed':<14} {tempo + tempo_tabella:8.2f} s")
@@ -0,0 +1,126 @@
+"""
+Confronto tra il pianificatore settimanale MIP e quello euristico
+(Settings.eot_planner = "mip" / "heuristic") sugli stessi seed.
+
+Per ogni seed e specialità esegue optimize_daily_batch_rot_both con i due
+pianificatori e riporta pazienti pianificati ed eseguiti, overtime usato
+(minuti del monte straordinario consumati) e tempo di calcolo.
+
+Uso:
+    python Utility/confronta_euristica.py --seeds 1-5
+"""
+
+import argparse
+import copy
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CODE_DIR = Path(__file__).resolve().parent.parent / "Code"
+if str(CODE_DIR) not in sys.path:
+    sys.path.append(str(CODE_DIR))
+
+from settings import Settings
+from RecordGeneration.PatientRecordGenerator import generate_csv
+from Simulatore.Optimizer import optimize_daily_batch_rot_both
+from Simulatore.Simulation import read_and_split_by_operation_with_metadata
+
+_PIANIFICATORI = ("mip", "heuristic")
+_CAMPI = [
+    "seed",
+    "specialita",
+    "pianificatore",
+    "pianificati",
+    "eseguiti",
+    "overtime_min",
+    "tempo_s",
+]
+
+
+def genera_record(seed, cartella):
+    paths = generate_csv(
+        specialties=list(Settings.workstations_config.keys()),
+        weekly_hours=Settings.week_hours_to_fill,
+        num_weeks=Settings.weeks_to_fill,
+        seed=seed,
+        specialty_params=Settings.specialty_params,
+        people_distribution=Settings.daily_patient_arrival_distribution,
+        priority_params=Settings.priority_params,
+        filepath=cartella,
+    )
+    return read_and_split_by_operation_with_metadata(paths[0])
+
+
+def esegui(pazienti, specialita, pianificatore):
+    Settings.eot_planner = pianificatore
+    inizio = time.perf_counter()
+    risultato = optimize_daily_batch_rot_both(copy.deepcopy(pazienti), specialita)[specialita]
+    tempo = time.perf_counter() - inizio
+
+    overtime = sum(
+        Settings.weekly_extra_time_pool - residuo
+        for residuo in risultato["extra_time_left"]
+    )
+    return {
+        "pianificati": sum(s["planned"] for s in risultato["weekly_summary"]),
+        "eseguiti": len(risultato["realized_rot"]),
+        "overtime_min": round(overtime, 3),
+        "tempo_s": round(tempo, 3),
+    }
+
+
+def _parse_seeds(testo):
+    seeds = []
+    for parte in testo.split(","):
+        primo, _, ultimo = parte.strip().partition("-")
+        seeds.extend(range(int(primo), int(ultimo or primo) + 1))
+    return seeds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Confronto MIP vs euristica settimanale")
+    parser.add_argument("--seeds", default="1-5", help='Seed, es. "1-5" o "1,4,9"')
+    parser.add_argument("--output", default=None, help="File CSV dei risultati")
+    args = parser.parse_args()
+
+    risultati = []
+    with tempfile.TemporaryDirectory() as cartella:
+        for seed in _parse_seeds(args.seeds):
+            record = genera_record(seed, cartella + "/")
+            for specialita, pazienti in record.items():
+                for pianificatore in _PIANIFICATORI:
+                    riga = {
+                        "seed": seed,
+                        "specialita": specialita,
+                        "pianificatore": pianificatore,
+                        **esegui(pazienti, specialita, pianificatore),
+                    }
+                    risultati.append(riga)
+
+    print(f"{'seed':>5} {'specialità':<14} {'pianificatore':<10} "
+          f"{'pianificati':>11} {'eseguiti':>9} {'overtime':>9} {'tempo_s':>9}")
+    for riga in risultati:
+        print(
+            f"{riga['seed']:>5} {riga['specialita']:<14} {riga['pianificatore']:<10} "
+            f"{riga['pianificati']:>11} {riga['eseguiti']:>9} "
+            f"{riga['overtime_min']:>9} {riga['tempo_s']:>9}"
+        )
+
+    # Totali per pianificatore
+    for pianificatore in _PIANIFICATORI:
+        righe = [r for r in risultati if r["pianificatore"] == pianificatore]
+        print(
+            f"TOTALE {pianificatore:<10} pianificati={sum(r['pianificati'] for r in righe)} "
+            f"eseguiti={sum(r['eseguiti'] for r in righe)} "
+            f"overtime={round(sum(r['overtime_min'] for r in righe), 3)} "
+            f"tempo={round(sum(r['tempo_s'] for r in righe), 3)}s"
+        )
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=_CAMPI)
+            writer.writeheader()
+            writer.writerows(risultati)
+        print(f"Risultati salvati in {args.output}")
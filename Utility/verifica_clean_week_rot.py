@@ -0,0 +1,252 @@
+"""
+Verifica di regressione di clean_week_with_rot (esecuzione ROT settimanale).
+
+Confronta l'implementazione corrente, basata su code per sala/giorno, con la
+versione originale a scansione di liste (riportata qui sotto come
+riferimento) sugli stessi input: pazienti eseguiti e in overflow (con il loro
+ordine), monte straordinario residuo e statistiche devono coincidere.
+
+Gli input sono le pianificazioni settimanali generate dai seed indicati
+(pianificatore euristico, nessun solver richiesto) più pianificazioni
+sovraccariche casuali, che esercitano il riordino ad ogni paziente.
+
+Uso:
+    python Utility/verifica_clean_week_rot.py --seeds 1-20
+"""
+
+import argparse
+import copy
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CODE_DIR = Path(__file__).resolve().parent.parent / "Code"
+if str(CODE_DIR) not in sys.path:
+    sys.path.append(str(CODE_DIR))
+
+from settings import Settings
+from CommonClass.Patient import Patient
+from RecordGeneration.PatientRecordGenerator import generate_csv
+from Simulatore.Optimizer import (
+    clean_week_with_rot,
+    overtime_with_rot,
+    plan_week_heuristic,
+    resequence_remaining_patients,
+)
+from Simulatore.Simulation import read_and_split_by_operation_with_metadata
+
+
+# region Implementazione di riferimento (versione originale)
+def clean_week_with_rot_riferimento(patients, specialty, week_start_day, extra_time_pool):
+    day_limit = Settings.daily_operation_limit
+    week_days = Settings.week_length_days
+    operating_rooms = Settings.workstations_config[specialty]
+
+    executed = []
+    overflow_to_next_week = []
+    remeaning_extra_time_pool = extra_time_pool
+
+    stats = {
+        "week_start_day": week_start_day,
+        "daily": {},
+        "shifted_within_week": 0,
+        "overflow_to_next_week": 0,
+    }
+
+    for today in range(week_start_day, week_start_day + week_days):
+        daily_patients = [p for p in patients if p.opDay == today]
+        not_executed_today = []
+
+        for room_index in range(operating_rooms):
+            room_patients = sorted(
+                [p for p in daily_patients if p.workstation == room_index + 1],
+                key=lambda p: p.id,
+            )
+            planned_order = [p.id for p in room_patients]
+
+            rot_sum = 0.0
+            remaining = room_patients[:]
+            executed_order = []
+            first_patient = True
+
+            while remaining:
+                remaining_capacity_eot = (
+                    day_limit + remeaning_extra_time_pool
+                ) - rot_sum
+                if remaining_capacity_eot <= 0:
+                    break
+
+                if first_patient:
+                    next_p = remaining[0]
+                    first_patient = False
+                else:
+                    resequenced = resequence_remaining_patients(
+                        candidates=remaining,
+                        today=today,
+                        remaining_capacity_eot=remaining_capacity_eot,
+                        week_start_day=week_start_day,
+                        week_days=week_days,
+                    )
+
+                    if not resequenced:
+                        break
+
+                    actual_available = day_limit - rot_sum
+                    feasible_candidates = [
+                        candidate
+                        for candidate in resequenced
+                        if candidate.rot <= actual_available + remeaning_extra_time_pool
+                    ]
+                    if not feasible_candidates:
+                        break
+
+                    no_overtime = [
+                        candidate
+                        for candidate in feasible_candidates
+                        if candidate.rot <= actual_available
+                    ]
+                    if no_overtime:
+                        next_p = no_overtime[0]
+                    else:
+                        next_p = min(
+                            feasible_candidates,
+                            key=lambda p: (p.rot - actual_available, p.rot),
+                        )
+
+                can_execute, remeaning_extra_time_pool = overtime_with_rot(
+                    next_p,
+                    rot_sum,
+                    today,
+                    day_limit,
+                    remeaning_extra_time_pool,
+                )
+                if not can_execute:
+                    break
+
+                rot_sum += next_p.rot
+                executed.append(next_p)
+                executed_order.append(next_p.id)
+                remaining.remove(next_p)
+
+            shifted_ids = [p.id for p in remaining]
+            swap_positions = sum(
+                1
+                for idx in range(min(len(planned_order), len(executed_order)))
+                if planned_order[idx] != executed_order[idx]
+            )
+
+            stats[f"day_{today}_room_{room_index + 1}"] = {
+                "planned_order": planned_order,
+                "executed_order": executed_order,
+                "shifted_to_next_day": shifted_ids,
+                "executed_count": len(executed_order),
+                "shifted_count": len(shifted_ids),
+                "swap_positions": swap_positions,
+            }
+
+            not_executed_today.extend(remaining)
+
+        stats["overflow_to_next_week"] += len(not_executed_today)
+        overflow_to_next_week.extend(not_executed_today)
+
+    return executed, overflow_to_next_week, remeaning_extra_time_pool, stats
+# endregion
+
+
+def pianificazioni_da_seed(seed, cartella):
+    """Piani settimanali (euristici) delle code di arrivo di ogni settimana."""
+    paths = generate_csv(
+        specialties=list(Settings.workstations_config.keys()),
+        weekly_hours=Settings.week_hours_to_fill,
+        num_weeks=Settings.weeks_to_fill,
+        seed=seed,
+        specialty_params=Settings.specialty_params,
+        people_distribution=Settings.daily_patient_arrival_distribution,
+        priority_params=Settings.priority_params,
+        filepath=cartella,
+    )
+    record = read_and_split_by_operation_with_metadata(paths[0])
+    giorni = Settings.week_length_days
+    for specialita, pazienti in record.items():
+        for settimana in range(1, Settings.weeks_to_fill + 1):
+            inizio = settimana * giorni
+            coda = [p for p in pazienti if p.day < inizio and p.day + p.mtb >= inizio - giorni]
+            yield specialita, inizio, plan_week_heuristic(coda, specialita, inizio)
+
+
+def pianificazioni_sovraccariche(seed, pazienti_per_sala):
+    """Pazienti assegnati a caso ai giorni/sale, ben oltre la capacità."""
+    rng = random.Random(seed)
+    giorni = Settings.week_length_days
+    for specialita, sale in Settings.workstations_config.items():
+        inizio = giorni
+        piano = []
+        for pid in range(pazienti_per_sala * sale * giorni):
+            eot = round(rng.uniform(20, 200), 2)
+            piano.append(
+                Patient(
+                    id=pid,
+                    eot=eot,
+                    day=rng.randint(0, inizio),
+                    mtb=rng.choice([3, 5, 7, 10, 15, 30, 60]),
+                    rot=round(eot * rng.uniform(0.7, 1.5), 2),
+                    opDay=inizio + rng.randrange(giorni),
+                    workstation=rng.randint(1, sale),
+                )
+            )
+        yield specialita, inizio, piano
+
+
+def confronta(specialita, inizio, piano, pool, tempi):
+    t0 = time.perf_counter()
+    atteso = clean_week_with_rot_riferimento(copy.deepcopy(piano), specialita, inizio, pool)
+    t1 = time.perf_counter()
+    ottenuto = clean_week_with_rot(copy.deepcopy(piano), specialita, inizio, pool)
+    t2 = time.perf_counter()
+    tempi[0] += t1 - t0
+    tempi[1] += t2 - t1
+
+    return (
+        [p.id for p in atteso[0]] == [p.id for p in ottenuto[0]]
+        and [p.id for p in atteso[1]] == [p.id for p in ottenuto[1]]
+        and atteso[2] == ottenuto[2]
+        and atteso[3] == ottenuto[3]
+    )
+
+
+def _parse_seeds(testo):
+    seeds = []
+    for parte in testo.split(","):
+        primo, _, ultimo = parte.strip().partition("-")
+        seeds.extend(range(int(primo), int(ultimo or primo) + 1))
+    return seeds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regressione di clean_week_with_rot")
+    parser.add_argument("--seeds", default="1-10", help='Seed, es. "1-20"')
+    parser.add_argument("--pazienti-per-sala", type=int, default=12,
+                        help="Pazienti per sala/giorno nei casi sovraccarichi")
+    args = parser.parse_args()
+
+    casi = 0
+    differenze = []
+    tempi = [0.0, 0.0]
+    with tempfile.TemporaryDirectory() as cartella:
+        for seed in _parse_seeds(args.seeds):
+            sorgenti = list(pianificazioni_da_seed(seed, cartella + "/"))
+            sorgenti += list(pianificazioni_sovraccariche(seed, args.pazienti_per_sala))
+            for specialita, inizio, piano in sorgenti:
+                for pool in (0.0, Settings.weekly_extra_time_pool):
+                    casi += 1
+                    if not confronta(specialita, inizio, piano, pool, tempi):
+                        differenze.append((seed, specialita, inizio, pool))
+
+    print(f"Casi confrontati: {casi}, differenze: {len(differenze)}")
+    print(f"Tempo riferimento: {tempi[0]:.3f}s, tempo corrente: {tempi[1]:.3f}s")
+    for differenza in differenze:
+        print(f"  DIFFERENZA seed={differenza[0]} specialità={differenza[1]} "
+              f"inizio={differenza[2]} pool={differenza[3]}")
+    sys.exit(1 if differenze else 0)